@@ -1,15 +1,45 @@
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
 
-from .routers import resume, jobs, apply, settings
+from .routers import resume, jobs, apply, settings, metrics
+from .services.embedding_batcher import close_embedding_batchers
+from .services.job_index import get_job_index
+from .services.llm_parser import close_llm_parser
+from .services.parser_pool import shutdown_parser_pool
+from .services.preload import start_preload
+from .services.scraper import get_scraper_client
+from .services.text_extraction import disable_parallel_extraction
 
 # Load environment variables from .env file
 load_dotenv()
 
-app = FastAPI(title="Stealth Bot API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Reload the persistent job corpus snapshot and drop expired postings;
+    # only the process holding the index's writer lock changes it
+    job_index = get_job_index()
+    if not job_index.read_only:
+        job_index.delete_expired(float(os.getenv("JOB_INDEX_MAX_AGE_HOURS", "72")) * 3600)
+        if not job_index.trained and len(job_index) >= int(os.getenv("JOB_INDEX_TRAIN_THRESHOLD", "50000")):
+            job_index.train()
+    # Bulk LLM imports extract text on threads of this process, which must not fork
+    disable_parallel_extraction()
+    # Warm the lazily imported libraries while the app is already serving
+    start_preload()
+    yield
+    if not job_index.read_only:
+        job_index.save()
+        job_index.close()
+    await get_scraper_client().aclose()
+    await close_llm_parser()
+    await close_embedding_batchers()
+    shutdown_parser_pool()
+
+app = FastAPI(title="Stealth Bot API", version="0.1.0", lifespan=lifespan)
 
 # Enable CORS for the frontend
 app.add_middleware(
@@ -30,3 +60,4 @@ app.include_router(resume.router, prefix="/resume")
 app.include_router(jobs.router, prefix="/jobs")
 app.include_router(apply.router, prefix="/apply")
 app.include_router(settings.router, prefix="/settings")
+app.include_router(metrics.router, prefix="/metrics")
@@ -15,6 +15,12 @@ class ApplicationStatus(str, Enum):
     OFFER = "Offer"
     REJECTED = "Rejected"
 
+class IngestionStatus(str, Enum):
+    QUEUED = "Queued"
+    PROCESSING = "Processing"
+    COMPLETED = "Completed"
+    FAILED = "Failed"
+
 class Candidate(BaseModel):
     candidate_id: str
     name: Optional[str] = None
@@ -54,4 +60,22 @@ class Application(BaseModel):
     updated_at: str
 
 class ApplicationStatusUpdate(BaseModel):
-    status: ApplicationStatus 
\ No newline at end of file
+    status: ApplicationStatus
+
+class IngestionJob(BaseModel):
+    job_id: str
+    status: IngestionStatus = IngestionStatus.QUEUED
+    parser: str
+    file_path: str
+    content_sha256: Optional[str] = None
+    candidate_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: str
+    updated_at: str
+
+class BulkImportResult(BaseModel):
+    """One line of a bulk import's NDJSON response."""
+    file: str
+    status: IngestionStatus
+    candidate_id: Optional[str] = None
+    error: Optional[str] = None
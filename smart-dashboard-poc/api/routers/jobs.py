@@ -1,145 +1,282 @@
 import os
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import redis
-import requests
-from bs4 import BeautifulSoup
 from fastapi import APIRouter, HTTPException, Depends
 from ..models import Job, Candidate
 from ..deps import get_redis
+from ..services.embeddings import embed_text, embed_texts
+from ..services.embedding_backends import EmbeddingBackend, fallback_backend, select_embedding_backend
+from ..services.candidate_embedding import get_candidate_embedding, profile_text, profile_version
+from ..services.embedding_cache import get_embedding_cache
+from ..services.lexical_index import lexical_prefilter
+from ..services.scoring import ScoringEngine, hybrid_scores, top_k_indices
+from ..services.job_index import JobIndex, get_job_index
+from ..services.job_sources import search_job_sources
+from ..services.job_cache import get_job_cache
 import json
+import hashlib
 import logging
-from datetime import datetime, timedelta
-import openai
+from datetime import datetime
 import numpy as np
-import asyncio
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def _embed(text: str) -> np.ndarray:
-    """Create embeddings for text using OpenAI"""
-    response = await openai.AsyncOpenAI().embeddings.create(
-        input=text,
-        model="text-embedding-3-small"
-    )
-    return np.array(response.data[0].embedding)
+DEFAULT_TOP_K = int(os.getenv("JOB_RANK_TOP_K", "10"))
+# Match from the persistent job corpus once it holds at least this many postings
+JOB_INDEX_MIN_JOBS = int(os.getenv("JOB_INDEX_MIN_JOBS", "500"))
+# Only the best lexical matches of larger job sets are embedded and ranked
+PREFILTER_TOP_M = int(os.getenv("JOB_PREFILTER_TOP_M", "100"))
+# Weight of the embedding score against the BM25 score for prefiltered sets
+HYBRID_ALPHA = float(os.getenv("JOB_HYBRID_ALPHA", "0.8"))
+RANKING_CACHE_PREFIX = "job_ranking"
+RANKING_TTL_SECONDS = int(os.getenv("JOB_RANKING_TTL_SECONDS", "3600"))
+
+async def _embed(text: str, backend: EmbeddingBackend) -> np.ndarray:
+    """Create embeddings for text with `backend`, reusing cached vectors when possible"""
+    return await embed_text(text, backend)
+
+async def _embed_many(texts: List[str], backend: EmbeddingBackend) -> List[np.ndarray]:
+    """Embed texts with `backend`, reading all their cached vectors in one Redis round trip"""
+    return await embed_texts(texts, backend)
 
 def cosine_sim(a: np.ndarray, b: np.ndarray) -> float:
     """Compute cosine similarity between two vectors"""
     return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b) + 1e-8))
 
-async def rank_jobs(jobs: List[Job], candidate_skills: List[str]) -> List[Job]:
-    """Rank jobs based on candidate skills using embeddings"""
+def score_percentage(score: float) -> float:
+    """Convert a cosine score to a 0-100 percentage rounded to one decimal"""
+    return round(max(0, min(100, float(score) * 100)), 1)
+
+async def rank_jobs(
+    jobs: List[Job],
+    candidate_skills: List[str],
+    top_k: int = DEFAULT_TOP_K,
+    candidate_embedding: Optional[np.ndarray] = None,
+    backend: Optional[EmbeddingBackend] = None,
+) -> List[Job]:
+    """
+    Rank jobs based on candidate skills; see `rank_jobs_with_backend`.
+    """
+    ranked_jobs, _ = await rank_jobs_with_backend(jobs, candidate_skills, top_k, candidate_embedding, backend)
+    return ranked_jobs
+
+async def rank_jobs_with_backend(
+    jobs: List[Job],
+    candidate_skills: List[str],
+    top_k: int = DEFAULT_TOP_K,
+    candidate_embedding: Optional[np.ndarray] = None,
+    backend: Optional[EmbeddingBackend] = None,
+) -> Tuple[List[Job], Optional[EmbeddingBackend]]:
+    """
+    Rank jobs based on candidate skills using embeddings and return the best `top_k`.
+    Pass the candidate's stored profile embedding (computed with `backend`)
+    to skip embedding their skills.
+
+    Sets larger than PREFILTER_TOP_M are first cut down to their best BM25
+    matches for the skills, so only those are embedded, and are then ranked
+    by a blend of both scores. If the embedding backend fails and a fallback
+    backend is configured, the ranking is redone with the fallback.
+
+    Returns the ranking and the backend that produced it, which is the
+    fallback after a failure and None when the jobs could not be ranked.
+    """
     if not jobs or not candidate_skills:
-        return jobs
+        return jobs, None
+    backend = backend or select_embedding_backend()
     
     try:
-        # Create candidate text from skills
-        candidate_text = " ".join(candidate_skills)
-        
-        # Embed candidate text
-        candidate_emb = await _embed(candidate_text)
-        
-        # Embed all job descriptions
-        job_descs = [job.description or "" for job in jobs]
-        job_embs = await asyncio.gather(*[_embed(desc) for desc in job_descs])
-        
-        # Compute scores and update jobs
-        scored_jobs = []
-        for job, emb in zip(jobs, job_embs):
-            score = cosine_sim(candidate_emb, emb)
-            # Convert score to percentage (0-100)
-            score_percentage = max(0, min(100, score * 100))
-            job.score = round(score_percentage, 1)
-            scored_jobs.append(job)
+        candidates = jobs
+        lexical_scores = None
+        if len(jobs) > PREFILTER_TOP_M:
+            positions, lexical_scores = lexical_prefilter(jobs, profile_text(candidate_skills), PREFILTER_TOP_M)
+            logger.info(f"Lexical prefilter kept {len(positions)} of {len(jobs)} jobs")
+            candidates = [jobs[i] for i in positions]
+
+        # Embed the candidate text (unless precomputed) and all job
+        # descriptions together so they share a single batched request
+        job_descs = [job.description or "" for job in candidates]
+        if candidate_embedding is None:
+            candidate_emb, *job_embs = await _embed_many([profile_text(candidate_skills)] + job_descs, backend)
+        else:
+            candidate_emb = candidate_embedding
+            job_embs = await embed_jobs(candidates, backend)
         
-        # Sort by score (highest first) and return top 10
-        ranked_jobs = sorted(scored_jobs, key=lambda x: x.score or 0, reverse=True)[:10]
+        # Score every job with one matrix-vector product and keep the top k
+        engine = ScoringEngine(job_embs)
+        if lexical_scores is None:
+            indices, scores = engine.top_k(candidate_emb, top_k)
+        else:
+            blended = hybrid_scores(engine.scores(candidate_emb), lexical_scores, HYBRID_ALPHA)
+            indices = top_k_indices(blended, top_k)
+            scores = blended[indices]
+        ranked_jobs = []
+        for index, score in zip(indices, scores):
+            job = candidates[index]
+            job.score = score_percentage(score)
+            ranked_jobs.append(job)
         
-        logger.info(f"Ranked {len(jobs)} jobs, returning top {len(ranked_jobs)}")
-        return ranked_jobs
+        logger.info(f"Ranked {len(jobs)} jobs with {backend.name} embeddings, returning top {len(ranked_jobs)}")
+        return ranked_jobs, backend
         
     except Exception as e:
+        fallback = fallback_backend(backend)
+        if fallback is not None:
+            logger.warning(f"Ranking with {backend.name} embeddings failed ({str(e)}); retrying with {fallback.name}")
+            return await rank_jobs_with_backend(jobs, candidate_skills, top_k, backend=fallback)
         logger.error(f"Error ranking jobs: {str(e)}")
         # Return original jobs if ranking fails
-        return jobs
+        return jobs, None
+
+async def embed_jobs(jobs: List[Job], backend: Optional[EmbeddingBackend] = None) -> List[np.ndarray]:
+    """Embed job descriptions (batched, and cached for later rankings)"""
+    backend = backend or select_embedding_backend()
+    return await _embed_many([job.description or "" for job in jobs], backend)
+
+async def ingest_jobs(jobs: List[Job], job_index: JobIndex) -> None:
+    """
+    Add scraped jobs to the persistent job corpus. Only jobs this process has
+    already embedded (for a ranking) with the corpus' model are added, so
+    ingestion never costs embedding calls of its own. Processes that opened
+    the corpus read-only leave ingestion to the one that writes it.
+    """
+    if not jobs or job_index.read_only:
+        return
+    try:
+        cache = get_embedding_cache()
+        new_jobs, embeddings = [], []
+        for job in jobs:
+            if job.url in job_index:
+                continue
+            embedding = cache.peek(job_index.model, job.description or "")
+            if embedding is not None:
+                new_jobs.append(job)
+                embeddings.append(embedding)
+        job_index.add(new_jobs, embeddings)
+    except Exception as e:
+        logger.error(f"Error ingesting jobs into the job index: {str(e)}")
+
+async def match_from_index(
+    candidate_skills: List[str],
+    job_index: JobIndex,
+    top_k: int = DEFAULT_TOP_K,
+    candidate_embedding: Optional[np.ndarray] = None,
+    backend: Optional[EmbeddingBackend] = None,
+) -> List[Job]:
+    """Match a candidate against the persistent job corpus with an ANN query"""
+    candidate_emb = candidate_embedding
+    if candidate_emb is None:
+        candidate_emb = await _embed(profile_text(candidate_skills), backend or select_embedding_backend())
+    ranked_jobs = []
+    for job, score in job_index.search(candidate_emb, top_k):
+        job.score = score_percentage(score)
+        ranked_jobs.append(job)
+    logger.info(f"Matched against {len(job_index)} indexed jobs, returning top {len(ranked_jobs)}")
+    return ranked_jobs
 
 router = APIRouter()
 
 def generate_cache_key(skills: List[str], location: str) -> str:
     """
-    Generate a Redis cache key based on search parameters
+    Generate the Redis cache key for the raw scraped job set of a search.
+    Scrapes only use the top 3 skills, so every candidate sharing them
+    shares the scrape.
     """
     # Use top 3 skills and location to create a unique key
     skills_str = "-".join(sorted(skills[:3])).lower()
     location_str = location.lower().replace(" ", "-")
     return f"job_search:{skills_str}:{location_str}"
 
-def scrape_indeed_jobs(skills: List[str], location: str = "Remote") -> List[Job]:
+def ranking_cache_key(candidate_id: str, embedding_version: str, job_set_version: str) -> str:
     """
-    Scrape job listings from Indeed based on candidate skills
+    Key for one candidate's ranking of one job set. It changes whenever the
+    candidate's profile embedding or the scraped job set does.
     """
-    # Convert skills list to search query
-    search_query = " ".join(skills[:3])  # Use top 3 skills
-    
-    # Format URL (Note: This is a simplified example)
-    base_url = "https://www.indeed.com/jobs"
-    params = {
-        "q": search_query,
-        "l": location,
-        "sort": "date"
-    }
-    
-    try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        
-        # Make request with timeout
-        response = requests.get(base_url, params=params, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        jobs_list = []
-        
-        # Find job cards
-        job_cards = soup.find_all('div', class_='job_seen_beacon')
-        
-        if not job_cards:
-            logger.warning('Scraper could not find any job listings. The website structure may have changed.')
+    return f"{RANKING_CACHE_PREFIX}:{candidate_id}:{embedding_version}:{job_set_version}"
+
+def job_set_version(payload: str) -> str:
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+async def scrape_job_set(skills: List[str], location: str = "Remote") -> Optional[str]:
+    """
+    Return the cached raw job set (a JSON list) for a search, scraping it on
+    a miss. Only one request per query scrapes at a time across all API
+    processes, and stale sets are refreshed in the background while still
+    being served.
+    """
+    cache_key = generate_cache_key(skills, location)
+
+    async def compute() -> Optional[str]:
+        logger.info(f"Cache miss for key: {cache_key}")
+        jobs = await search_job_sources(skills, location)
+        if not jobs:
+            # Empty results aren't cached so the next request tries again
+            return None
+        return json.dumps([job.dict() for job in jobs])
+
+    return await get_job_cache().get_or_compute(cache_key, compute)
+
+async def find_ranked_jobs(
+    redis_client: redis.Redis,
+    candidate_id: str,
+    skills: List[str],
+    location: str = "Remote",
+    backend: Optional[EmbeddingBackend] = None,
+) -> List[Job]:
+    """
+    Rank jobs for one candidate, from the job corpus when it is large enough
+    and otherwise from the (shared, cached) scraped job set. Rankings are
+    cheap compared with scrapes and are cached per candidate.
+
+    The corpus is only used while the selected embedding backend is the one
+    it was built with; rankings are cached per backend.
+    """
+    backend = backend or select_embedding_backend(redis_client)
+    job_index = get_job_index()
+    use_index = len(job_index) >= JOB_INDEX_MIN_JOBS and job_index.model == backend.model
+    jobs_payload = None
+    if use_index:
+        set_version = "index"
+    else:
+        jobs_payload = await scrape_job_set(skills, location)
+        if not jobs_payload:
             return []
-        
-        for card in job_cards[:10]:  # Limit to 10 results
-            try:
-                title = card.find('h2', class_='jobTitle').get_text(strip=True)
-                company = card.find('span', class_='companyName').get_text(strip=True)
-                location = card.find('div', class_='companyLocation').get_text(strip=True)
-                description = card.find('div', class_='job-snippet').get_text(strip=True)
-                url = "https://www.indeed.com" + card.find('a')['href']
-                
-                job = Job(
-                    title=title,
-                    company=company,
-                    location=location,
-                    url=url,
-                    description=description
-                )
-                jobs_list.append(job)
-            except Exception as e:
-                logger.error(f"Error parsing job card: {str(e)}")
-                continue
-                
-        return jobs_list
-    except requests.Timeout:
-        logger.error("Request timed out while scraping jobs")
-        return []
-    except requests.RequestException as e:
-        logger.error(f"Network error while scraping jobs: {str(e)}")
-        return []
+        set_version = job_set_version(jobs_payload)
+
+    ranking_key = ranking_cache_key(candidate_id, profile_version(skills, backend.model), set_version)
+    cached_ranking = redis_client.get(ranking_key)
+    if cached_ranking:
+        return [Job(**job) for job in json.loads(cached_ranking)]
+
+    # Stored at resume upload, so this is normally a Redis read
+    try:
+        candidate_emb = await get_candidate_embedding(redis_client, candidate_id, skills, backend)
     except Exception as e:
-        logger.error(f"Unexpected error while scraping jobs: {str(e)}")
-        return []
+        fallback = fallback_backend(backend)
+        if fallback is None:
+            raise
+        logger.warning(f"Embedding candidate {candidate_id} with {backend.name} failed ({str(e)}); retrying with {fallback.name}")
+        return await find_ranked_jobs(redis_client, candidate_id, skills, location, backend=fallback)
+    if use_index:
+        # Match against the persistent job corpus instead of scraping
+        ranked_jobs = await match_from_index(skills, job_index, candidate_embedding=candidate_emb, backend=backend)
+    else:
+        jobs = [Job(**job) for job in json.loads(jobs_payload)]
+        logger.info(f"Ranking {len(jobs)} scraped jobs")
+        ranked_jobs, ranked_with = await rank_jobs_with_backend(jobs, skills, candidate_embedding=candidate_emb, backend=backend)
+        await ingest_jobs(jobs, job_index)
+        if ranked_with is None:
+            # Unranked jobs are not worth caching
+            return ranked_jobs
+        if ranked_with is not backend:
+            # A fallback ranking is cached for the fallback backend only, so it
+            # is not served in place of the primary's once that recovers
+            ranking_key = ranking_cache_key(candidate_id, profile_version(skills, ranked_with.model), set_version)
+
+    if ranked_jobs:
+        redis_client.set(ranking_key, json.dumps([job.dict() for job in ranked_jobs]), ex=RANKING_TTL_SECONDS)
+    return ranked_jobs
 
 @router.get("/{candidate_id}", response_model=List[Job])
 async def get_jobs_for_candidate(candidate_id: str):
@@ -164,39 +301,14 @@ async def get_jobs_for_candidate(candidate_id: str):
         if not candidate.skills:
             raise HTTPException(status_code=400, detail="Candidate has no skills listed")
         
-        # Generate cache key for this search
-        cache_key = generate_cache_key(candidate.skills, "Remote")
-        
-        # Try to get cached results
-        cached_jobs = redis_client.get(cache_key)
-        if cached_jobs:
-            logger.info(f"Cache hit for key: {cache_key}")
-            return json.loads(cached_jobs)
-            
-        # If no cache hit, scrape jobs
-        logger.info(f"Cache miss for key: {cache_key}")
-        jobs = scrape_indeed_jobs(candidate.skills)
-        
-        if jobs:
-            logger.info(f"Ranking {len(jobs)} jobs for candidate {candidate_id}")
-            # Rank jobs based on candidate skills
-            ranked_jobs = await rank_jobs(jobs, candidate.skills)
-            
-            # Cache the ranked results for 2 hours
-            redis_client.setex(
-                cache_key,
-                timedelta(hours=2),
-                json.dumps([job.dict() for job in ranked_jobs])
-            )
-            
-            return ranked_jobs
-        
-        return jobs
+        return await find_ranked_jobs(redis_client, candidate_id, candidate.skills)
         
+    except HTTPException:
+        raise
     except redis.RedisError as e:
         logger.error(f"Redis error: {str(e)}")
         # If Redis fails, fall back to direct scraping
-        return scrape_indeed_jobs(candidate.skills) if candidate.skills else []
+        return await search_job_sources(candidate.skills) if candidate.skills else []
     except Exception as e:
         logger.error(f"Unexpected error in get_jobs_for_candidate: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends
+from redis import Redis
+
+from ..deps import get_redis
+from ..services.embedding_cache import get_embedding_cache
+from ..services.embedding_batcher import batcher_stats
+from ..services.embedding_backends import backend_stats
+from ..services.job_cache import get_job_cache
+from ..services.parse_cache import parse_cache_stats
+from ..services.parser_cascade import cascade_stats
+
+router = APIRouter()
+
+@router.get("/")
+async def get_metrics():
+    """
+    Report in-process cache counters for this API worker.
+    """
+    return {
+        "embedding_cache": get_embedding_cache().stats(),
+        "embedding_batcher": batcher_stats(),
+        "embedding_backends": backend_stats(),
+        "job_cache": get_job_cache().stats(),
+    }
+
+@router.get("/parse-cache")
+async def get_parse_cache_metrics(redis: Redis = Depends(get_redis)):
+    """
+    Report resume parse cache hit rate and parser time saved, shared by
+    all API processes and ingestion workers.
+    """
+    return parse_cache_stats(redis)
+
+@router.get("/parser-cascade")
+async def get_parser_cascade_metrics(redis: Redis = Depends(get_redis)):
+    """
+    Report how many cascaded parses stayed local or escalated, parse
+    latency per outcome and per parser, and the local confidence
+    distribution, for tuning the escalation threshold.
+    """
+    return cascade_stats(redis)
@@ -1,17 +1,19 @@
 import os
-import uuid
-import json
-from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Depends
+import asyncio
+from concurrent.futures import Executor
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Depends, Request, Response
 from typing import List, Optional
-from pyresparser import ResumeParser
-from fastapi.responses import JSONResponse
-from api.models import Candidate
-import redis
+from fastapi.responses import StreamingResponse
+from rq import Queue
+from api.models import Candidate, CandidateStatus, IngestionJob
 from redis import Redis
 import logging
 from ..deps import get_redis
-from ..services.docai_parser import parse_with_docai
-from ..services.gpt4_parser import parse_with_gpt4
+from ..services.bulk_import import import_resumes, stage_uploads
+from ..services.candidate_index import list_candidates_page
+from ..services.parser_pool import get_parser_pool
+from ..services.resume_ingestion import get_ingestion_queue, ingest_cached, load_ingestion, parser_preference, submit_ingestion
+from ..services.uploads import UPLOAD_DIR, UploadRejected, receive_upload
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -24,21 +26,24 @@ def ensure_storage_dir():
 
 @router.get("/", response_model=List[Candidate])
 async def list_candidates(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    status: Optional[CandidateStatus] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     redis: Redis = Depends(get_redis)
 ):
-    """Get a list of all candidates with pagination."""
-    # Get all candidate keys
-    candidate_keys = redis.keys("candidate:*")
-    candidates = []
-    
-    # Get candidates for the requested page
-    for key in candidate_keys[skip:skip + limit]:
-        candidate_data = redis.get(key)
-        if candidate_data:
-            candidates.append(Candidate.parse_raw(candidate_data))
-    
+    """
+    Get a page of candidates, newest first, optionally filtered by status.
+    Pass the X-Next-Cursor header of one page as `cursor` to get the next;
+    the header is absent on the last page.
+    """
+    try:
+        candidates, next_cursor = list_candidates_page(redis, limit, cursor=cursor, status=status, skip=skip)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return candidates
 
 @router.get("/{candidate_id}", response_model=Candidate)
@@ -49,78 +54,98 @@ async def get_candidate(candidate_id: str, redis: Redis = Depends(get_redis)):
         raise HTTPException(status_code=404, detail="Candidate not found")
     return Candidate.parse_raw(candidate_data)
 
-@router.post("/upload", response_model=Candidate, status_code=201)
-async def create_resume(file: UploadFile = File(...)):
-    try:
-        # Create a temporary file to store the upload
-        temp_path = f"/tmp/{file.filename}"
-        permanent_path = f"uploads/{file.filename}"
-        
-        # Ensure the uploads directory exists
-        os.makedirs("uploads", exist_ok=True)
-        
-        # Save the uploaded file
-        with open(temp_path, "wb+") as file_object:
-            file_object.write(await file.read())
-            
-        # Move to permanent location
-        os.rename(temp_path, permanent_path)
-        
-        # Get Redis connection
-        redis_conn = get_redis()
-        
-        # Get parser preference from Redis
-        parser_preference = redis_conn.get("settings:parser_preference")
-        if parser_preference:
-            parser_preference = parser_preference.decode("utf-8")
-        else:
-            parser_preference = "pyresparser"  # Default
-            
-        logger.info(f"Using '{parser_preference}' for resume parsing.")
-        
-        # Parse the resume using the selected parser
-        try:
-            if parser_preference == "docai":
-                parsed_data = parse_with_docai(permanent_path)
-            elif parser_preference == "gpt-4":
-                parsed_data = parse_with_gpt4(permanent_path)
-            else:  # Default to pyresparser
-                parsed_data = ResumeParser(permanent_path).get_extracted_data()
-                
-            # Generate a unique ID for the new candidate
-            candidate_id = str(uuid.uuid4())
+def get_queue(redis: Redis = Depends(get_redis)) -> Queue:
+    return get_ingestion_queue(redis)
 
-            # Create a Candidate object from the parsed data
-            candidate = Candidate(
-                candidate_id=candidate_id,
-                name=parsed_data.get("name"),
-                email=parsed_data.get("email"),
-                mobile_number=parsed_data.get("mobile_number"),
-                skills=parsed_data.get("skills", []),
-                experience=parsed_data.get("experience", []),
-                education=parsed_data.get("education", []),
-                resume_file_path=permanent_path,  # The path we saved earlier
-                # Set default status
-                status="Pending" 
-            )
+# The file is read from the request stream, so document the form by hand
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
 
-            # Save the complete candidate object to Redis with the correct key format
-            redis_conn.set(f"candidate:{candidate_id}", candidate.json(), ex=86400) # 24-hour expiry
-            logger.info(f"Successfully created and stored candidate {candidate_id}")
+@router.post("/upload", response_model=IngestionJob, status_code=202, openapi_extra=UPLOAD_REQUEST_BODY)
+async def create_resume(
+    request: Request,
+    redis_conn: Redis = Depends(get_redis),
+    queue: Queue = Depends(get_queue)
+):
+    """
+    Store the uploaded resume and queue it for parsing. Poll
+    /resume/ingestions/{job_id} for the result; once completed it carries
+    the new candidate's id.
 
-            # Return the newly created candidate object
-            return candidate
-            
-        except Exception as parsing_error:
-            logger.error(f"Error parsing resume with {parser_preference}: {str(parsing_error)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error parsing resume with {parser_preference}: {str(parsing_error)}"
-            )
+    The file is streamed to storage in chunks under a unique name and
+    hashed on the way. Files over the size limit get 413, and anything but
+    a PDF or Word document gets 415.
+    """
+    try:
+        upload = await receive_upload(request)
+        
+        # The parser is chosen now, so a later settings change doesn't
+        # affect uploads already queued
+        parser = parser_preference(redis_conn)
+        # A file this parser has seen before needs no parsing at all
+        job = await ingest_cached(redis_conn, upload.path, parser, upload.sha256)
+        if job is not None:
+            logger.info(f"Ingested {upload.path} from the parse cache ({upload.sha256[:12]}, '{parser}')")
+            return job
+        job = submit_ingestion(redis_conn, queue, upload.path, parser, upload.sha256)
+        logger.info(f"Queued ingestion {job.job_id} of {upload.path} ({upload.size} bytes, {upload.mime_type}) using '{parser}'")
+        return job
             
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         logger.error(f"Error processing resume upload: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Error processing resume upload: {str(e)}"
         )
+
+@router.get("/ingestions/{job_id}", response_model=IngestionJob)
+async def get_ingestion(job_id: str, redis: Redis = Depends(get_redis)):
+    """Get the status of a resume ingestion job."""
+    job = load_ingestion(redis, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return job
+
+def get_parse_executor() -> Executor:
+    return get_parser_pool()
+
+@router.post("/bulk")
+async def bulk_import_resumes(
+    files: List[UploadFile] = File(...),
+    redis_conn: Redis = Depends(get_redis),
+    executor: Executor = Depends(get_parse_executor)
+):
+    """
+    Import many resumes at once, uploaded as files and/or zip archives of
+    files. They are parsed in parallel and the response streams one
+    BulkImportResult per file as NDJSON, in completion order; a file that
+    cannot be parsed gets a Failed line and does not affect the others.
+    """
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    parser = parser_preference(redis_conn)
+    staged, rejected = await asyncio.to_thread(
+        stage_uploads, [(file.filename, file.file) for file in files], UPLOAD_DIR
+    )
+    logger.info(f"Bulk importing {len(staged)} resumes using '{parser}' ({len(rejected)} rejected)")
+
+    async def results():
+        for result in rejected:
+            yield result.json() + "\n"
+        async for result in import_resumes(redis_conn, staged, parser, executor):
+            yield result.json() + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
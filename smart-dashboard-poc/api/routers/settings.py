@@ -5,6 +5,10 @@ import os
 import json
 import logging
 from ..deps import get_redis
+from ..services.embedding_backends import (
+    SETTINGS_KEY as EMBEDDING_SETTINGS_KEY, backend_names, configured_backend, invalidate_backend_setting,
+    select_embedding_backend,
+)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -15,6 +19,9 @@ router = APIRouter()
 class ParserSettings(BaseModel):
     parser: str
 
+class EmbeddingSettings(BaseModel):
+    backend: str
+
 @router.get("/")
 async def get_settings():
     """
@@ -58,4 +65,41 @@ async def update_settings(settings: ParserSettings):
         )
     except Exception as e:
         logger.error(f"Unexpected error while updating settings: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/embedding")
+async def get_embedding_settings():
+    """
+    Retrieve the configured embedding backend and the one currently in use
+    (they differ while "auto" has fallen back to the local backend).
+    """
+    redis_client = get_redis()
+    return {
+        "backend": configured_backend(redis_client),
+        "active": select_embedding_backend(redis_client).name,
+        "choices": backend_names(),
+    }
+
+@router.post("/embedding")
+async def update_embedding_settings(settings: EmbeddingSettings):
+    """
+    Select the embedding backend used for job matching.
+    """
+    if settings.backend not in backend_names():
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown embedding backend '{settings.backend}'; expected one of {', '.join(backend_names())}"
+        )
+    try:
+        redis_client = get_redis()
+        redis_client.set(EMBEDDING_SETTINGS_KEY, settings.backend)
+        invalidate_backend_setting()
+        logger.info(f"Updated embedding backend to: {settings.backend}")
+        return {"status": "success", "backend": settings.backend}
+
+    except redis.RedisError as e:
+        logger.error(f"Redis error while updating embedding settings: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail="Failed to save settings due to database error"
+        )
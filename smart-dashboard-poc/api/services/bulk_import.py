@@ -0,0 +1,216 @@
+import os
+import time
+import asyncio
+import logging
+import zipfile
+from concurrent.futures import Executor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
+
+from redis import Redis
+
+from ..models import BulkImportResult, Candidate, IngestionStatus
+from .candidate_index import save_candidate
+from . import docai_parser
+from .llm_parser import get_llm_parser
+from .parse_cache import cache_parse, copy_and_hash, get_cached_parse
+from .parser_cascade import CASCADE_PARSER, run_cascade
+from .parser_pool import discard_parser_pool, get_parser_pool
+from .resume_ingestion import build_candidate, embed_candidate, parse_resume
+from .uploads import unique_upload_path
+
+logger = logging.getLogger(__name__)
+
+RESUME_EXTENSIONS = (".pdf", ".docx", ".doc")
+MAX_ARCHIVE_FILES = int(os.getenv("BULK_IMPORT_MAX_FILES", "1000"))
+MAX_ARCHIVE_BYTES = int(os.getenv("BULK_IMPORT_MAX_ARCHIVE_MB", "500")) * 1024 * 1024
+
+# (name shown in results, stored path, sha256 of the content)
+StagedFile = Tuple[str, str, str]
+
+
+def _failed(name: str, error: str) -> BulkImportResult:
+    return BulkImportResult(file=name, status=IngestionStatus.FAILED, error=error)
+
+
+def _extract_archive(
+    name: str, fileobj: BinaryIO, dest_dir: str,
+) -> Tuple[List[StagedFile], List[BulkImportResult]]:
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile:
+        return [], [_failed(name, "Not a valid zip archive")]
+
+    with archive:
+        entries = [
+            info for info in archive.infolist()
+            if not info.is_dir() and not os.path.basename(info.filename).startswith(".")
+            and not info.filename.startswith("__MACOSX/")
+        ]
+        if len(entries) > MAX_ARCHIVE_FILES:
+            return [], [_failed(name, f"Archive has {len(entries)} files; the limit is {MAX_ARCHIVE_FILES}")]
+        if sum(info.file_size for info in entries) > MAX_ARCHIVE_BYTES:
+            return [], [_failed(name, f"Archive expands to more than {MAX_ARCHIVE_BYTES // (1024 * 1024)} MB")]
+
+        staged: List[StagedFile] = []
+        rejected: List[BulkImportResult] = []
+        for info in entries:
+            # Only the base name is kept, so entries cannot escape dest_dir
+            entry_name = f"{name}/{info.filename}"
+            if not info.filename.lower().endswith(RESUME_EXTENSIONS):
+                rejected.append(_failed(entry_name, "Unsupported file type"))
+                continue
+            path = unique_upload_path(dest_dir, info.filename)
+            with archive.open(info) as source, open(path, "wb") as target:
+                staged.append((entry_name, path, copy_and_hash(source, target)))
+        return staged, rejected
+
+
+def stage_uploads(
+    uploads: List[Tuple[str, BinaryIO]], dest_dir: str,
+) -> Tuple[List[StagedFile], List[BulkImportResult]]:
+    """
+    Write uploaded resumes, and the resumes inside uploaded zip archives,
+    to `dest_dir`. Returns the stored files and a failed result for every
+    upload or archive entry that cannot be imported.
+    """
+    staged: List[StagedFile] = []
+    rejected: List[BulkImportResult] = []
+    for name, fileobj in uploads:
+        lowered = name.lower()
+        if lowered.endswith(".zip"):
+            archive_staged, archive_rejected = _extract_archive(name, fileobj, dest_dir)
+            staged.extend(archive_staged)
+            rejected.extend(archive_rejected)
+        elif lowered.endswith(RESUME_EXTENSIONS):
+            path = unique_upload_path(dest_dir, name)
+            with open(path, "wb") as target:
+                staged.append((name, path, copy_and_hash(fileobj, target)))
+        else:
+            rejected.append(_failed(name, "Unsupported file type"))
+    return staged, rejected
+
+
+def _timed_parse(file_path: str, parser: str) -> Tuple[Dict[str, Any], float]:
+    start = time.perf_counter()
+    parsed = parse_resume(file_path, parser)
+    return parsed, time.perf_counter() - start
+
+
+async def _parse_with_cache(
+    redis_conn: Redis, executor: Executor, path: str, content_sha256: str, parser: str,
+) -> Tuple[Dict[str, Any], bool]:
+    """The parse and whether it came from the cache."""
+    parsed = get_cached_parse(redis_conn, content_sha256, parser)
+    if parsed is not None:
+        return parsed, True
+    if parser == "gpt-4":
+        # LLM parsing waits on the network, so it runs on the event loop under the shared rate limit
+        start = time.perf_counter()
+        parsed = await get_llm_parser().parse_file(path)
+        cache_parse(redis_conn, content_sha256, parser, parsed, time.perf_counter() - start)
+    else:
+        parsed, seconds = await asyncio.get_running_loop().run_in_executor(executor, _timed_parse, path, parser)
+        cache_parse(redis_conn, content_sha256, parser, parsed, seconds)
+    return parsed, False
+
+
+async def _parse(
+    redis_conn: Redis, executor: Executor, staged_file: StagedFile, parser: str,
+) -> Tuple[StagedFile, Optional[Dict[str, Any]], Optional[Exception]]:
+    _, path, content_sha256 = staged_file
+    try:
+        if parser == CASCADE_PARSER:
+            parsed = await run_cascade(
+                redis_conn, lambda tier: _parse_with_cache(redis_conn, executor, path, content_sha256, tier),
+            )
+        else:
+            parsed, _ = await _parse_with_cache(redis_conn, executor, path, content_sha256, parser)
+        return staged_file, parsed, None
+    except Exception as e:
+        return staged_file, None, e
+
+
+async def _parse_from_batch(
+    redis_conn: Redis, batch: "asyncio.Future", staged_file: StagedFile, batch_size: int, start: float,
+) -> Tuple[StagedFile, Optional[Dict[str, Any]], Optional[Exception]]:
+    _, path, content_sha256 = staged_file
+    try:
+        # Shielded: a cancelled file must not cancel the batch for the others
+        parsed, error = (await asyncio.shield(batch)).get(path, (None, "Missing from the Document AI batch results"))
+        if error is not None:
+            return staged_file, None, RuntimeError(error)
+        cache_parse(redis_conn, content_sha256, "docai", parsed, (time.perf_counter() - start) / batch_size)
+        return staged_file, parsed, None
+    except Exception as e:
+        return staged_file, None, e
+
+
+async def _cached(staged_file: StagedFile, parsed: Dict[str, Any]) -> Tuple[StagedFile, Optional[Dict[str, Any]], Optional[Exception]]:
+    return staged_file, parsed, None
+
+
+def _docai_batch_tasks(redis_conn: Redis, staged: List[StagedFile]) -> List["asyncio.Future"]:
+    """One task per file, with every uncached file parsed in a single Document AI batch operation."""
+    tasks = []
+    uncached = []
+    for staged_file in staged:
+        parsed = get_cached_parse(redis_conn, staged_file[2], "docai")
+        if parsed is not None:
+            tasks.append(asyncio.ensure_future(_cached(staged_file, parsed)))
+        else:
+            uncached.append(staged_file)
+    if uncached:
+        start = time.perf_counter()
+        batch = asyncio.ensure_future(asyncio.to_thread(docai_parser.parse_batch_with_docai, [path for _, path, _ in uncached]))
+        tasks += [
+            asyncio.ensure_future(_parse_from_batch(redis_conn, batch, staged_file, len(uncached), start))
+            for staged_file in uncached
+        ]
+    return tasks
+
+
+async def import_resumes(
+    redis_conn: Redis,
+    staged: List[StagedFile],
+    parser: str,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[BulkImportResult]:
+    """
+    Parse staged resumes in parallel on `executor` (the warm parser pool
+    by default) and yield one result per file as each finishes. Large
+    Document AI imports go through one batch operation instead, when a
+    batch bucket is configured, and the cascade sends only the resumes
+    the local parser is unsure of to a paid parser. Files whose
+    content this parser has seen before are not parsed again. A file that
+    fails to parse fails alone. Candidates are stored as their results are
+    yielded; their profile embeddings are computed together at the end,
+    where concurrent requests are batched.
+    """
+    if parser == "docai" and docai_parser.DOCAI_BATCH_GCS_URI and len(staged) >= docai_parser.DOCAI_BATCH_MIN_FILES:
+        tasks = _docai_batch_tasks(redis_conn, staged)
+    else:
+        executor = executor or get_parser_pool()
+        tasks = [asyncio.ensure_future(_parse(redis_conn, executor, staged_file, parser)) for staged_file in staged]
+    candidates: List[Candidate] = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            (name, path, _), parsed, error = await next_done
+            if error is not None:
+                if isinstance(error, BrokenProcessPool):
+                    # A parser process died; later imports get a fresh pool
+                    discard_parser_pool(executor)
+                logger.error(f"Error parsing {name} with {parser}: {str(error)}")
+                yield _failed(name, f"Error parsing resume with {parser}: {str(error)}")
+                continue
+            candidate = build_candidate(parsed, path)
+            save_candidate(redis_conn, candidate)
+            candidates.append(candidate)
+            yield BulkImportResult(file=name, status=IngestionStatus.COMPLETED, candidate_id=candidate.candidate_id)
+    finally:
+        # Drop queued parses if the client went away mid-stream
+        for task in tasks:
+            task.cancel()
+
+    await asyncio.gather(*(embed_candidate(redis_conn, candidate) for candidate in candidates if candidate.skills))
+    logger.info(f"Bulk import stored {len(candidates)} of {len(staged)} resumes")
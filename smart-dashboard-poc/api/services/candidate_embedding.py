@@ -0,0 +1,87 @@
+import hashlib
+import logging
+from typing import List, Optional
+
+import numpy as np
+import redis
+from redis import Redis
+
+from .embedding_cache import normalize_text
+from .embedding_backends import EMBEDDING_MODEL, EmbeddingBackend, select_embedding_backend
+from .embeddings import embed_text
+from .vector_codec import decode_vector, encode_vector, storage_dtype
+
+logger = logging.getLogger(__name__)
+
+# Deliberately not under "candidate:" so candidate listings never see it
+CANDIDATE_EMBEDDING_PREFIX = "candidate_embedding"
+CANDIDATE_TTL_SECONDS = 86400
+
+
+def candidate_embedding_key(candidate_id: str) -> str:
+    return f"{CANDIDATE_EMBEDDING_PREFIX}:{candidate_id}"
+
+
+def profile_text(skills: List[str]) -> str:
+    """The text a candidate's profile embedding is computed from."""
+    return " ".join(skills)
+
+
+def profile_version(skills: List[str], model: str = EMBEDDING_MODEL) -> str:
+    """Changes whenever the embedded text or the model does."""
+    return hashlib.sha256(f"{model}\0{normalize_text(profile_text(skills))}".encode("utf-8")).hexdigest()[:16]
+
+
+def store_candidate_embedding(
+    redis_conn: Redis, candidate_id: str, skills: List[str], embedding: np.ndarray,
+    model: str = EMBEDDING_MODEL, ttl_seconds: int = CANDIDATE_TTL_SECONDS,
+) -> None:
+    """Store the profile vector, encoded as EMBEDDING_STORAGE_DTYPE, next to the candidate record."""
+    key = candidate_embedding_key(candidate_id)
+    pipe = redis_conn.pipeline()
+    pipe.hset(key, mapping={
+        "version": profile_version(skills, model),
+        "vector": encode_vector(embedding, storage_dtype()),
+    })
+    pipe.expire(key, ttl_seconds)
+    pipe.execute()
+
+
+def load_candidate_embedding(
+    redis_conn: Redis, candidate_id: str, skills: List[str], model: str = EMBEDDING_MODEL,
+) -> Optional[np.ndarray]:
+    """
+    The stored profile vector, or None if there is none or it was computed
+    from different skills or another model (i.e. the record has changed).
+    """
+    version, vector = redis_conn.hmget(candidate_embedding_key(candidate_id), ["version", "vector"])
+    if not vector or version is None or version.decode("utf-8") != profile_version(skills, model):
+        return None
+    try:
+        return decode_vector(vector)
+    except ValueError:
+        return None
+
+
+async def get_candidate_embedding(
+    redis_conn: Redis, candidate_id: str, skills: List[str], backend: Optional[EmbeddingBackend] = None,
+) -> np.ndarray:
+    """
+    Load the candidate's profile vector for `backend` (by default the one
+    selected in settings), recomputing and storing it when stale.
+    """
+    backend = backend or select_embedding_backend(redis_conn)
+    model = backend.model
+    try:
+        embedding = load_candidate_embedding(redis_conn, candidate_id, skills, model)
+        if embedding is not None:
+            return embedding
+    except redis.RedisError as e:
+        logger.warning(f"Could not load embedding for candidate {candidate_id}: {str(e)}")
+
+    embedding = await embed_text(profile_text(skills), backend)
+    try:
+        store_candidate_embedding(redis_conn, candidate_id, skills, embedding, model)
+    except redis.RedisError as e:
+        logger.warning(f"Could not store embedding for candidate {candidate_id}: {str(e)}")
+    return embedding
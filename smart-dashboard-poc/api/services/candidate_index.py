@@ -0,0 +1,189 @@
+import time
+import logging
+from typing import Iterator, List, Optional, Tuple
+
+from redis import Redis
+
+from ..models import Candidate, CandidateStatus
+
+logger = logging.getLogger(__name__)
+
+CANDIDATE_TTL_SECONDS = 86400
+# Sorted sets of candidate ids scored by creation time (epoch milliseconds);
+# deliberately not under "candidate:" so they never match candidate:* scans
+CREATED_INDEX_KEY = "candidates:by_created"
+STATUS_INDEX_PREFIX = "candidates:by_status"
+
+
+def candidate_key(candidate_id: str) -> str:
+    return f"candidate:{candidate_id}"
+
+
+def status_index_key(status: CandidateStatus) -> str:
+    return f"{STATUS_INDEX_PREFIX}:{CandidateStatus(status).value}"
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _decode(member) -> str:
+    return member.decode("utf-8") if isinstance(member, bytes) else member
+
+
+def index_candidate(pipe, candidate: Candidate, created_ms: int) -> None:
+    """Queue the index updates for `candidate` on a pipeline."""
+    pipe.zadd(CREATED_INDEX_KEY, {candidate.candidate_id: created_ms})
+    for status in CandidateStatus:
+        if status == candidate.status:
+            pipe.zadd(status_index_key(status), {candidate.candidate_id: created_ms})
+        else:
+            pipe.zrem(status_index_key(status), candidate.candidate_id)
+
+
+def prune_expired(pipe, ttl_seconds: int = CANDIDATE_TTL_SECONDS) -> None:
+    """Queue removal of index entries whose records have expired by age."""
+    cutoff = f"({_now_ms() - ttl_seconds * 1000}"
+    for key in (CREATED_INDEX_KEY, *(status_index_key(status) for status in CandidateStatus)):
+        pipe.zremrangebyscore(key, "-inf", cutoff)
+
+
+def save_candidate(
+    redis_conn: Redis, candidate: Candidate, created_ms: Optional[int] = None,
+    ttl_seconds: int = CANDIDATE_TTL_SECONDS,
+) -> None:
+    """Store the candidate record and index it, in one round trip."""
+    pipe = redis_conn.pipeline()
+    pipe.set(candidate_key(candidate.candidate_id), candidate.json(), ex=ttl_seconds)
+    index_candidate(pipe, candidate, created_ms if created_ms is not None else _now_ms())
+    prune_expired(pipe, ttl_seconds)
+    pipe.execute()
+
+
+def encode_cursor(created_ms: int, candidate_id: str) -> str:
+    return f"{created_ms}:{candidate_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    """Inverse of `encode_cursor`; ValueError for anything else."""
+    created, _, candidate_id = cursor.partition(":")
+    if not candidate_id:
+        raise ValueError(f"Invalid cursor {cursor!r}")
+    return int(created), candidate_id
+
+
+def list_candidates_page(
+    redis_conn: Redis,
+    limit: int,
+    cursor: Optional[str] = None,
+    status: Optional[CandidateStatus] = None,
+    skip: int = 0,
+) -> Tuple[List[Candidate], Optional[str]]:
+    """
+    One page of candidates, newest first, and the cursor for the next page
+    (None on the last page).
+
+    Pages are read from the created-time index (or a status index) with
+    keyset pagination: the cursor is the last row's (created ms, id), so each
+    page costs O(log N + limit) however deep it is. Ids sharing the cursor's
+    timestamp sort by id, and those already returned are skipped. Records
+    are fetched with a single MGET; ids whose record has expired are
+    dropped from the indexes.
+    """
+    index_key = status_index_key(status) if status is not None else CREATED_INDEX_KEY
+    if cursor is None:
+        rows = redis_conn.zrevrange(index_key, skip, skip + limit, withscores=True)
+    else:
+        created_ms, last_id = decode_cursor(cursor)
+        # Rows tied with the cursor's timestamp may precede it in this page
+        ties = redis_conn.zcount(index_key, created_ms, created_ms)
+        rows = redis_conn.zrevrangebyscore(index_key, created_ms, "-inf", start=0, num=limit + ties + 1, withscores=True)
+        rows = [
+            (member, score) for member, score in rows
+            if int(score) < created_ms or _decode(member) < last_id
+        ]
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return [], None
+
+    ids = [_decode(member) for member, _ in rows]
+    records = redis_conn.mget([candidate_key(candidate_id) for candidate_id in ids])
+    candidates = []
+    expired = []
+    for candidate_id, record in zip(ids, records):
+        if record:
+            candidates.append(Candidate.parse_raw(record))
+        else:
+            expired.append(candidate_id)
+    if expired:
+        pipe = redis_conn.pipeline()
+        pipe.zrem(CREATED_INDEX_KEY, *expired)
+        for status_value in CandidateStatus:
+            pipe.zrem(status_index_key(status_value), *expired)
+        pipe.execute()
+
+    last_member, last_score = rows[-1]
+    next_cursor = encode_cursor(int(last_score), _decode(last_member)) if has_more else None
+    return candidates, next_cursor
+
+
+def iter_candidates(redis_conn: Redis, batch_size: int = 500) -> Iterator[Candidate]:
+    """
+    Every indexed candidate, newest first, read with one MGET per
+    `batch_size` ids; records that have expired are skipped.
+    """
+    start = 0
+    while True:
+        rows = redis_conn.zrevrange(CREATED_INDEX_KEY, start, start + batch_size - 1, withscores=True)
+        if not rows:
+            return
+        records = redis_conn.mget([candidate_key(_decode(member)) for member, _ in rows])
+        for record in records:
+            if record:
+                yield Candidate.parse_raw(record)
+        if len(rows) < batch_size:
+            return
+        start += batch_size
+
+
+def rebuild_candidate_index(redis_conn: Redis, batch_size: int = 500) -> int:
+    """
+    Index every stored candidate record, for records written before the
+    index existed. Creation time is recovered from the remaining TTL.
+    Uses SCAN, so run it once offline rather than per request.
+    """
+    indexed = 0
+    batch: List[bytes] = []
+
+    def flush() -> int:
+        read = redis_conn.pipeline()
+        for key in batch:
+            read.get(key)
+            read.pttl(key)
+        results = read.execute()
+        write = redis_conn.pipeline()
+        count = 0
+        for record, pttl in zip(results[::2], results[1::2]):
+            if not record:
+                continue
+            candidate = Candidate.parse_raw(record)
+            age_ms = CANDIDATE_TTL_SECONDS * 1000 - pttl if pttl and pttl > 0 else 0
+            index_candidate(write, candidate, _now_ms() - age_ms)
+            count += 1
+        write.execute()
+        return count
+
+    for key in redis_conn.scan_iter("candidate:*", count=batch_size):
+        # Skip per-candidate sub-keys such as candidate:{id}:applications
+        if _decode(key).count(":") != 1:
+            continue
+        batch.append(key)
+        if len(batch) >= batch_size:
+            indexed += flush()
+            batch = []
+    if batch:
+        indexed += flush()
+    logger.info(f"Indexed {indexed} candidates")
+    return indexed
@@ -0,0 +1,222 @@
+import re
+import hashlib
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set
+from urllib.parse import urlsplit, urlunsplit
+
+import numpy as np
+
+from ..models import Job
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    "from", "vjs", "tk", "advn", "adid", "sjdu", "fccid", "refid", "ref", "src", "source",
+    "trk", "trackingid", "gclid", "fbclid", "mc_cid", "mc_eid",
+}
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 64
+# Documents are signed in chunks to bound the (shingles x permutations) matrix
+MINHASH_CHUNK_DOCS = 1024
+
+_rng = np.random.default_rng(0x5EED)
+# Odd 64-bit multipliers combining token hashes into shingle hashes, and
+# band rows into band keys; fixed so signatures are stable across runs
+_SHINGLE_MULTIPLIERS = _rng.integers(0, 2**63, size=SHINGLE_SIZE, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_BAND_MULTIPLIERS = _rng.integers(0, 2**63, size=NUM_PERMUTATIONS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+# Multiply-shift hash functions (a * x + b) >> 32 standing in for random permutations
+_PERMUTATION_A = _rng.integers(0, 2**63, size=NUM_PERMUTATIONS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_PERMUTATION_B = _rng.integers(0, 2**63, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_EMPTY = np.iinfo(np.uint32).max
+
+
+def _is_tracking_param(key: str) -> bool:
+    return key in TRACKING_PARAMS or key.startswith("utm_")
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of a posting URL: https, lower-case host without "www.",
+    no fragment, no tracking parameters and a sorted query string.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/") or "/"
+    query = sorted(
+        pair for pair in parts.query.split("&")
+        if pair and not _is_tracking_param(pair.partition("=")[0].lower())
+    )
+    return urlunsplit(("https", host, path, "&".join(query), ""))
+
+
+def job_text(job: Job) -> str:
+    """The text a posting's near-duplicate signature is computed from."""
+    return f"{job.title} {job.company} {job.description or ''}"
+
+
+def _mix64(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer, so combined hashes have well-spread bits."""
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+class _TokenHasher:
+    """Stable 64-bit token hashes, memoized since job vocabularies repeat heavily."""
+
+    def __init__(self):
+        self._hashes: Dict[str, int] = {}
+
+    def _hash(self, token: str) -> int:
+        value = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+        self._hashes[token] = value
+        return value
+
+    def __call__(self, tokens: Iterable[str]) -> np.ndarray:
+        hashes = self._hashes
+        return np.fromiter(
+            (hashes[token] if token in hashes else self._hash(token) for token in tokens), dtype=np.uint64
+        )
+
+
+def _chunk_shingles(texts: List[str], token_hasher: _TokenHasher):
+    """
+    Word 3-shingle hashes for a chunk of texts, concatenated in text order,
+    and the number of shingles per text. Texts shorter than a shingle use
+    their single tokens instead.
+    """
+    token_lists = [TOKEN_RE.findall(text.lower()) for text in texts]
+    counts = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(token_lists))
+    tokens = token_hasher(chain.from_iterable(token_lists))
+
+    padded = np.concatenate((tokens, np.zeros(SHINGLE_SIZE - 1, dtype=np.uint64)))
+    combined = np.zeros(len(tokens), dtype=np.uint64)
+    for offset in range(SHINGLE_SIZE):
+        combined += padded[offset:offset + len(tokens)] * _SHINGLE_MULTIPLIERS[offset]
+
+    starts = np.cumsum(counts) - counts
+    position = np.arange(len(tokens)) - np.repeat(starts, counts)
+    length = np.repeat(counts, counts)
+    long_text = length >= SHINGLE_SIZE
+    # Keep full windows in long texts and every token in short ones
+    keep = ~long_text | (position <= length - SHINGLE_SIZE)
+    hashes = _mix64(np.where(long_text, combined, tokens)[keep])
+    shingles = np.where(counts >= SHINGLE_SIZE, counts - (SHINGLE_SIZE - 1), counts)
+    return hashes, shingles
+
+
+def minhash_signatures(texts: Iterable[str]) -> np.ndarray:
+    """
+    MinHash signatures (one row of NUM_PERMUTATIONS uint32s per text) over
+    word 3-shingles.
+
+    Shingles for a chunk of documents are hashed in one array, permuted all
+    at once, and reduced per document with a single minimum.reduceat, so
+    the per-document Python work is only tokenizing. Texts with no tokens
+    get an all-max signature that matches nothing.
+    """
+    token_hasher = _TokenHasher()
+    texts = list(texts)
+    signatures = np.full((len(texts), NUM_PERMUTATIONS), _EMPTY, dtype=np.uint32)
+    for chunk_start in range(0, len(texts), MINHASH_CHUNK_DOCS):
+        hashes, shingles = _chunk_shingles(texts[chunk_start:chunk_start + MINHASH_CHUNK_DOCS], token_hasher)
+        non_empty = np.flatnonzero(shingles)
+        if not len(non_empty):
+            continue
+        # Permutation-major layout so reduceat runs along contiguous rows
+        permuted = _PERMUTATION_A[:, None] * hashes[None, :]
+        permuted += _PERMUTATION_B[:, None]
+        permuted >>= np.uint64(32)
+        offsets = np.cumsum(shingles)[non_empty] - shingles[non_empty]
+        minima = np.minimum.reduceat(permuted.astype(np.uint32), offsets, axis=1)
+        signatures[chunk_start + non_empty] = minima.T
+    return signatures
+
+
+def band_keys(signatures: np.ndarray, bands: int) -> np.ndarray:
+    """One 64-bit key per (signature, band); equal bands give equal keys."""
+    rows = signatures.shape[1] // bands
+    grouped = signatures.reshape(len(signatures), bands, rows).astype(np.uint64)
+    combined = (grouped * _BAND_MULTIPLIERS[:rows]).sum(axis=2, dtype=np.uint64)
+    # Fold the band number in so equal rows in different bands don't collide
+    combined += np.arange(bands, dtype=np.uint64) * _BAND_MULTIPLIERS[-1]
+    return _mix64(combined)
+
+
+def estimated_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Jaccard similarity of two shingle sets, estimated from their signatures."""
+    return float(np.count_nonzero(a == b)) / len(a)
+
+
+class JobDeduplicator:
+    """
+    Collapses exact and near-duplicate postings, keeping the first seen.
+
+    Exact duplicates share a canonical URL. Near duplicates have an
+    estimated shingle Jaccard similarity of at least `threshold`. Signatures
+    are split into `bands` bands; only postings that agree on a whole band
+    are compared, which finds pairs above ~0.7 similarity with the default
+    16 bands of 4 rows while skipping almost all unrelated pairs.
+    """
+
+    def __init__(self, threshold: float = 0.7, bands: int = 16):
+        if NUM_PERMUTATIONS % bands:
+            raise ValueError(f"bands must divide {NUM_PERMUTATIONS}")
+        self.threshold = threshold
+        self.bands = bands
+        self._urls: Set[str] = set()
+        self._signatures: List[np.ndarray] = []
+        self._buckets: Dict[int, List[int]] = {}
+        self.url_duplicates = 0
+        self.near_duplicates = 0
+
+    def add(self, job: Job, signature: Optional[np.ndarray] = None, keys: Optional[List[int]] = None) -> bool:
+        """
+        Record `job`; False if it duplicates one already added. `signature`
+        and its band `keys` can be passed in when computed in bulk.
+        """
+        url = canonicalize_url(job.url)
+        if url in self._urls:
+            self.url_duplicates += 1
+            return False
+        self._urls.add(url)
+
+        if signature is None:
+            signature = minhash_signatures([job_text(job)])[0]
+        if signature[0] == _EMPTY:
+            return True
+        if keys is None:
+            keys = band_keys(signature[None, :], self.bands)[0].tolist()
+
+        seen: Set[int] = set()
+        for key in keys:
+            for other in self._buckets.get(key, ()):
+                if other in seen:
+                    continue
+                seen.add(other)
+                if estimated_similarity(signature, self._signatures[other]) >= self.threshold:
+                    self.near_duplicates += 1
+                    return False
+
+        position = len(self._signatures)
+        self._signatures.append(signature)
+        for key in keys:
+            self._buckets.setdefault(key, []).append(position)
+        return True
+
+
+def dedupe_jobs(jobs: List[Job], threshold: float = 0.7) -> List[Job]:
+    """Drop exact and near-duplicate postings, keeping the first of each group."""
+    deduplicator = JobDeduplicator(threshold=threshold)
+    signatures = minhash_signatures(job_text(job) for job in jobs)
+    keys = band_keys(signatures, deduplicator.bands).tolist()
+    return [
+        job for job, signature, job_keys in zip(jobs, signatures, keys)
+        if deduplicator.add(job, signature, job_keys)
+    ]
@@ -1,79 +1,329 @@
 import os
+import time
+import uuid
 import logging
-from google.cloud import documentai
-from typing import Dict, Any
+import threading
+from urllib.parse import quote
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .uploads import SNIFF_BYTES, sniff_mime
 
 logger = logging.getLogger(__name__)
 
-def parse_with_docai(file_path: str) -> Dict[str, Any]:
+# Part of the parse cache key: bump when the mapping from Document AI
+# entities changes; results from another processor are never reused
+PARSER_VERSION = f"{os.getenv('GOOGLE_DOCAI_PROCESSOR_ID', '')}/1"
+
+DOCAI_LOCATION = os.getenv("GOOGLE_CLOUD_LOCATION", "us")  # Default to US
+# host:port of a plaintext gRPC endpoint to use instead of Google's, e.g. a local fake processor
+DOCAI_ENDPOINT = os.getenv("GOOGLE_DOCAI_ENDPOINT", "")
+# Batch mode stages resumes and results under this gs://bucket/prefix; unset disables it
+DOCAI_BATCH_GCS_URI = os.getenv("GOOGLE_DOCAI_BATCH_GCS_URI", "")
+# Fewer resumes than this are parsed one request each: a batch operation takes tens of seconds to start
+DOCAI_BATCH_MIN_FILES = int(os.getenv("GOOGLE_DOCAI_BATCH_MIN_FILES", "20"))
+DOCAI_BATCH_TIMEOUT_SECONDS = int(os.getenv("GOOGLE_DOCAI_BATCH_TIMEOUT_SECONDS", "1800"))
+
+# Image formats Document AI accepts besides PDF, by their leading bytes
+IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+    (b"GIF8", "image/gif"),
+    (b"BM", "image/bmp"),
+)
+
+# (parsed data, error) for each file of a batch
+BatchResult = Tuple[Optional[Dict[str, Any]], Optional[str]]
+
+
+def detect_mime_type(head: bytes, filename: str = "") -> str:
+    """The MIME type to send Document AI for a file starting with `head`."""
+    mime_type = sniff_mime(head, filename)
+    if mime_type is not None:
+        return mime_type
+    for signature, image_type in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return image_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    raise ValueError("Unsupported document type for Document AI")
+
+
+def processor_name() -> str:
+    # Get the processor details from environment variables
+    project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
+    processor_id = os.getenv("GOOGLE_DOCAI_PROCESSOR_ID")
+    if not all([project_id, processor_id]):
+        raise ValueError("Missing required Google Cloud configuration")
+    return f"projects/{project_id}/locations/{DOCAI_LOCATION}/processors/{processor_id}"
+
+
+def create_docai_client(transport: Any = None) -> Any:
+    """
+    A Document AI client over `transport` (a DocumentProcessorServiceTransport,
+    e.g. one wrapping a channel to a fake processor), or over GOOGLE_DOCAI_ENDPOINT
+    if set, or else over the processor's regional Google endpoint.
+    """
+    # Imported here: the client library is slow to import and only parsers need it
+    from google.cloud import documentai
+
+    if transport is None and DOCAI_ENDPOINT:
+        import grpc
+        from google.cloud.documentai_v1.services.document_processor_service.transports import (
+            DocumentProcessorServiceGrpcTransport,
+        )
+
+        transport = DocumentProcessorServiceGrpcTransport(channel=grpc.insecure_channel(DOCAI_ENDPOINT))
+    if transport is not None:
+        return documentai.DocumentProcessorServiceClient(transport=transport)
+    # Processors outside the US are only served from their regional endpoint
+    return documentai.DocumentProcessorServiceClient(
+        client_options={"api_endpoint": f"{DOCAI_LOCATION}-documentai.googleapis.com"}
+    )
+
+
+_client: Any = None
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+
+
+def get_docai_client() -> Any:
+    """
+    Process-wide Document AI client. Its gRPC channel, with the connection
+    and credentials behind it, is reused by every parse in the process; a
+    forked process builds its own, as channels do not survive fork.
+    """
+    global _client, _client_pid
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = create_docai_client()
+            _client_pid = os.getpid()
+        return _client
+
+
+def entities_to_resume(entities: Iterable[Any]) -> Dict[str, Any]:
+    """Parsed resume data in the standardized format from Document AI entities."""
+    # Note: This is a basic implementation. Adjust the parsing logic based on
+    # your Document AI processor's output structure
+    parsed_data = {
+        "name": "",
+        "email": "",
+        "mobile_number": "",
+        "skills": [],
+        "experience": [],
+        "education": []
+    }
+
+    # Process entities from Document AI
+    for entity in entities:
+        if entity.type_ == "person_name":
+            parsed_data["name"] = entity.mention_text
+        elif entity.type_ == "email_address":
+            parsed_data["email"] = entity.mention_text
+        elif entity.type_ == "phone_number":
+            parsed_data["mobile_number"] = entity.mention_text
+        elif entity.type_ == "skill":
+            parsed_data["skills"].append(entity.mention_text)
+        # Add more entity mappings as needed
+
+    return parsed_data
+
+
+def parse_with_docai(file_path: str, client: Any = None) -> Dict[str, Any]:
     """
     Parse a resume using Google Document AI.
-    
+
     Args:
         file_path (str): Path to the resume file
-        
+        client: Document AI client to use instead of the process-wide one
+
     Returns:
         Dict[str, Any]: Parsed resume data in a standardized format
     """
+    from google.cloud import documentai
+
     try:
-        # Initialize Document AI client
-        client = documentai.DocumentProcessorServiceClient()
-        
-        # Get the processor details from environment variables
-        project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
-        location = os.getenv("GOOGLE_CLOUD_LOCATION", "us")  # Default to US
-        processor_id = os.getenv("GOOGLE_DOCAI_PROCESSOR_ID")
-        
-        if not all([project_id, processor_id]):
-            raise ValueError("Missing required Google Cloud configuration")
-            
-        name = f"projects/{project_id}/locations/{location}/processors/{processor_id}"
-        
+        client = client or get_docai_client()
+        name = processor_name()
+
         # Read the file
         with open(file_path, "rb") as file:
             document_content = file.read()
-            
+
         # Create the document object
         raw_document = documentai.RawDocument(
             content=document_content,
-            mime_type="application/pdf"  # Assuming PDF, adjust if needed
+            mime_type=detect_mime_type(document_content[:SNIFF_BYTES], file_path)
         )
-        
+
         # Process the document
         request = documentai.ProcessRequest(
             name=name,
             raw_document=raw_document
         )
-        
+
         result = client.process_document(request=request)
-        document = result.document
-        
-        # Extract and structure the data
-        # Note: This is a basic implementation. Adjust the parsing logic based on
-        # your Document AI processor's output structure
-        parsed_data = {
-            "name": "",
-            "email": "",
-            "mobile_number": "",
-            "skills": [],
-            "experience": [],
-            "education": []
-        }
-        
-        # Process entities from Document AI
-        for entity in document.entities:
-            if entity.type_ == "person_name":
-                parsed_data["name"] = entity.mention_text
-            elif entity.type_ == "email_address":
-                parsed_data["email"] = entity.mention_text
-            elif entity.type_ == "phone_number":
-                parsed_data["mobile_number"] = entity.mention_text
-            elif entity.type_ == "skill":
-                parsed_data["skills"].append(entity.mention_text)
-            # Add more entity mappings as needed
-        
-        return parsed_data
-        
+        return entities_to_resume(result.document.entities)
+
     except Exception as e:
         logger.error(f"Error in Document AI parsing: {str(e)}")
-        raise 
\ No newline at end of file
+        raise
+
+
+def split_gcs_uri(uri: str) -> Tuple[str, str]:
+    bucket, _, name = uri[len("gs://"):].partition("/")
+    return bucket, name
+
+
+class GcsStorage:
+    """
+    The Cloud Storage calls batch mode needs, over the JSON API with the
+    default credentials. Batch tests and benchmarks pass an in-memory store
+    with the same methods instead.
+    """
+
+    API = "https://storage.googleapis.com"
+
+    def __init__(self, session: Any = None):
+        self._session = session
+
+    @property
+    def session(self) -> Any:
+        if self._session is None:
+            import google.auth
+            from google.auth.transport.requests import AuthorizedSession
+
+            credentials, _ = google.auth.default(scopes=["https://www.googleapis.com/auth/devstorage.read_write"])
+            self._session = AuthorizedSession(credentials)
+        return self._session
+
+    def upload(self, uri: str, data: bytes, content_type: str) -> None:
+        bucket, name = split_gcs_uri(uri)
+        response = self.session.post(
+            f"{self.API}/upload/storage/v1/b/{bucket}/o",
+            params={"uploadType": "media", "name": name},
+            data=data,
+            headers={"Content-Type": content_type},
+        )
+        response.raise_for_status()
+
+    def list(self, prefix_uri: str) -> List[str]:
+        bucket, prefix = split_gcs_uri(prefix_uri)
+        uris, page_token = [], None
+        while True:
+            params = {"prefix": prefix, "fields": "items(name),nextPageToken"}
+            if page_token:
+                params["pageToken"] = page_token
+            response = self.session.get(f"{self.API}/storage/v1/b/{bucket}/o", params=params)
+            response.raise_for_status()
+            page = response.json()
+            uris += [f"gs://{bucket}/{item['name']}" for item in page.get("items", [])]
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                return uris
+
+    def download(self, uri: str) -> bytes:
+        bucket, name = split_gcs_uri(uri)
+        response = self.session.get(f"{self.API}/storage/v1/b/{bucket}/o/{quote(name, safe='')}", params={"alt": "media"})
+        response.raise_for_status()
+        return response.content
+
+    def delete(self, uri: str) -> None:
+        bucket, name = split_gcs_uri(uri)
+        self.session.delete(f"{self.API}/storage/v1/b/{bucket}/o/{quote(name, safe='')}")
+
+
+def _read_batch_output(storage: Any, output_uri: str) -> Dict[str, Any]:
+    from google.cloud import documentai
+
+    # Large documents are written as several JSON shards
+    entities = []
+    for uri in sorted(storage.list(output_uri.rstrip("/") + "/")):
+        if uri.endswith(".json"):
+            shard = documentai.Document.from_json(storage.download(uri), ignore_unknown_fields=True)
+            entities.extend(shard.entities)
+    return entities_to_resume(entities)
+
+
+def parse_batch_with_docai(
+    file_paths: List[str],
+    gcs_uri: Optional[str] = None,
+    client: Any = None,
+    storage: Any = None,
+    timeout: float = DOCAI_BATCH_TIMEOUT_SECONDS,
+) -> Dict[str, BatchResult]:
+    """
+    Parse many resumes in one Document AI batch operation.
+
+    The files are uploaded under a new prefix of `gcs_uri` (by default
+    GOOGLE_DOCAI_BATCH_GCS_URI), the processor writes one result per file
+    next to them, and the operation's per-document statuses map each
+    result back to its file. Everything staged is deleted afterwards.
+
+    Returns:
+        Dict[str, BatchResult]: (parsed data, None) or (None, error) for every path
+    """
+    from google.cloud import documentai
+
+    gcs_uri = gcs_uri or DOCAI_BATCH_GCS_URI
+    if not gcs_uri.startswith("gs://"):
+        raise ValueError("Document AI batch mode needs GOOGLE_DOCAI_BATCH_GCS_URI (gs://bucket/prefix)")
+    client = client or get_docai_client()
+    storage = storage or GcsStorage()
+    prefix = f"{gcs_uri.rstrip('/')}/{uuid.uuid4().hex}"
+
+    results: Dict[str, BatchResult] = {}
+    inputs: Dict[str, str] = {}
+    documents = []
+    try:
+        for index, file_path in enumerate(file_paths):
+            try:
+                with open(file_path, "rb") as file:
+                    content = file.read()
+                mime_type = detect_mime_type(content[:SNIFF_BYTES], file_path)
+            except (OSError, ValueError) as e:
+                results[file_path] = (None, str(e))
+                continue
+            # Numbered, so files with the same name do not collide
+            uri = f"{prefix}/input/{index}{os.path.splitext(file_path)[1].lower()}"
+            storage.upload(uri, content, mime_type)
+            inputs[uri] = file_path
+            documents.append(documentai.GcsDocument(gcs_uri=uri, mime_type=mime_type))
+
+        if documents:
+            start = time.perf_counter()
+            operation = client.batch_process_documents(request=documentai.BatchProcessRequest(
+                name=processor_name(),
+                input_documents=documentai.BatchDocumentsInputConfig(
+                    gcs_documents=documentai.GcsDocuments(documents=documents)
+                ),
+                document_output_config=documentai.DocumentOutputConfig(
+                    gcs_output_config=documentai.DocumentOutputConfig.GcsOutputConfig(gcs_uri=f"{prefix}/output/")
+                ),
+            ))
+            operation.result(timeout=timeout)
+            for status in operation.metadata.individual_process_statuses:
+                file_path = inputs.get(status.input_gcs_source)
+                if file_path is None:
+                    continue
+                if status.status.code:
+                    results[file_path] = (None, status.status.message or f"Document AI status {status.status.code}")
+                else:
+                    results[file_path] = (_read_batch_output(storage, status.output_gcs_destination), None)
+            logger.info(f"Document AI batch of {len(documents)} resumes took {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        logger.error(f"Error in Document AI batch parsing: {str(e)}")
+        # Including files a failed upload never got to
+        for file_path in file_paths:
+            results.setdefault(file_path, (None, f"Document AI batch failed: {str(e)}"))
+    finally:
+        try:
+            for uri in storage.list(prefix + "/"):
+                storage.delete(uri)
+        except Exception as e:
+            logger.warning(f"Could not clean up Document AI batch files under {prefix}: {str(e)}")
+
+    for file_path in file_paths:
+        results.setdefault(file_path, (None, "Missing from the Document AI batch results"))
+    return results
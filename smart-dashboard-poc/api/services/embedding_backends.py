@@ -0,0 +1,348 @@
+import os
+import math
+import time
+import zlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+import numpy as np
+import redis
+from redis import Redis
+
+from ..deps import get_redis
+from .embedding_batcher import get_embedding_batcher
+from .lexical_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+SETTINGS_KEY = "settings:embedding_backend"
+# Remote backend while it is healthy, local backend while it is not
+AUTO = "auto"
+DEFAULT_BACKEND = os.getenv("EMBEDDING_BACKEND", AUTO)
+LOCAL_EMBEDDING_DIM = int(os.getenv("LOCAL_EMBEDDING_DIM", "512"))
+# Words (and, separately, word bigrams) whose features the local backend memoizes
+LOCAL_EMBEDDING_MEMO_SIZE = int(os.getenv("LOCAL_EMBEDDING_MEMO_SIZE", "200000"))
+FALLBACK_LATENCY_SECONDS = float(os.getenv("EMBEDDING_FALLBACK_LATENCY_MS", "2000")) / 1000
+FALLBACK_COOLDOWN_SECONDS = float(os.getenv("EMBEDDING_FALLBACK_COOLDOWN_SECONDS", "60"))
+# The backend setting is re-read from Redis at most this often per process
+SETTINGS_TTL_SECONDS = 5.0
+
+
+class EmbeddingBackend(ABC):
+    """
+    One way of turning text into vectors. Subclasses set `name` (what the
+    settings store selects) and `model`, which identifies the vector space:
+    cached vectors, stored candidate vectors and the job corpus are keyed
+    by it, so vectors from different backends are never compared.
+    """
+
+    name: str = ""
+    model: str = ""
+    # Whether latency is monitored for the automatic fallback
+    remote: bool = False
+
+    @abstractmethod
+    async def embed(self, text: str) -> np.ndarray:
+        """The vector for `text`."""
+
+
+_registry: Dict[str, Type[EmbeddingBackend]] = {}
+
+
+def register_backend(backend_class: Type[EmbeddingBackend]) -> Type[EmbeddingBackend]:
+    _registry[backend_class.name] = backend_class
+    return backend_class
+
+
+@register_backend
+class OpenAIBackend(EmbeddingBackend):
+    name = "openai"
+    remote = True
+
+    def __init__(self, model: str = EMBEDDING_MODEL):
+        self.model = model
+
+    async def embed(self, text: str) -> np.ndarray:
+        # Concurrent calls are coalesced into batched requests over a shared client
+        return await get_embedding_batcher(self.model).embed(text)
+
+
+def _feature_hash(feature: str) -> Tuple[int, float]:
+    """Bucket and sign of a feature; crc32 is stable across processes."""
+    value = zlib.crc32(feature.encode("utf-8"))
+    return value >> 1, 1.0 if value & 1 else -1.0
+
+
+@register_backend
+class HashingBackend(EmbeddingBackend):
+    """
+    Offline embeddings from signed feature hashing of word unigrams, word
+    bigrams and character 3-grams of each word, with sublinear term
+    frequencies, L2-normalized. Character n-grams let "postgres" and
+    "postgresql" share most of their weight. No network and no model file;
+    a few thousand job descriptions per second on one core.
+    """
+
+    name = "local"
+    BIGRAM_WEIGHT = 0.5
+
+    def __init__(self, dim: int = LOCAL_EMBEDDING_DIM, memo_size: int = LOCAL_EMBEDDING_MEMO_SIZE):
+        self.dim = dim
+        self.model = f"local-hashing-v1-{dim}"
+        self.memo_size = memo_size
+        self._lock = threading.Lock()
+        # Memoized features: word -> id, each word's (bucket, signed weight)
+        # pairs for its unigram and char n-grams laid out back to back, and
+        # the batch that last used each word, for evicting the least recent
+        self._word_ids: Dict[str, int] = {}
+        self._last_used = np.zeros(0, dtype=np.int64)
+        self._batches = 0
+        self._word_starts: List[int] = []
+        self._word_lengths: List[int] = []
+        self._feature_buckets: List[int] = []
+        self._feature_weights: List[float] = []
+        self._arrays: Optional[Tuple[np.ndarray, ...]] = None
+        self._bigrams: "OrderedDict[Tuple[str, str], Tuple[int, float]]" = OrderedDict()
+
+    def _evict(self) -> None:
+        """
+        Drop the least recently used quarter of the memoized words once
+        there are more than `memo_size`, compacting the feature lists. Runs
+        between batches, as it renumbers word ids.
+        """
+        count = len(self._word_starts)
+        if count <= self.memo_size:
+            return
+        # Ids are assigned in insertion order, which the dict preserves
+        words = list(self._word_ids)
+        keep = np.sort(np.argsort(self._last_used[:count], kind="stable")[-(self.memo_size * 3 // 4):])
+        starts, lengths = self._word_starts, self._word_lengths
+        buckets, weights = self._feature_buckets, self._feature_weights
+        self._word_ids = {}
+        self._word_starts, self._word_lengths, self._feature_buckets, self._feature_weights = [], [], [], []
+        for old_id in keep.tolist():
+            start, length = starts[old_id], lengths[old_id]
+            self._word_ids[words[old_id]] = len(self._word_starts)
+            self._word_starts.append(len(self._feature_buckets))
+            self._word_lengths.append(length)
+            self._feature_buckets.extend(buckets[start:start + length])
+            self._feature_weights.extend(weights[start:start + length])
+        self._last_used = self._last_used[keep]
+        self._arrays = None
+
+    def _word_id(self, word: str) -> int:
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            padded = f"<{word}>"
+            grams = [padded[i:i + 3] for i in range(len(padded) - 2)]
+            hashed = [_feature_hash(word)] + [_feature_hash(f"#{gram}") for gram in grams]
+            # The word and its n-grams (together) carry equal weight
+            weights = [1.0] + [1.0 / len(grams)] * len(grams)
+            word_id = self._word_ids[word] = len(self._word_starts)
+            self._word_starts.append(len(self._feature_buckets))
+            self._word_lengths.append(len(hashed))
+            self._feature_buckets.extend(bucket % self.dim for bucket, _ in hashed)
+            self._feature_weights.extend(sign * weight for (_, sign), weight in zip(hashed, weights))
+            self._arrays = None
+        return word_id
+
+    def _feature_arrays(self) -> Tuple[np.ndarray, ...]:
+        if self._arrays is None:
+            self._arrays = (
+                np.array(self._word_starts, dtype=np.int64),
+                np.array(self._word_lengths, dtype=np.int64),
+                np.array(self._feature_buckets, dtype=np.int64),
+                np.array(self._feature_weights, dtype=np.float32),
+            )
+        return self._arrays
+
+    def _bigram_feature(self, bigram: Tuple[str, str]) -> Tuple[int, float]:
+        feature = self._bigrams.get(bigram)
+        if feature is not None:
+            self._bigrams.move_to_end(bigram)
+        else:
+            bucket, sign = _feature_hash(f"{bigram[0]} {bigram[1]}")
+            feature = self._bigrams[bigram] = (bucket % self.dim, sign * self.BIGRAM_WEIGHT)
+            if len(self._bigrams) > self.memo_size:
+                self._bigrams.popitem(last=False)
+        return feature
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed many texts at once as a (len(texts), dim) float32 matrix."""
+        word_ids: List[int] = []
+        word_rows: List[int] = []
+        word_counts: List[int] = []
+        bigram_cells: List[int] = []
+        bigram_weights: List[float] = []
+        with self._lock:
+            self._evict()
+            for row, text in enumerate(texts):
+                words = tokenize(text)
+                counts = Counter(words)
+                word_ids.extend(self._word_id(word) for word in counts)
+                word_counts.extend(counts.values())
+                word_rows.extend([row] * len(counts))
+                offset = row * self.dim
+                for bigram, count in Counter(zip(words, words[1:])).items():
+                    bucket, weight = self._bigram_feature(bigram)
+                    bigram_cells.append(offset + bucket)
+                    bigram_weights.append(weight * (1.0 + math.log(count)))
+            starts, lengths, feature_buckets, feature_weights = self._feature_arrays()
+            ids = np.array(word_ids, dtype=np.int64)
+            if len(self._last_used) < len(starts):
+                self._last_used = np.concatenate((self._last_used, np.zeros(len(starts), dtype=np.int64)))
+            self._batches += 1
+            self._last_used[ids] = self._batches
+
+        # Expand every (text, word) pair into that word's features
+        per_word = lengths[ids]
+        positions = np.repeat(starts[ids] - np.cumsum(per_word) + per_word, per_word) + np.arange(per_word.sum())
+        tf = 1.0 + np.log(np.array(word_counts, dtype=np.float32))
+        cells = np.repeat(np.array(word_rows, dtype=np.int64) * self.dim, per_word) + feature_buckets[positions]
+        weights = np.repeat(tf, per_word) * feature_weights[positions]
+
+        flat = np.bincount(
+            np.concatenate((cells, np.array(bigram_cells, dtype=np.int64))),
+            weights=np.concatenate((weights, np.array(bigram_weights, dtype=np.float32))),
+            minlength=len(texts) * self.dim,
+        )
+        matrix = flat.astype(np.float32).reshape(len(texts), self.dim)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    async def embed(self, text: str) -> np.ndarray:
+        return self.embed_batch([text])[0]
+
+
+class LatencyMonitor:
+    """
+    Recent latency of a remote backend, as an exponentially weighted
+    average. A failed call, or an average above `max_latency` seconds, trips
+    the monitor for `cooldown` seconds; after that the backend is tried
+    again with a fresh average.
+    """
+
+    def __init__(
+        self,
+        max_latency: float = FALLBACK_LATENCY_SECONDS,
+        cooldown: float = FALLBACK_COOLDOWN_SECONDS,
+        smoothing: float = 0.3,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_latency = max_latency
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._average: Optional[float] = None
+        self._tripped_until = 0.0
+        self._counters = {"calls": 0, "failures": 0, "trips": 0}
+
+    @property
+    def tripped(self) -> bool:
+        return self._clock() < self._tripped_until
+
+    def observe(self, latency: float) -> None:
+        with self._lock:
+            self._counters["calls"] += 1
+            if self._average is None:
+                self._average = latency
+            else:
+                self._average += self.smoothing * (latency - self._average)
+            if self._average > self.max_latency:
+                self._trip(f"average latency {self._average * 1000:.0f} ms")
+
+    def failure(self) -> None:
+        with self._lock:
+            self._counters["calls"] += 1
+            self._counters["failures"] += 1
+            self._trip("a failed call")
+
+    def _trip(self, reason: str) -> None:
+        if not self.tripped:
+            self._counters["trips"] += 1
+            logger.warning(f"Embedding backend tripped by {reason}; using the fallback for {self.cooldown:.0f}s")
+        self._tripped_until = self._clock() + self.cooldown
+        self._average = None
+
+    def stats(self) -> Dict[str, object]:
+        return {**self._counters, "average_latency_ms": None if self._average is None else round(self._average * 1000, 1),
+                "tripped": self.tripped}
+
+
+_backends: Dict[str, EmbeddingBackend] = {}
+_monitors: Dict[str, LatencyMonitor] = {}
+_setting: Tuple[float, str] = (0.0, DEFAULT_BACKEND)
+
+
+def backend_names() -> List[str]:
+    """Values the embedding backend setting accepts."""
+    return [AUTO, *_registry]
+
+
+def get_embedding_backend(name: str) -> EmbeddingBackend:
+    """Process-wide instance of a registered backend."""
+    if name not in _backends:
+        if name not in _registry:
+            raise ValueError(f"Unknown embedding backend {name!r}; expected one of {', '.join(backend_names())}")
+        _backends[name] = _registry[name]()
+    return _backends[name]
+
+
+def get_latency_monitor(backend: EmbeddingBackend) -> LatencyMonitor:
+    if backend.name not in _monitors:
+        _monitors[backend.name] = LatencyMonitor()
+    return _monitors[backend.name]
+
+
+def configured_backend(redis_conn: Optional[Redis] = None) -> str:
+    """The backend setting, re-read from Redis every SETTINGS_TTL_SECONDS."""
+    global _setting
+    expires, name = _setting
+    if time.monotonic() < expires:
+        return name
+    try:
+        value = (redis_conn or get_redis()).get(SETTINGS_KEY)
+        name = value.decode("utf-8") if value else DEFAULT_BACKEND
+    except redis.RedisError as e:
+        logger.warning(f"Could not read the embedding backend setting: {str(e)}")
+        name = DEFAULT_BACKEND
+    if name not in backend_names():
+        logger.warning(f"Ignoring unknown embedding backend setting {name!r}")
+        name = DEFAULT_BACKEND
+    _setting = (time.monotonic() + SETTINGS_TTL_SECONDS, name)
+    return name
+
+
+def invalidate_backend_setting() -> None:
+    global _setting
+    _setting = (0.0, DEFAULT_BACKEND)
+
+
+def select_embedding_backend(redis_conn: Optional[Redis] = None) -> EmbeddingBackend:
+    """
+    The backend to embed with now. In "auto" mode that is OpenAI unless its
+    latency monitor has tripped, in which case it is the local backend.
+    """
+    name = configured_backend(redis_conn)
+    if name != AUTO:
+        return get_embedding_backend(name)
+    primary = get_embedding_backend(OpenAIBackend.name)
+    if get_latency_monitor(primary).tripped:
+        return get_embedding_backend(HashingBackend.name)
+    return primary
+
+
+def fallback_backend(backend: EmbeddingBackend) -> Optional[EmbeddingBackend]:
+    """The backend to redo work with after `backend` failed; only in "auto" mode."""
+    if configured_backend() != AUTO or not backend.remote:
+        return None
+    return get_embedding_backend(HashingBackend.name)
+
+
+def backend_stats() -> Dict[str, Dict[str, object]]:
+    return {name: monitor.stats() for name, monitor in _monitors.items()}
@@ -0,0 +1,181 @@
+import os
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# OpenAI accepts up to 2048 inputs and ~300k tokens per embeddings request
+DEFAULT_MAX_BATCH_ITEMS = 256
+DEFAULT_MAX_BATCH_TOKENS = 100_000
+DEFAULT_MAX_IN_FLIGHT = 4
+
+
+def openai_client() -> Any:
+    # openai takes most of a second to import, so it is loaded with the first client
+    import openai
+
+    return openai.AsyncOpenAI()
+
+
+def approx_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+    return max(1, len(text) // 4)
+
+
+class EmbeddingBatcher:
+    """
+    Coalesce concurrent single-text embedding calls into batched API requests.
+
+    Callers keep awaiting `embed(text)` one text at a time. Every text queued
+    during the same event-loop turn is packed into as few `embeddings.create`
+    requests as the item/token limits allow, sent over one shared client, with
+    at most `max_in_flight` requests outstanding.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        max_batch_items: int = DEFAULT_MAX_BATCH_ITEMS,
+        max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        batch_window: float = 0.0,
+        client_factory: Callable[[], Any] = openai_client,
+    ):
+        self.model = model
+        self.max_batch_items = max_batch_items
+        self.max_batch_tokens = max_batch_tokens
+        self.max_in_flight = max_in_flight
+        self.batch_window = batch_window
+        self._client_factory = client_factory
+        # asyncio primitives and HTTP connections are bound to one event loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Any = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._counters = {"texts": 0, "requests": 0, "failed_requests": 0}
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._client = self._client_factory()
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._pending = []
+            self._flush_task = None
+        return loop
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed a single text; the request is batched with concurrent callers."""
+        loop = self._bind_loop()
+        future = loop.create_future()
+        # The API rejects empty strings, which would fail the whole batch
+        self._pending.append((text or " ", future))
+        if self._flush_task is None:
+            self._flush_task = loop.create_task(self._flush_soon())
+        return await future
+
+    async def embed_many(self, texts: List[str]) -> List[np.ndarray]:
+        return list(await asyncio.gather(*[self.embed(text) for text in texts]))
+
+    async def _flush_soon(self) -> None:
+        # Yield so every caller scheduled in this turn can enqueue first
+        await asyncio.sleep(self.batch_window)
+        pending, self._pending = self._pending, []
+        self._flush_task = None
+        await asyncio.gather(*[self._send(batch) for batch in self._make_batches(pending)])
+
+    def _make_batches(self, pending: List[Tuple[str, asyncio.Future]]) -> List[Dict[str, List[asyncio.Future]]]:
+        """Group pending texts into requests, sending each distinct text once."""
+        batches: List[Dict[str, List[asyncio.Future]]] = []
+        batch: Dict[str, List[asyncio.Future]] = {}
+        batch_tokens = 0
+
+        for text, future in pending:
+            if text in batch:
+                batch[text].append(future)
+                continue
+            tokens = approx_tokens(text)
+            if batch and (len(batch) >= self.max_batch_items or batch_tokens + tokens > self.max_batch_tokens):
+                batches.append(batch)
+                batch, batch_tokens = {}, 0
+            batch[text] = [future]
+            batch_tokens += tokens
+
+        if batch:
+            batches.append(batch)
+        return batches
+
+    @staticmethod
+    def _fail(batch: Dict[str, List[asyncio.Future]], error: Exception) -> None:
+        for futures in batch.values():
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+
+    async def _send(self, batch: Dict[str, List[asyncio.Future]]) -> None:
+        texts = list(batch)
+        async with self._semaphore:
+            self._counters["requests"] += 1
+            self._counters["texts"] += len(texts)
+            try:
+                response = await self._client.embeddings.create(input=texts, model=self.model)
+            except Exception as e:
+                self._counters["failed_requests"] += 1
+                logger.error(f"Embedding batch of {len(texts)} texts failed: {str(e)}")
+                self._fail(batch, e)
+                return
+
+        try:
+            for item in response.data:
+                vector = np.array(item.embedding, dtype=np.float32)
+                for future in batch[texts[item.index]]:
+                    if not future.done():
+                        future.set_result(vector)
+        except Exception as e:
+            # A malformed response must not leave callers waiting forever
+            self._counters["failed_requests"] += 1
+            logger.error(f"Malformed embedding response for a batch of {len(texts)} texts: {str(e)}")
+            self._fail(batch, e)
+            return
+
+        self._fail(batch, RuntimeError("Embedding missing from batch response"))
+
+    async def aclose(self) -> None:
+        """Close the shared client's connection pool."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            self._loop = None
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._counters)
+
+
+_batchers: Dict[str, EmbeddingBatcher] = {}
+
+
+def get_embedding_batcher(model: str) -> EmbeddingBatcher:
+    """Process-wide batcher for `model`, configured from the environment."""
+    if model not in _batchers:
+        _batchers[model] = EmbeddingBatcher(
+            model,
+            max_batch_items=int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", str(DEFAULT_MAX_BATCH_ITEMS))),
+            max_batch_tokens=int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", str(DEFAULT_MAX_BATCH_TOKENS))),
+            max_in_flight=int(os.getenv("EMBEDDING_MAX_IN_FLIGHT", str(DEFAULT_MAX_IN_FLIGHT))),
+        )
+    return _batchers[model]
+
+
+async def close_embedding_batchers() -> None:
+    """Close every batcher's client in this process."""
+    for batcher in _batchers.values():
+        await batcher.aclose()
+
+
+def batcher_stats() -> Dict[str, Dict[str, int]]:
+    """Counters of every batcher in this process, by model."""
+    return {model: batcher.stats() for model, batcher in _batchers.items()}
@@ -0,0 +1,195 @@
+import os
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import redis
+from redis import Redis
+
+from ..deps import get_redis
+from .vector_codec import FLOAT32, check_dtype, decode_vector, encode_vector, storage_dtype
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_KEY_PREFIX = "embedding"
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text before hashing so trivially different strings share a key."""
+    text = unicodedata.normalize("NFC", text or "")
+    return " ".join(text.split())
+
+
+def embedding_key(model: str, text: str) -> str:
+    """Content-addressed key for an embedding of `text` produced by `model`."""
+    digest = hashlib.sha256(f"{model}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+    return f"{EMBEDDING_KEY_PREFIX}:{digest}"
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache: a bounded in-process LRU in front of Redis.
+
+    Redis values are the vector encoded with `vector_codec` as
+    `storage_dtype` (float32, float16 or int8; no JSON) and expire after
+    `ttl_seconds`. Redis failures are logged and treated as misses so a
+    cache outage never breaks ranking.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        ttl_seconds: int = 7 * 24 * 3600,
+        redis_factory: Callable[[], Redis] = get_redis,
+        storage_dtype: str = FLOAT32,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.storage_dtype = check_dtype(storage_dtype)
+        self._redis_factory = redis_factory
+        self._redis: Optional[Redis] = None
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "redis_hits": 0, "misses": 0, "redis_errors": 0}
+
+    def _redis_client(self) -> Redis:
+        if self._redis is None:
+            self._redis = self._redis_factory()
+        return self._redis
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        with self._lock:
+            self._lru[key] = vector
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def get(self, model: str, text: str) -> Optional[np.ndarray]:
+        """Return the cached embedding, or None on a miss in both tiers."""
+        key = embedding_key(model, text)
+
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return vector
+
+        try:
+            raw = self._redis_client().get(key)
+        except redis.RedisError as e:
+            logger.warning(f"Embedding cache Redis read failed: {str(e)}")
+            self._count("redis_errors")
+            raw = None
+
+        vector = self._read(key, raw)
+        self._count("redis_hits" if vector is not None else "misses")
+        return vector
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        `get` for many texts, reading every key the in-process tier misses
+        with a single MGET; None for each text missed in both tiers.
+        """
+        keys = [embedding_key(model, text) for text in texts]
+        vectors: List[Optional[np.ndarray]] = [None] * len(keys)
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    vectors[i] = vector
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if not missing:
+            return vectors
+        unique_keys = list(dict.fromkeys(keys[i] for i in missing))
+        try:
+            raws = self._redis_client().mget(unique_keys)
+        except redis.RedisError as e:
+            logger.warning(f"Embedding cache Redis read failed: {str(e)}")
+            self._count("redis_errors")
+            raws = [None] * len(unique_keys)
+
+        found = {key: self._read(key, raw) for key, raw in zip(unique_keys, raws)}
+        for i in missing:
+            vectors[i] = found[keys[i]]
+            self._count("redis_hits" if vectors[i] is not None else "misses")
+        return vectors
+
+    def _read(self, key: str, raw: Optional[bytes]) -> Optional[np.ndarray]:
+        """Decode a Redis value into the in-process tier; None if there is none."""
+        if not raw:
+            return None
+        try:
+            vector = decode_vector(raw)
+        except ValueError:
+            # Not a vector we can read; recompute and overwrite it
+            return None
+        vector.setflags(write=False)
+        self._remember(key, vector)
+        return vector
+
+    def peek(self, model: str, text: str) -> Optional[np.ndarray]:
+        """The embedding if it is in the in-process tier; no Redis read, no stats."""
+        with self._lock:
+            return self._lru.get(embedding_key(model, text))
+
+    def set(self, model: str, text: str, vector: np.ndarray) -> np.ndarray:
+        """Store an embedding in both tiers and return it as float32."""
+        key = embedding_key(model, text)
+        vector = np.ascontiguousarray(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        self._remember(key, vector)
+
+        try:
+            self._redis_client().setex(key, self.ttl_seconds, encode_vector(vector, self.storage_dtype))
+        except redis.RedisError as e:
+            logger.warning(f"Embedding cache Redis write failed: {str(e)}")
+            self._count("redis_errors")
+
+        return vector
+
+    def clear(self) -> None:
+        """Drop the in-process tier and reset counters (Redis entries expire on their own)."""
+        with self._lock:
+            self._lru.clear()
+            for counter in self._counters:
+                self._counters[counter] = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._lru)
+        lookups = counters["memory_hits"] + counters["redis_hits"] + counters["misses"]
+        hits = counters["memory_hits"] + counters["redis_hits"]
+        return {
+            **counters,
+            "memory_entries": size,
+            "max_entries": self.max_entries,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide embedding cache, configured from the environment."""
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache(
+            max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "4096")),
+            ttl_seconds=int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+            storage_dtype=storage_dtype(),
+        )
+    return _cache
@@ -0,0 +1,48 @@
+import time
+import asyncio
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .embedding_cache import EmbeddingCache, get_embedding_cache
+from .embedding_backends import EmbeddingBackend, get_latency_monitor, select_embedding_backend
+
+
+async def embed_text(text: str, backend: Optional[EmbeddingBackend] = None) -> np.ndarray:
+    """
+    Embed text with `backend` (by default the one selected in settings),
+    reusing cached vectors when possible. Remote backends' latency and
+    failures feed the automatic fallback.
+    """
+    backend = backend or select_embedding_backend()
+    cache = get_embedding_cache()
+    cached = cache.get(backend.model, text)
+    if cached is not None:
+        return cached
+    return await _embed_uncached(text, backend, cache)
+
+
+async def embed_texts(texts: Sequence[str], backend: Optional[EmbeddingBackend] = None) -> List[np.ndarray]:
+    """
+    `embed_text` for many texts: the cache is read with one Redis round
+    trip, and the texts it misses are embedded concurrently, once each.
+    """
+    backend = backend or select_embedding_backend()
+    cache = get_embedding_cache()
+    vectors = cache.get_many(backend.model, texts)
+    missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+    embedded = dict(zip(missing, await asyncio.gather(*(_embed_uncached(text, backend, cache) for text in missing))))
+    return [vector if vector is not None else embedded[text] for text, vector in zip(texts, vectors)]
+
+
+async def _embed_uncached(text: str, backend: EmbeddingBackend, cache: EmbeddingCache) -> np.ndarray:
+    start = time.perf_counter()
+    try:
+        embedding = await backend.embed(text)
+    except Exception:
+        if backend.remote:
+            get_latency_monitor(backend).failure()
+        raise
+    if backend.remote:
+        get_latency_monitor(backend).observe(time.perf_counter() - start)
+    return cache.set(backend.model, text, embedding)
@@ -0,0 +1,141 @@
+import logging
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+# Feed size for the streaming parser; small enough to stop shortly after the last wanted card
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def _class_xpath(tag: str, css_class: Optional[str], axis: str = "descendant") -> str:
+    if css_class is None:
+        return f"{axis}::{tag}"
+    return f"{axis}::{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')]"
+
+
+def _element_text(element) -> str:
+    """Same result as BeautifulSoup's get_text(strip=True)."""
+    return "".join(part.strip() for part in element.itertext())
+
+
+class CardSelectors:
+    """
+    Selectors for the job cards on one board's result pages.
+
+    Each selector is a (tag, css class) pair, matching how the cards were
+    looked up with BeautifulSoup. They are compiled to lxml XPath objects
+    once, when the board's selectors are defined, and reused for every page.
+    """
+
+    def __init__(
+        self,
+        card: Tuple[str, str],
+        fields: Dict[str, Tuple[str, Optional[str]]],
+        link: Tuple[str, Optional[str]] = ("a", None),
+        link_attribute: str = "href",
+    ):
+        self.card = card
+        self.fields = fields
+        self.link = link
+        self.link_attribute = link_attribute
+        self._card_xpath = etree.XPath("//" + _class_xpath(*card, axis="descendant-or-self").split("::", 1)[1])
+        self._field_xpaths = {
+            name: etree.XPath(f"({_class_xpath(*selector)})[1]") for name, selector in fields.items()
+        }
+        self._link_xpath = etree.XPath(f"({_class_xpath(*link)})[1]/@{link_attribute}")
+
+    def is_card(self, element) -> bool:
+        tag, css_class = self.card
+        return element.tag == tag and css_class in (element.get("class") or "").split()
+
+    def cards(self, root) -> List:
+        return self._card_xpath(root)
+
+    def extract(self, card) -> Dict[str, Optional[str]]:
+        """Field texts for one card element; missing fields are None."""
+        record: Dict[str, Optional[str]] = {}
+        for name, xpath in self._field_xpaths.items():
+            matches = xpath(card)
+            record[name] = _element_text(matches[0]) if matches else None
+        links = self._link_xpath(card)
+        record["link"] = str(links[0]) if links else None
+        return record
+
+    def extract_bs4(self, card) -> Dict[str, Optional[str]]:
+        """BeautifulSoup equivalent of `extract`, for the html.parser backend."""
+        record: Dict[str, Optional[str]] = {}
+        for name, (tag, css_class) in self.fields.items():
+            element = card.find(tag, class_=css_class) if css_class else card.find(tag)
+            record[name] = element.get_text(strip=True) if element else None
+        tag, css_class = self.link
+        link = card.find(tag, class_=css_class) if css_class else card.find(tag)
+        record["link"] = link.get(self.link_attribute) if link else None
+        return record
+
+
+INDEED_SELECTORS = CardSelectors(
+    card=("div", "job_seen_beacon"),
+    fields={
+        "title": ("h2", "jobTitle"),
+        "company": ("span", "companyName"),
+        "location": ("div", "companyLocation"),
+        "description": ("div", "job-snippet"),
+    },
+)
+
+
+def _iter_cards_streaming(html: str, selectors: CardSelectors) -> Iterator[Dict[str, Optional[str]]]:
+    """Parse incrementally, yielding each card as soon as its closing tag is seen."""
+    parser = etree.HTMLPullParser(events=("end",), tag=selectors.card[0])
+    for offset in range(0, len(html), STREAM_CHUNK_SIZE):
+        parser.feed(html[offset:offset + STREAM_CHUNK_SIZE])
+        for _, element in parser.read_events():
+            if selectors.is_card(element):
+                yield selectors.extract(element)
+                # Drop the parsed card so memory stays flat on long pages
+                element.clear()
+    parser.close()
+    for _, element in parser.read_events():
+        if selectors.is_card(element):
+            yield selectors.extract(element)
+
+
+def extract_cards(
+    html: str,
+    selectors: CardSelectors = INDEED_SELECTORS,
+    limit: Optional[int] = None,
+    backend: str = "lxml",
+) -> List[Dict[str, Optional[str]]]:
+    """
+    Extract raw field texts for every job card on a result page.
+
+    Backends:
+      - "lxml": parse the whole page with libxml2 and run compiled XPaths.
+      - "stream": feed the page incrementally and stop after `limit` cards.
+      - "bs4": the original BeautifulSoup html.parser path.
+    """
+    if backend == "stream":
+        records = []
+        for record in _iter_cards_streaming(html, selectors):
+            records.append(record)
+            if limit is not None and len(records) >= limit:
+                break
+        return records
+
+    if backend == "bs4":
+        from bs4 import BeautifulSoup
+
+        cards = BeautifulSoup(html, "html.parser").find_all(selectors.card[0], class_=selectors.card[1])
+        return [selectors.extract_bs4(card) for card in cards[:limit]]
+
+    if backend == "lxml":
+        if not html.strip():
+            return []
+        root = etree.fromstring(html, etree.HTMLParser())
+        if root is None:
+            return []
+        return [selectors.extract(card) for card in selectors.cards(root)[:limit]]
+
+    raise ValueError(f"Unknown extraction backend: {backend}")
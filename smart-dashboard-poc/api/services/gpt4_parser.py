@@ -1,52 +1,15 @@
-import os
 import logging
 import json
-from openai import OpenAI
 from typing import Dict, Any
-import PyPDF2
-import docx
 
 logger = logging.getLogger(__name__)
 
-def extract_text_from_file(file_path: str) -> str:
-    """Extract text content from PDF or DOCX files."""
-    file_ext = file_path.lower().split('.')[-1]
-    
-    if file_ext == 'pdf':
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ' '.join(page.extract_text() for page in pdf_reader.pages)
-    elif file_ext in ['docx', 'doc']:
-        doc = docx.Document(file_path)
-        text = ' '.join(paragraph.text for paragraph in doc.paragraphs)
-    else:
-        raise ValueError(f"Unsupported file format: {file_ext}")
-    
-    return text
+GPT4_MODEL = "gpt-4-turbo-preview"
+# Part of the parse cache key: bump the suffix when the prompt or the
+# output mapping changes so cached results are not reused
+PARSER_VERSION = f"{GPT4_MODEL}/2"
 
-def parse_with_gpt4(file_path: str) -> Dict[str, Any]:
-    """
-    Parse a resume using OpenAI's GPT-4 model.
-    
-    Args:
-        file_path (str): Path to the resume file
-        
-    Returns:
-        Dict[str, Any]: Parsed resume data in a standardized format
-    """
-    try:
-        # Initialize OpenAI client
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("Missing OpenAI API key")
-        
-        client = OpenAI()
-        
-        # Extract text from the resume file
-        resume_text = extract_text_from_file(file_path)
-        
-        # Prepare the prompt
-        system_prompt = """You are a resume parsing expert. Extract the following information from the resume text:
+SYSTEM_PROMPT = """You are a resume parsing expert. Extract the following information from the resume text:
         - Full Name
         - Email Address
         - Phone Number
@@ -55,44 +18,46 @@ def parse_with_gpt4(file_path: str) -> Dict[str, Any]:
         - Education (as a list of dictionaries with institution, degree, dates)
         
         Format the output as a JSON object with these keys: name, email, mobile_number, skills, experience, education"""
-        
-        # Call GPT-4 API
-        response = client.chat.completions.create(
-            model="gpt-4-turbo-preview",  # or another appropriate model
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": resume_text}
-            ],
-            response_format={ "type": "json_object" }
-        )
-        
-        # Parse and validate the response
-        try:
-            # The response from the model is a JSON string, so we need to parse it
-            response_text = response.choices[0].message.content
-            # It's common for the model to wrap the JSON in ```json ... ```
-            if response_text.startswith("```json"):
-                response_text = response_text[7:-3] # Strip the markdown code block
+REQUIRED_FIELDS = ["name", "email", "mobile_number", "skills", "experience", "education"]
 
-            parsed_data = json.loads(response_text)
+def parse_gpt4_response(response_text: str) -> Dict[str, Any]:
+    """Parsed resume data from the model's JSON answer, with every required field present."""
+    # It's common for the model to wrap the JSON in ```json ... ```
+    if response_text.startswith("```json"):
+        response_text = response_text[7:-3] # Strip the markdown code block
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to decode JSON from GPT-4 response: {e}")
-            logger.error(f"Raw response was: {response.choices[0].message.content}")
-            # Return a structured error or an empty dict
-            return {"error": "Failed to parse GPT-4 response"}
-        except Exception as e:
-            logger.error(f"An unexpected error occurred during GPT-4 parsing: {e}")
-            return {"error": "An unexpected error occurred"}
-        
-        # Ensure all required fields are present
-        required_fields = ["name", "email", "mobile_number", "skills", "experience", "education"]
-        for field in required_fields:
-            if field not in parsed_data:
-                parsed_data[field] = [] if field in ["skills", "experience", "education"] else ""
-        
-        return parsed_data
+    try:
+        parsed_data = json.loads(response_text)
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to decode JSON from GPT-4 response: {e}")
+        logger.error(f"Raw response was: {response_text}")
+        # Return a structured error or an empty dict
+        return {"error": "Failed to parse GPT-4 response"}
+
+    # Ensure all required fields are present
+    for field in REQUIRED_FIELDS:
+        if field not in parsed_data:
+            parsed_data[field] = [] if field in ["skills", "experience", "education"] else ""
+
+    return parsed_data
+
+def parse_with_gpt4(file_path: str) -> Dict[str, Any]:
+    """
+    Parse a resume using OpenAI's GPT-4 model.
+    
+    The request goes through this process's rate-limited LLM parser; async
+    code should await `get_llm_parser().parse_file` instead.
+    
+    Args:
+        file_path (str): Path to the resume file
         
+    Returns:
+        Dict[str, Any]: Parsed resume data in a standardized format
+    """
+    from .llm_parser import parse_file_sync
+
+    try:
+        return parse_file_sync(file_path)
     except Exception as e:
         logger.error(f"Error in GPT-4 parsing: {str(e)}")
-        raise 
\ No newline at end of file
+        raise
@@ -0,0 +1,181 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+
+import redis
+from redis import Redis
+from redis.exceptions import LockError
+
+from ..deps import get_redis
+
+logger = logging.getLogger(__name__)
+
+LOCK_PREFIX = "lock:"
+
+
+def pack_entry(value: str, fresh_until: float) -> str:
+    """Prefix the cached payload with the time it stops being fresh."""
+    return f"{fresh_until:.3f}\n{value}"
+
+
+def unpack_entry(raw) -> Optional[Tuple[float, str]]:
+    """Inverse of pack_entry; entries in any other format count as misses."""
+    if raw is None:
+        return None
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8")
+    header, sep, value = raw.partition("\n")
+    try:
+        return float(header), value
+    except ValueError:
+        return None
+
+
+class StaleWhileRevalidateCache:
+    """
+    Redis cache with request coalescing and stale-while-revalidate.
+
+    Entries are fresh for `fresh_ttl` seconds and kept for another
+    `grace_seconds`. A stale entry is returned at once while one background
+    task refreshes it. On a miss, a Redis lock makes sure only one caller
+    across all API processes computes the value. The other callers wait for
+    it to appear, up to `wait_timeout` seconds, and only compute it
+    themselves if it doesn't.
+    """
+
+    def __init__(
+        self,
+        fresh_ttl: float = 2 * 3600,
+        grace_seconds: float = 30 * 60,
+        lock_ttl: float = 60,
+        wait_timeout: float = 30,
+        poll_interval: float = 0.1,
+        redis_factory: Callable[[], Redis] = get_redis,
+    ):
+        self.fresh_ttl = fresh_ttl
+        self.grace_seconds = grace_seconds
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._redis_factory = redis_factory
+        self._redis: Optional[Redis] = None
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        self._counters = {
+            "fresh_hits": 0,
+            "stale_serves": 0,
+            "misses": 0,
+            "coalesced_waiters": 0,
+            "wait_timeouts": 0,
+            "computes": 0,
+            "background_refreshes": 0,
+        }
+
+    def _redis_client(self) -> Redis:
+        if self._redis is None:
+            self._redis = self._redis_factory()
+        return self._redis
+
+    def _lock(self, key: str):
+        return self._redis_client().lock(LOCK_PREFIX + key, timeout=self.lock_ttl, blocking=False)
+
+    def set(self, key: str, value: str) -> None:
+        """Store `value` as fresh now (also used to pre-warm the cache)."""
+        fresh_until = time.time() + self.fresh_ttl
+        self._redis_client().set(key, pack_entry(value, fresh_until), ex=int(self.fresh_ttl + self.grace_seconds))
+
+    def read(self, key: str) -> Optional[Tuple[float, str]]:
+        """Return (fresh_until, value) for `key` without side effects."""
+        return unpack_entry(self._redis_client().get(key))
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        """
+        Return the cached value for `key`, computing it at most once per key
+        across processes. `compute` returning None means "nothing to cache".
+        """
+        entry = self.read(key)
+        if entry is not None:
+            fresh_until, value = entry
+            if time.time() < fresh_until:
+                self._counters["fresh_hits"] += 1
+                return value
+            self._counters["stale_serves"] += 1
+            self._refresh_in_background(key, compute)
+            return value
+
+        self._counters["misses"] += 1
+        lock = self._lock(key)
+        if lock.acquire():
+            return await self._compute_and_store(key, compute, lock)
+
+        # Someone else is computing this key: wait for their result
+        self._counters["coalesced_waiters"] += 1
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            entry = self.read(key)
+            if entry is not None:
+                return entry[1]
+            if not self._redis_client().exists(LOCK_PREFIX + key):
+                # The holder finished without caching anything
+                break
+        else:
+            self._counters["wait_timeouts"] += 1
+            logger.warning(f"Timed out waiting for {key} to be computed; computing it here")
+        return await self._compute_and_store(key, compute, None)
+
+    async def _compute_and_store(self, key: str, compute, lock) -> Optional[str]:
+        self._counters["computes"] += 1
+        try:
+            value = await compute()
+            if value is not None:
+                self.set(key, value)
+            return value
+        finally:
+            if lock is not None:
+                try:
+                    lock.release()
+                except (LockError, redis.RedisError):
+                    # The lock expired while computing; nothing to release
+                    pass
+
+    def _refresh_in_background(self, key: str, compute) -> None:
+        lock = self._lock(key)
+        try:
+            if not lock.acquire():
+                return
+        except redis.RedisError as e:
+            logger.warning(f"Could not take refresh lock for {key}: {str(e)}")
+            return
+
+        async def refresh():
+            try:
+                await self._compute_and_store(key, compute, lock)
+                self._counters["background_refreshes"] += 1
+            except Exception as e:
+                logger.error(f"Background refresh of {key} failed: {str(e)}")
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._counters, "refreshes_in_flight": len(self._refresh_tasks)}
+
+
+_cache: Optional[StaleWhileRevalidateCache] = None
+
+
+def get_job_cache() -> StaleWhileRevalidateCache:
+    """Process-wide job search cache, configured from the environment."""
+    global _cache
+    if _cache is None:
+        _cache = StaleWhileRevalidateCache(
+            fresh_ttl=float(os.getenv("JOB_CACHE_TTL_SECONDS", str(2 * 3600))),
+            grace_seconds=float(os.getenv("JOB_CACHE_GRACE_SECONDS", str(30 * 60))),
+            lock_ttl=float(os.getenv("JOB_CACHE_LOCK_TTL_SECONDS", "60")),
+            wait_timeout=float(os.getenv("JOB_CACHE_WAIT_TIMEOUT_SECONDS", "30")),
+        )
+    return _cache
@@ -0,0 +1,383 @@
+import os
+import json
+import fcntl
+import time
+import logging
+import threading
+from array import array
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from ..models import Job
+from .scoring import normalize_rows, top_k_indices
+from .vector_codec import DTYPES, FLOAT32, INT8, QuantizedVectors, check_dtype, quantize
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILES = {"float32": "vectors.f32", "float16": "vectors.f16", "int8": "vectors.i8"}
+QUANT_PARAMS_FILE = "quant_params.npy"
+META_FILE = "meta.json"
+JOBS_FILE = "jobs.jsonl"
+ASSIGNMENTS_FILE = "assignments.npy"
+TIMESTAMPS_FILE = "timestamps.npy"
+CENTROIDS_FILE = "centroids.npy"
+# Held by the one process that may write the index
+LOCK_FILE = "writer.lock"
+
+# Row assignment for tombstoned (deleted) rows
+DELETED = -1
+
+
+def kmeans(sample: np.ndarray, n_clusters: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means over unit-norm rows; returns unit-norm centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(sample.shape[0], n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        empty = ~sums.any(axis=1)
+        # Re-seed empty clusters from random sample rows
+        sums[empty] = sample[rng.choice(sample.shape[0], int(empty.sum()), replace=False)]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+class JobIndex:
+    """
+    Persistent job corpus with an IVF (inverted file) nearest-neighbour index.
+
+    Unit-norm embeddings live in a memory-mapped file under `directory`,
+    one row per job, stored as float32, float16 or int8 (`dtype`; int8 rows
+    keep their scale and zero point in a side array). Once trained, rows are bucketed by their
+    nearest k-means centroid and a query only scans the `nprobe` closest
+    buckets; before training every live row is scanned exactly. Deleted
+    rows are tombstoned and their slots are not reused until a rebuild.
+
+    One process writes a directory at a time: the first to open it holds
+    its writer lock, and any other process (e.g. another uvicorn worker)
+    gets a read-only view of the snapshot that was saved when it opened.
+    """
+
+    def __init__(self, directory: str, dim: int, model: str, nprobe: int = 16, dtype: str = FLOAT32):
+        self.directory = directory
+        self.dim = dim
+        self.model = model
+        self.nprobe = nprobe
+        self.dtype = check_dtype(dtype)
+        self.count = 0
+        self.capacity = 0
+        self._lock = threading.RLock()
+        self._vectors: Optional[np.memmap] = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._timestamps = np.zeros(0, dtype=np.float64)
+        self._params = np.zeros((0, 2), dtype=np.float32)
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[array] = []
+        self._jobs: Dict[int, dict] = {}
+        self._rows_by_url: Dict[str, int] = {}
+        self._lock_file = None
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @classmethod
+    def open(cls, directory: str, dim: int, model: str, nprobe: int = 16, dtype: str = FLOAT32) -> "JobIndex":
+        """Load the snapshot in `directory`, or start an empty index there."""
+        os.makedirs(directory, exist_ok=True)
+        index = cls(directory, dim, model, nprobe=nprobe, dtype=dtype)
+        index._take_writer_lock()
+        try:
+            if os.path.exists(index._path(META_FILE)):
+                index._load()
+        except Exception:
+            index.close()
+            raise
+        return index
+
+    def _take_writer_lock(self) -> None:
+        lock_file = open(self._path(LOCK_FILE), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            logger.info(f"Job index at {self.directory} is written by another process; opening it read-only")
+            return
+        self._lock_file = lock_file
+
+    @property
+    def read_only(self) -> bool:
+        return self._lock_file is None
+
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise RuntimeError(f"Job index at {self.directory} is open read-only; another process writes it")
+
+    def close(self) -> None:
+        """Release the writer lock, if this index holds it; save() first to keep changes."""
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _load(self) -> None:
+        with open(self._path(META_FILE)) as f:
+            meta = json.load(f)
+        if meta["dim"] != self.dim or meta["model"] != self.model:
+            raise ValueError(
+                f"Job index at {self.directory} was built with {meta['model']} ({meta['dim']} dims), "
+                f"not {self.model} ({self.dim} dims)"
+            )
+        if meta.get("dtype", FLOAT32) != self.dtype:
+            raise ValueError(f"Job index at {self.directory} stores {meta.get('dtype', FLOAT32)} vectors, not {self.dtype}")
+
+        self.count = meta["count"]
+        self.capacity = meta["capacity"]
+        self._vectors = self._map_vectors(self.capacity)
+        self._assignments = np.load(self._path(ASSIGNMENTS_FILE))
+        self._timestamps = np.load(self._path(TIMESTAMPS_FILE))
+        if self.dtype == INT8:
+            self._params = np.load(self._path(QUANT_PARAMS_FILE))
+        if os.path.exists(self._path(CENTROIDS_FILE)):
+            self._centroids = np.load(self._path(CENTROIDS_FILE))
+
+        with open(self._path(JOBS_FILE)) as f:
+            for line in f:
+                record = json.loads(line)
+                row = record.pop("_row")
+                self._jobs[row] = record
+                self._rows_by_url[record["url"]] = row
+
+        self._rebuild_lists()
+        logger.info(f"Loaded job index with {len(self)} live jobs from {self.directory}")
+
+    def save(self) -> None:
+        """Write a consistent snapshot; every file is replaced atomically."""
+        self._check_writable()
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+            self._atomic_save_npy(ASSIGNMENTS_FILE, self._assignments[:self.count])
+            self._atomic_save_npy(TIMESTAMPS_FILE, self._timestamps[:self.count])
+            if self.dtype == INT8:
+                self._atomic_save_npy(QUANT_PARAMS_FILE, self._params[:self.count])
+            if self._centroids is not None:
+                self._atomic_save_npy(CENTROIDS_FILE, self._centroids)
+
+            tmp_path = self._path(JOBS_FILE + ".tmp")
+            with open(tmp_path, "w") as f:
+                for row, job in self._jobs.items():
+                    f.write(json.dumps({"_row": row, **job}) + "\n")
+            os.replace(tmp_path, self._path(JOBS_FILE))
+
+            meta = {
+                "dim": self.dim, "model": self.model, "dtype": self.dtype,
+                "count": self.count, "capacity": self.capacity,
+            }
+            tmp_path = self._path(META_FILE + ".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, self._path(META_FILE))
+
+    def _atomic_save_npy(self, name: str, data: np.ndarray) -> None:
+        tmp_path = self._path(name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, data)
+        os.replace(tmp_path, self._path(name))
+
+    def _map_vectors(self, capacity: int) -> np.memmap:
+        return np.memmap(
+            self._path(VECTORS_FILES[self.dtype]), dtype=DTYPES[self.dtype][1], mode="r" if self.read_only else "r+",
+            shape=(capacity, self.dim),
+        )
+
+    def _rows(self, rows: np.ndarray) -> QuantizedVectors:
+        """Stored vectors for `rows`, read from the memory map."""
+        params = self._params[rows] if self.dtype == INT8 else None
+        return QuantizedVectors(self.dtype, np.asarray(self._vectors[rows]), params)
+
+    def _grow(self, needed: int) -> None:
+        """Ensure room for `needed` rows, doubling the memory-mapped file."""
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, self.capacity * 2, 1024)
+        if self._vectors is not None:
+            self._vectors.flush()
+            del self._vectors
+        with open(self._path(VECTORS_FILES[self.dtype]), "ab") as f:
+            f.truncate(capacity * self.dim * np.dtype(DTYPES[self.dtype][1]).itemsize)
+        self._vectors = self._map_vectors(capacity)
+        self._assignments = np.resize(self._assignments, capacity)
+        self._timestamps = np.resize(self._timestamps, capacity)
+        if self.dtype == INT8:
+            self._params = np.resize(self._params, (capacity, 2))
+        self.capacity = capacity
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._rows_by_url
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    def add(self, jobs: Sequence[Job], embeddings: Sequence[np.ndarray], now: Optional[float] = None) -> int:
+        """
+        Insert or refresh jobs (keyed by URL); returns the number of new
+        rows. A URL repeated within `jobs` is added once, from its last
+        occurrence.
+        """
+        self._check_writable()
+        if len(jobs) != len(embeddings):
+            raise ValueError("jobs and embeddings must have the same length")
+        last_by_url = {job.url: i for i, job in enumerate(jobs)}
+        if len(last_by_url) < len(jobs):
+            keep = sorted(last_by_url.values())
+            jobs, embeddings = [jobs[i] for i in keep], [embeddings[i] for i in keep]
+        if not jobs:
+            return 0
+        now = time.time() if now is None else now
+        matrix = normalize_rows(np.array(embeddings, dtype=np.float32).reshape(len(jobs), self.dim))
+
+        with self._lock:
+            # A re-ingested posting replaces its previous row
+            self._compact({self._delete_row(self._rows_by_url[job.url]) for job in jobs if job.url in self._rows_by_url} - {None})
+
+            start = self.count
+            self._grow(start + len(jobs))
+            rows = np.arange(start, start + len(jobs))
+            quantized = quantize(matrix, self.dtype)
+            self._vectors[rows] = quantized.data
+            if quantized.params is not None:
+                self._params[rows] = quantized.params
+            self._timestamps[rows] = now
+            self._assignments[rows] = self._assign(matrix)
+            self.count += len(jobs)
+
+            for row, job, bucket in zip(rows.tolist(), jobs, self._assignments[rows].tolist()):
+                self._jobs[row] = job.dict(exclude={"score"})
+                self._rows_by_url[job.url] = row
+                self._lists[bucket].append(row)
+            return len(jobs)
+
+    def _assign(self, matrix: np.ndarray) -> np.ndarray:
+        if self._centroids is None:
+            if not self._lists:
+                self._lists = [array("i")]
+            return np.zeros(matrix.shape[0], dtype=np.int32)
+        return np.argmax(matrix @ self._centroids.T, axis=1).astype(np.int32)
+
+    def _delete_row(self, row: int) -> Optional[int]:
+        """Mark `row` deleted; returns its list, which the caller compacts with `_compact`."""
+        bucket = int(self._assignments[row])
+        if bucket == DELETED:
+            return None
+        self._assignments[row] = DELETED
+        job = self._jobs.pop(row)
+        if self._rows_by_url.get(job["url"]) == row:
+            del self._rows_by_url[job["url"]]
+        return bucket
+
+    def _compact(self, buckets: Set[int]) -> None:
+        # One pass per touched list, rather than an O(n) array.remove per row
+        for bucket in buckets:
+            rows = np.frombuffer(self._lists[bucket], dtype=np.int32)
+            self._lists[bucket] = array("i", rows[self._assignments[rows] != DELETED].tobytes())
+
+    def delete(self, urls: Sequence[str]) -> int:
+        """Remove jobs by URL; returns how many were present."""
+        self._check_writable()
+        with self._lock:
+            rows = [self._rows_by_url[url] for url in urls if url in self._rows_by_url]
+            self._compact({self._delete_row(row) for row in rows} - {None})
+            return len(rows)
+
+    def delete_expired(self, max_age_seconds: float, now: Optional[float] = None) -> int:
+        """Remove postings ingested more than `max_age_seconds` ago."""
+        self._check_writable()
+        now = time.time() if now is None else now
+        with self._lock:
+            live = self._assignments[:self.count] != DELETED
+            expired = np.nonzero(live & (self._timestamps[:self.count] < now - max_age_seconds))[0]
+            self._compact({self._delete_row(row) for row in expired.tolist()} - {None})
+            if len(expired):
+                logger.info(f"Deleted {len(expired)} expired jobs from the job index")
+            return len(expired)
+
+    def train(self, n_lists: Optional[int] = None, sample_size: Optional[int] = None) -> None:
+        """(Re)cluster live rows into `n_lists` buckets (default ~sqrt(N))."""
+        self._check_writable()
+        with self._lock:
+            live_rows = np.nonzero(self._assignments[:self.count] != DELETED)[0]
+            if len(live_rows) == 0:
+                return
+            n_lists = n_lists or max(1, int(np.sqrt(len(live_rows))))
+            n_lists = min(n_lists, len(live_rows))
+            sample_size = min(len(live_rows), sample_size or n_lists * 64)
+            sample_rows = np.sort(np.random.default_rng(0).choice(live_rows, sample_size, replace=False))
+
+            self._centroids = kmeans(normalize_rows(self._rows(sample_rows).dequantize()), n_lists)
+            for start in range(0, len(live_rows), 65536):
+                chunk = live_rows[start:start + 65536]
+                self._assignments[chunk] = self._assign(self._rows(chunk).dequantize())
+            self._rebuild_lists()
+            logger.info(f"Trained job index: {len(live_rows)} jobs in {n_lists} lists")
+
+    def _rebuild_lists(self) -> None:
+        n_lists = 1 if self._centroids is None else self._centroids.shape[0]
+        assignments = self._assignments[:self.count]
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(n_lists + 1))
+        self._lists = [array("i", order[bounds[i]:bounds[i + 1]].astype(np.int32).tobytes()) for i in range(n_lists)]
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(self, query: np.ndarray, k: int, nprobe: Optional[int] = None) -> List[Tuple[Job, float]]:
+        """Return up to `k` (job, cosine score) pairs, best first."""
+        query = np.asarray(query, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-8)
+
+        with self._lock:
+            if not self._jobs:
+                return []
+            if self._centroids is None:
+                probe = [0]
+            else:
+                probe = top_k_indices(self._centroids @ query, nprobe or self.nprobe)
+            rows = np.concatenate([np.frombuffer(self._lists[i], dtype=np.int32) for i in probe])
+            if len(rows) == 0:
+                return []
+            rows.sort()  # sequential memmap reads
+            scores = self._rows(rows).scores(query)
+            best = top_k_indices(scores, k)
+            return [(Job(**self._jobs[int(rows[i])]), float(scores[i])) for i in best]
+
+
+_index: Optional[JobIndex] = None
+
+
+def get_job_index() -> JobIndex:
+    """Process-wide job index, loaded from JOB_INDEX_DIR on first use."""
+    global _index
+    if _index is None:
+        default_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "storage", "job_index")
+        _index = JobIndex.open(
+            os.getenv("JOB_INDEX_DIR", default_dir),
+            dim=int(os.getenv("JOB_INDEX_DIM", "1536")),
+            model=os.getenv("JOB_INDEX_MODEL", "text-embedding-3-small"),
+            nprobe=int(os.getenv("JOB_INDEX_NPROBE", "16")),
+            dtype=os.getenv("JOB_INDEX_DTYPE", FLOAT32),
+        )
+    return _index
@@ -0,0 +1,117 @@
+import os
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Type
+
+from ..models import Job
+from .dedup import dedupe_jobs
+from .scraper import ScraperClient, scrape_indeed_jobs, scraper_pages
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOURCE_TIMEOUT = 20.0
+
+
+class JobSource(ABC):
+    """
+    One job board. Subclasses set `name` and implement `search`, returning
+    the board's postings as `Job` objects; they are registered with
+    `@register_source` and enabled by name through JOB_SOURCES.
+    """
+
+    name: str = ""
+
+    def __init__(self, timeout: float = DEFAULT_SOURCE_TIMEOUT):
+        self.timeout = timeout
+
+    @abstractmethod
+    async def search(self, skills: List[str], location: str) -> List[Job]:
+        """Postings matching `skills` in `location`."""
+
+    def requests_per_search(self) -> int:
+        """HTTP requests one `search` makes to the board, for rate limiting."""
+        return 1
+
+
+_registry: Dict[str, Type[JobSource]] = {}
+
+
+def register_source(source_class: Type[JobSource]) -> Type[JobSource]:
+    _registry[source_class.name] = source_class
+    return source_class
+
+
+@register_source
+class IndeedSource(JobSource):
+    name = "indeed"
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_SOURCE_TIMEOUT,
+        base_url: Optional[str] = None,
+        pages: Optional[int] = None,
+        client: Optional[ScraperClient] = None,
+    ):
+        super().__init__(timeout)
+        self.base_url = base_url
+        self.pages = pages
+        self.client = client
+
+    async def search(self, skills: List[str], location: str) -> List[Job]:
+        return await scrape_indeed_jobs(skills, location, pages=self.pages, base_url=self.base_url, client=self.client)
+
+    def requests_per_search(self) -> int:
+        # One request per result page, all sent at once
+        return self.pages or scraper_pages()
+
+
+def source_timeout(name: str) -> float:
+    """Per-source timeout, e.g. JOB_SOURCE_TIMEOUT_INDEED=15, else JOB_SOURCE_TIMEOUT_SECONDS."""
+    default = os.getenv("JOB_SOURCE_TIMEOUT_SECONDS", str(DEFAULT_SOURCE_TIMEOUT))
+    return float(os.getenv(f"JOB_SOURCE_TIMEOUT_{name.upper()}", default))
+
+
+def enabled_sources() -> List[JobSource]:
+    """Sources named in JOB_SOURCES (comma separated, default "indeed")."""
+    sources = []
+    for name in os.getenv("JOB_SOURCES", "indeed").split(","):
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in _registry:
+            logger.warning(f"Unknown job source {name!r} in JOB_SOURCES; skipping it")
+            continue
+        sources.append(_registry[name](timeout=source_timeout(name)))
+    return sources
+
+
+async def _search_source(source: JobSource, skills: List[str], location: str) -> List[Job]:
+    try:
+        return await asyncio.wait_for(source.search(skills, location), source.timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Job source {source.name} timed out after {source.timeout}s")
+    except Exception as e:
+        logger.error(f"Job source {source.name} failed: {str(e)}")
+    return []
+
+
+async def search_job_sources(
+    skills: List[str],
+    location: str = "Remote",
+    sources: Optional[List[JobSource]] = None,
+) -> List[Job]:
+    """
+    Query every source concurrently and merge the results.
+
+    A slow or failing source only loses its own results. Postings are merged
+    in source order and collapsed by canonical URL and near-duplicate text,
+    so a job listed on several boards is ranked (and embedded) once.
+    """
+    sources = enabled_sources() if sources is None else sources
+    results = await asyncio.gather(*[_search_source(source, skills, location) for source in sources])
+    jobs = [job for source_jobs in results for job in source_jobs]
+    unique_jobs = dedupe_jobs(jobs)
+    if len(unique_jobs) < len(jobs):
+        logger.info(f"Collapsed {len(jobs) - len(unique_jobs)} duplicate postings across {len(sources)} sources")
+    return unique_jobs
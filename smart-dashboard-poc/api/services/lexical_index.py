@@ -0,0 +1,163 @@
+import re
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models import Job
+from .scoring import top_k_indices
+
+# Keeps skill tokens such as "c++", "c#" and "node.js" whole; a dot only
+# joins characters, so sentence-ending dots are not part of a token
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the their this to we will with you your".split()
+)
+# Term frequencies are stored in one byte per posting
+MAX_TERM_FREQUENCY = 255
+# Compact postings once this share of documents has been removed
+COMPACT_DEAD_RATIO = 0.25
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def job_document(job: Job) -> str:
+    """The text a posting is indexed under."""
+    return f"{job.title} {job.description or ''}"
+
+
+class BM25Index:
+    """
+    In-process inverted index with Okapi BM25 scoring.
+
+    Each term's postings are two parallel arrays: document ids (uint32) and
+    term frequencies (uint8), five bytes per posting, read as numpy views at
+    query time. Documents are keyed by a string (the job URL). Removing one
+    tombstones it; postings are compacted once a quarter of the documents
+    are dead, and until then document frequencies still count them.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._terms: Dict[str, int] = {}
+        self._doc_ids: List[array] = []
+        self._freqs: List[array] = []
+        self._doc_lengths = array("I")
+        self._live = bytearray()
+        self._keys: List[Optional[str]] = []
+        self._ids_by_key: Dict[str, int] = {}
+        self._live_length = 0
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._ids_by_key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._ids_by_key
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate size of the postings and per-document arrays."""
+        postings = sum(ids.itemsize * len(ids) + freqs.itemsize * len(freqs) for ids, freqs in zip(self._doc_ids, self._freqs))
+        return postings + len(self._doc_lengths) * 4 + len(self._live)
+
+    def add(self, key: str, text: str) -> int:
+        """Index `text` under `key`, replacing any earlier document with that key."""
+        if key in self._ids_by_key:
+            self.remove(key)
+        tokens = tokenize(text)
+        doc_id = len(self._keys)
+        terms, doc_ids, freqs = self._terms, self._doc_ids, self._freqs
+        for term, frequency in Counter(tokens).items():
+            term_id = terms.get(term)
+            if term_id is None:
+                term_id = terms[term] = len(doc_ids)
+                doc_ids.append(array("I"))
+                freqs.append(array("B"))
+            doc_ids[term_id].append(doc_id)
+            freqs[term_id].append(frequency if frequency < MAX_TERM_FREQUENCY else MAX_TERM_FREQUENCY)
+        self._doc_lengths.append(len(tokens))
+        self._live.append(1)
+        self._keys.append(key)
+        self._ids_by_key[key] = doc_id
+        self._live_length += len(tokens)
+        return doc_id
+
+    def add_many(self, documents: Iterable[Tuple[str, str]]) -> None:
+        for key, text in documents:
+            self.add(key, text)
+
+    def remove(self, key: str) -> bool:
+        doc_id = self._ids_by_key.pop(key, None)
+        if doc_id is None:
+            return False
+        self._live[doc_id] = 0
+        self._keys[doc_id] = None
+        self._live_length -= self._doc_lengths[doc_id]
+        self._dead += 1
+        if self._dead > COMPACT_DEAD_RATIO * len(self._keys):
+            self.compact()
+        return True
+
+    def compact(self) -> None:
+        """Drop removed documents from every postings list."""
+        live = np.frombuffer(self._live, dtype=np.uint8).astype(bool)
+        for term_id, (ids, freqs) in enumerate(zip(self._doc_ids, self._freqs)):
+            doc_ids = np.frombuffer(ids, dtype=np.uint32)
+            keep = live[doc_ids]
+            if not keep.all():
+                self._doc_ids[term_id] = array("I", doc_ids[keep].tobytes())
+                self._freqs[term_id] = array("B", np.frombuffer(freqs, dtype=np.uint8)[keep].tobytes())
+        self._dead = 0
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document id for `query` (removed documents score 0)."""
+        n_docs = len(self._keys)
+        scores = np.zeros(n_docs, dtype=np.float32)
+        live_docs = len(self._ids_by_key)
+        if not live_docs:
+            return scores
+        average_length = max(self._live_length / live_docs, 1e-9)
+        doc_lengths = np.frombuffer(self._doc_lengths, dtype=np.uint32)
+        # Indexed documents include tombstones until the next compaction
+        indexed_docs = live_docs + self._dead
+
+        for term in set(tokenize(query)):
+            term_id = self._terms.get(term)
+            if term_id is None or not len(self._doc_ids[term_id]):
+                continue
+            doc_ids = np.frombuffer(self._doc_ids[term_id], dtype=np.uint32)
+            freqs = np.frombuffer(self._freqs[term_id], dtype=np.uint8).astype(np.float32)
+            df = len(doc_ids)
+            idf = np.log(1.0 + (indexed_docs - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * doc_lengths[doc_ids] / average_length)
+            # Each document appears once per postings list, so plain fancy-index add is safe
+            scores[doc_ids] += idf * freqs * (self.k1 + 1.0) / (freqs + norm)
+
+        if self._dead:
+            scores *= np.frombuffer(self._live, dtype=np.uint8)
+        return scores
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Top `k` (key, score) matches with a positive score, best first."""
+        scores = self.scores(query)
+        best = top_k_indices(scores, k)
+        return [(self._keys[i], float(scores[i])) for i in best if scores[i] > 0]
+
+
+def lexical_prefilter(jobs: Sequence[Job], query: str, top_m: int) -> Tuple[List[int], np.ndarray]:
+    """
+    Positions of the `top_m` jobs that best match `query` lexically, and the
+    BM25 scores of those jobs. Jobs with no matching terms can still fill
+    the remaining slots.
+    """
+    index = BM25Index()
+    for position, job in enumerate(jobs):
+        index.add(str(position), job_document(job))
+    scores = index.scores(query)
+    selected = top_k_indices(scores, top_m)
+    return selected.tolist(), scores[selected]
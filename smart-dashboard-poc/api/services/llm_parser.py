@@ -0,0 +1,346 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import redis
+from redis import Redis
+
+from .embedding_batcher import approx_tokens
+from .gpt4_parser import GPT4_MODEL, SYSTEM_PROMPT, parse_gpt4_response
+from .text_extraction import extract_text
+
+logger = logging.getLogger(__name__)
+
+# The account's limits for the model; 0 disables a limit
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "150000"))
+# How much unused allowance may build up, in seconds of each limit
+LLM_RATE_BURST_SECONDS = float(os.getenv("LLM_RATE_BURST_SECONDS", "10"))
+# Resume text is condensed to this many tokens before it is sent
+LLM_MAX_INPUT_TOKENS = int(os.getenv("LLM_MAX_INPUT_TOKENS", "6000"))
+LLM_MAX_OUTPUT_TOKENS = int(os.getenv("LLM_MAX_OUTPUT_TOKENS", "1500"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+RATE_LIMIT_PREFIX = "llm_rate"
+# Lines repeated on several pages (headers, footers) are sent once; longer lines are kept
+REPEATED_LINE_MAX_CHARS = 80
+
+
+def condense_resume_text(text: str, max_tokens: int = LLM_MAX_INPUT_TOKENS) -> str:
+    """
+    Fit resume text into about `max_tokens`. Whitespace is collapsed and
+    short lines repeated across pages are kept once; if that is not enough
+    the end is cut at a line boundary, since contact details and skills
+    come first on most resumes.
+    """
+    lines: List[str] = []
+    seen = set()
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if not line:
+            continue
+        key = line.lower()
+        if key in seen and len(line) <= REPEATED_LINE_MAX_CHARS:
+            continue
+        seen.add(key)
+        lines.append(line)
+    condensed = "\n".join(lines)
+
+    # approx_tokens counts four characters per token
+    max_chars = max_tokens * 4
+    if len(condensed) <= max_chars:
+        return condensed
+    cut = condensed.rfind("\n", 0, max_chars)
+    return condensed[:cut if cut > max_chars // 2 else max_chars]
+
+
+class TokenBucket:
+    """
+    Requests-per-minute and tokens-per-minute allowances, refilled
+    continuously and holding at most `burst_seconds` of either. A request
+    larger than a full bucket is let through once the bucket is full and
+    leaves it in debt, so long-run usage never exceeds the rates. This
+    version limits one process; RedisTokenBucket shares the limit.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = LLM_TOKENS_PER_MINUTE,
+        burst_seconds: float = LLM_RATE_BURST_SECONDS,
+    ):
+        self.burst_seconds = burst_seconds
+        self.rates = (requests_per_minute / 60, tokens_per_minute / 60)
+        self.capacities = tuple(max(rate * burst_seconds, 1.0) if rate else 0.0 for rate in self.rates)
+        self._levels = list(self.capacities)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self, tokens: int) -> float:
+        """Take one request and `tokens` if both are available; otherwise the seconds to wait."""
+        amounts = (1, tokens)
+        with self._lock:
+            now = time.monotonic()
+            elapsed, self._updated = now - self._updated, now
+            wait = 0.0
+            for i, rate in enumerate(self.rates):
+                if not rate:
+                    continue
+                self._levels[i] = min(self.capacities[i], self._levels[i] + elapsed * rate)
+                needed = min(amounts[i], self.capacities[i])
+                if self._levels[i] < needed:
+                    wait = max(wait, (needed - self._levels[i]) / rate)
+            if wait == 0.0:
+                for i, rate in enumerate(self.rates):
+                    if rate:
+                        self._levels[i] -= amounts[i]
+            return wait
+
+    async def acquire(self, tokens: int) -> float:
+        """Wait until a request of `tokens` tokens may be sent; returns the seconds waited."""
+        waited = 0.0
+        while True:
+            wait = self._take(tokens)
+            if wait <= 0:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+
+# TokenBucket._take as one atomic step on Redis's clock. KEYS[1] is a hash of
+# the two levels; ARGV is (rate, capacity, amount) for requests, then tokens,
+# then the key's TTL. Returns the seconds to wait, as a string.
+TAKE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'requests', 'tokens', 'updated')
+local elapsed = math.max(now - (tonumber(state[3]) or now), 0)
+local levels = {}
+local wait = 0
+for i = 1, 2 do
+  local rate, capacity, amount = tonumber(ARGV[i * 3 - 2]), tonumber(ARGV[i * 3 - 1]), tonumber(ARGV[i * 3])
+  levels[i] = math.min(capacity, (tonumber(state[i]) or capacity) + elapsed * rate)
+  local needed = math.min(amount, capacity)
+  if rate > 0 and levels[i] < needed then
+    wait = math.max(wait, (needed - levels[i]) / rate)
+  end
+end
+if wait == 0 then
+  for i = 1, 2 do
+    if tonumber(ARGV[i * 3 - 2]) > 0 then
+      levels[i] = levels[i] - tonumber(ARGV[i * 3])
+    end
+  end
+end
+redis.call('HSET', KEYS[1], 'requests', tostring(levels[1]), 'tokens', tostring(levels[2]), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], ARGV[7])
+return tostring(wait)
+"""
+
+
+class RedisTokenBucket(TokenBucket):
+    """
+    A TokenBucket kept in Redis, so every API process and worker calling
+    the model draws from the same allowance. If Redis is unreachable the
+    process falls back to limiting itself.
+    """
+
+    def __init__(self, redis_conn: Redis, name: str, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.key = f"{RATE_LIMIT_PREFIX}:{name}"
+        self._script = redis_conn.register_script(TAKE_SCRIPT)
+        # Idle buckets are full again after this long, so the key can expire
+        self._ttl = int(self.burst_seconds) + 60
+
+    def _take(self, tokens: int) -> float:
+        args: List[Any] = []
+        for rate, capacity, amount in zip(self.rates, self.capacities, (1, tokens)):
+            args += [rate, capacity, amount]
+        try:
+            return float(self._script(keys=[self.key], args=args + [self._ttl]))
+        except redis.RedisError as e:
+            logger.warning(f"Shared LLM rate limit unavailable, limiting this process only: {str(e)}")
+            return super()._take(tokens)
+
+
+def openai_client() -> Any:
+    if not os.getenv("OPENAI_API_KEY"):
+        raise ValueError("Missing OpenAI API key")
+    import openai
+
+    # Retries are done by LLMResumeParser, which also charges them to the rate limit
+    return openai.AsyncOpenAI(max_retries=0)
+
+
+def _retryable(error: Exception) -> bool:
+    import openai
+
+    status = getattr(error, "status_code", None)
+    return isinstance(error, openai.APIConnectionError) or status == 429 or (status is not None and status >= 500)
+
+
+def _retry_after(error: Exception) -> float:
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after", 0)) if response is not None else 0.0
+    except ValueError:
+        return 0.0
+
+
+class LLMResumeParser:
+    """
+    Parses resumes with a chat model over one shared client. Requests are
+    limited to `max_concurrency` at a time and to the rate limiter's
+    allowance, counting the condensed prompt plus `max_output_tokens`.
+    429s, 5xx answers and connection errors are retried up to `max_retries`
+    times with jittered exponential backoff (at least the server's
+    Retry-After), each attempt charged to the rate limit again.
+    """
+
+    def __init__(
+        self,
+        model: str = GPT4_MODEL,
+        rate_limiter: Optional[TokenBucket] = None,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        max_input_tokens: int = LLM_MAX_INPUT_TOKENS,
+        max_output_tokens: int = LLM_MAX_OUTPUT_TOKENS,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        client_factory: Callable[[], Any] = openai_client,
+    ):
+        self.model = model
+        self.rate_limiter = rate_limiter or TokenBucket()
+        self.max_concurrency = max_concurrency
+        self.max_input_tokens = max_input_tokens
+        self.max_output_tokens = max_output_tokens
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._client_factory = client_factory
+        # The client's connections and the semaphore are bound to one event loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Any = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._counters = {"resumes": 0, "requests": 0, "retries": 0, "failed": 0, "rate_limited_seconds": 0.0}
+
+    async def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            previous_client, previous_loop = self._client, self._loop
+            self._loop = loop
+            self._client = self._client_factory()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            if previous_client is not None:
+                await _close_client(previous_client, previous_loop)
+
+    async def parse_text(self, text: str) -> Dict[str, Any]:
+        await self._bind_loop()
+        resume_text = condense_resume_text(text, self.max_input_tokens)
+        tokens = approx_tokens(SYSTEM_PROMPT) + approx_tokens(resume_text) + self.max_output_tokens
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": resume_text},
+        ]
+        async with self._semaphore:
+            response = await self._complete(messages, tokens)
+        self._counters["resumes"] += 1
+        parsed = parse_gpt4_response(response.choices[0].message.content)
+        if "error" in parsed:
+            # Raised rather than returned, so the failure is neither cached nor stored as a candidate
+            raise ValueError(parsed["error"])
+        return parsed
+
+    async def parse_file(self, file_path: str) -> Dict[str, Any]:
+        text = await asyncio.to_thread(extract_text, file_path)
+        return await self.parse_text(text)
+
+    async def _complete(self, messages: List[Dict[str, str]], tokens: int) -> Any:
+        for attempt in range(self.max_retries + 1):
+            self._counters["rate_limited_seconds"] += await self.rate_limiter.acquire(tokens)
+            self._counters["requests"] += 1
+            try:
+                return await self._client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=self.max_output_tokens,
+                    response_format={"type": "json_object"},
+                )
+            except Exception as e:
+                if attempt == self.max_retries or not _retryable(e):
+                    self._counters["failed"] += 1
+                    raise
+                delay = max(_retry_after(e), random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+                logger.warning(f"LLM request failed ({str(e)}); retry {attempt + 1} in {delay:.2f}s")
+                self._counters["retries"] += 1
+                await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        """Close the shared client's connection pool."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            self._loop = None
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._counters, rate_limited_seconds=round(self._counters["rate_limited_seconds"], 3))
+
+
+async def _close_client(client: Any, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+    """Close a client made for `loop`, on that loop while it still runs."""
+    try:
+        if loop is not None and loop.is_running() and loop is not asyncio.get_running_loop():
+            asyncio.run_coroutine_threadsafe(client.close(), loop)
+        else:
+            await client.close()
+    except Exception as e:
+        # A client whose loop has closed has no connections left to release
+        logger.debug(f"Could not close a replaced LLM client: {str(e)}")
+
+
+def create_llm_parser() -> LLMResumeParser:
+    """An LLMResumeParser sharing the model's rate limit with every process, configured from the environment."""
+    from ..deps import get_redis
+
+    return LLMResumeParser(rate_limiter=RedisTokenBucket(get_redis(), GPT4_MODEL))
+
+
+_parser: Optional[LLMResumeParser] = None
+
+
+def get_llm_parser() -> LLMResumeParser:
+    """Process-wide LLM parser for async callers."""
+    global _parser
+    if _parser is None:
+        _parser = create_llm_parser()
+    return _parser
+
+
+async def close_llm_parser() -> None:
+    """Close the process-wide LLM parser's client, if one was created."""
+    if _parser is not None:
+        await _parser.aclose()
+
+
+_sync_parser: Optional[LLMResumeParser] = None
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_lock = threading.Lock()
+
+
+def parse_file_sync(file_path: str) -> Dict[str, Any]:
+    """
+    Parse a resume from synchronous code (RQ jobs, parser pool processes).
+    Calls run on one event loop thread per process, so they share its
+    client and connections and may run concurrently from several threads.
+    """
+    global _sync_parser, _sync_loop
+    with _sync_lock:
+        if _sync_loop is None:
+            _sync_parser = create_llm_parser()
+            _sync_loop = asyncio.new_event_loop()
+            threading.Thread(target=_sync_loop.run_forever, name="llm-parser", daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(_sync_parser.parse_file(file_path), _sync_loop).result()
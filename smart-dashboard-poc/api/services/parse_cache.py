@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, BinaryIO, Dict, Optional
+
+import redis
+from redis import Redis
+
+from .docai_parser import PARSER_VERSION as DOCAI_PARSER_VERSION
+from .gpt4_parser import PARSER_VERSION as GPT4_PARSER_VERSION
+from .text_extraction import TEXT_EXTRACTION_VERSION
+
+logger = logging.getLogger(__name__)
+
+PARSE_CACHE_PREFIX = "parse_cache"
+# Cache keys scored by last use, for LRU eviction
+LRU_KEY = f"{PARSE_CACHE_PREFIX}:lru"
+STATS_KEY = f"{PARSE_CACHE_PREFIX}:stats"
+PARSE_CACHE_MAX_ENTRIES = int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "10000"))
+PARSE_CACHE_TTL_SECONDS = int(os.getenv("PARSE_CACHE_TTL_SECONDS", str(30 * 86400)))
+CHUNK_SIZE = 1024 * 1024
+
+try:
+    PYRESPARSER_VERSION = version("pyresparser")
+except PackageNotFoundError:
+    PYRESPARSER_VERSION = "unknown"
+
+
+def parser_version(parser: str) -> str:
+    """What `parser` currently is; results of other versions are not reused."""
+    if parser == "docai":
+        return DOCAI_PARSER_VERSION
+    # These two parse the text from text_extraction, so its version counts too
+    if parser == "gpt-4":
+        return f"{GPT4_PARSER_VERSION}+{TEXT_EXTRACTION_VERSION}"
+    return f"{PYRESPARSER_VERSION}+{TEXT_EXTRACTION_VERSION}"
+
+
+def parse_cache_key(content_sha256: str, parser: str) -> str:
+    return f"{PARSE_CACHE_PREFIX}:{content_sha256}:{parser}:{parser_version(parser)}"
+
+
+def copy_and_hash(source: BinaryIO, target: BinaryIO) -> str:
+    """Copy `source` to `target` in chunks; returns the sha256 of the bytes copied."""
+    digest = hashlib.sha256()
+    while True:
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            return digest.hexdigest()
+        digest.update(chunk)
+        target.write(chunk)
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_cached_parse(
+    redis_conn: Redis, content_sha256: str, parser: str, record_miss: bool = True,
+) -> Optional[Dict[str, Any]]:
+    """
+    The cached parse of the file with this content by `parser`, or None.
+    A hit refreshes the entry's LRU position and adds the parse time it
+    saved to the stats. Redis errors count as misses.
+    """
+    key = parse_cache_key(content_sha256, parser)
+    try:
+        raw = redis_conn.get(key)
+        if raw is None:
+            if record_miss:
+                redis_conn.hincrby(STATS_KEY, "misses", 1)
+            return None
+        entry = json.loads(raw)
+        pipe = redis_conn.pipeline()
+        pipe.zadd(LRU_KEY, {key: time.time()})
+        pipe.expire(key, PARSE_CACHE_TTL_SECONDS)
+        pipe.hincrby(STATS_KEY, "hits", 1)
+        pipe.hincrbyfloat(STATS_KEY, "parser_seconds_saved", entry["parse_seconds"])
+        pipe.execute()
+        return entry["parsed"]
+    except redis.RedisError as e:
+        logger.warning(f"Parse cache read failed: {str(e)}")
+        return None
+
+
+def cache_parse(
+    redis_conn: Redis, content_sha256: str, parser: str, parsed: Dict[str, Any], parse_seconds: float,
+    max_entries: int = PARSE_CACHE_MAX_ENTRIES,
+) -> None:
+    """
+    Store a parse result, evicting the least recently used entries beyond
+    `max_entries`. Failed parses are not stored, so the next upload retries.
+    """
+    if "error" in parsed:
+        logger.warning(f"Not caching the failed {parser} parse of {content_sha256}: {parsed['error']}")
+        return
+    key = parse_cache_key(content_sha256, parser)
+    entry = json.dumps({"parsed": parsed, "parse_seconds": round(parse_seconds, 3)}, default=str)
+    try:
+        pipe = redis_conn.pipeline()
+        pipe.set(key, entry, ex=PARSE_CACHE_TTL_SECONDS)
+        pipe.zadd(LRU_KEY, {key: time.time()})
+        pipe.zcard(LRU_KEY)
+        size = pipe.execute()[-1]
+        if size > max_entries:
+            # ZPOPMIN is atomic, so concurrent writers never evict the same entry twice
+            evicted = [member for member, _ in redis_conn.zpopmin(LRU_KEY, size - max_entries)]
+            if evicted:
+                pipe = redis_conn.pipeline()
+                pipe.delete(*evicted)
+                pipe.hincrby(STATS_KEY, "evictions", len(evicted))
+                pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Parse cache write failed: {str(e)}")
+
+
+def parse_cache_stats(redis_conn: Redis) -> Dict[str, Any]:
+    """Hit rate and parser time saved, across all API processes and workers."""
+    stats = {
+        (field.decode("utf-8") if isinstance(field, bytes) else field): float(value)
+        for field, value in redis_conn.hgetall(STATS_KEY).items()
+    }
+    hits, misses = int(stats.get("hits", 0)), int(stats.get("misses", 0))
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        "parser_seconds_saved": round(stats.get("parser_seconds_saved", 0.0), 3),
+        "evictions": int(stats.get("evictions", 0)),
+        "entries": redis_conn.zcard(LRU_KEY),
+        "max_entries": PARSE_CACHE_MAX_ENTRIES,
+    }
@@ -0,0 +1,161 @@
+import os
+import re
+import time
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import redis
+from redis import Redis
+
+logger = logging.getLogger(__name__)
+
+# The parser preference that runs the cascade
+CASCADE_PARSER = "cascade"
+LOCAL_PARSER = "pyresparser"
+# Paid parser for resumes the local parse is not confident about ("gpt-4" or "docai")
+CASCADE_ESCALATION_PARSER = os.getenv("PARSER_CASCADE_ESCALATION", "gpt-4")
+CASCADE_CONFIDENCE_THRESHOLD = float(os.getenv("PARSER_CASCADE_THRESHOLD", "0.75"))
+# Skills found for full marks on the skills part of the score
+CASCADE_MIN_SKILLS = int(os.getenv("PARSER_CASCADE_MIN_SKILLS", "5"))
+STATS_KEY = "parser_cascade:stats"
+
+# How much each field counts towards confidence; they add up to 1
+CONFIDENCE_WEIGHTS = {"name": 0.3, "email": 0.25, "mobile_number": 0.15, "skills": 0.3}
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# How a cascaded parse ended
+LOCAL = "local"
+ESCALATED = "escalated"
+ESCALATION_FAILED = "escalation_failed"
+OUTCOMES = (LOCAL, ESCALATED, ESCALATION_FAILED)
+
+
+def parse_confidence(parsed: Dict[str, Any], min_skills: int = CASCADE_MIN_SKILLS) -> float:
+    """
+    How complete a parse looks, from 0 to 1: a name of at least two words,
+    a well-formed email, a phone number with at least seven digits, and
+    the share of `min_skills` skills found.
+    """
+    name = parsed.get("name") or ""
+    email = parsed.get("email") or ""
+    phone = parsed.get("mobile_number") or ""
+    skills = parsed.get("skills") or []
+    score = 0.0
+    if isinstance(name, str) and len(name.split()) >= 2:
+        score += CONFIDENCE_WEIGHTS["name"]
+    if isinstance(email, str) and EMAIL_PATTERN.match(email.strip()):
+        score += CONFIDENCE_WEIGHTS["email"]
+    if sum(char.isdigit() for char in str(phone)) >= 7:
+        score += CONFIDENCE_WEIGHTS["mobile_number"]
+    score += CONFIDENCE_WEIGHTS["skills"] * min(len(skills) / min_skills, 1.0) if min_skills else 0.0
+    return round(score, 4)
+
+
+def merge_parses(primary: Dict[str, Any], fallback: Dict[str, Any]) -> Dict[str, Any]:
+    """`primary`, with fields it left empty taken from `fallback`."""
+    merged = dict(fallback)
+    merged.update({field: value for field, value in primary.items() if value not in (None, "", [], {})})
+    merged.pop("error", None)
+    return merged
+
+
+def record_cascade(redis_conn: Redis, outcome: str, seconds: float, confidence: float, tier_seconds: Dict[str, float]) -> None:
+    """Count a cascaded parse, its latency and its local confidence; shared by every process."""
+    try:
+        pipe = redis_conn.pipeline()
+        pipe.hincrby(STATS_KEY, f"{outcome}:count", 1)
+        pipe.hincrbyfloat(STATS_KEY, f"{outcome}:seconds", seconds)
+        pipe.hincrby(STATS_KEY, f"confidence:{min(int(confidence * 10), 9) / 10:.1f}", 1)
+        for parser, parser_seconds in tier_seconds.items():
+            pipe.hincrby(STATS_KEY, f"parser:{parser}:count", 1)
+            pipe.hincrbyfloat(STATS_KEY, f"parser:{parser}:seconds", parser_seconds)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not record parser cascade stats: {str(e)}")
+
+
+async def run_cascade(
+    redis_conn: Redis,
+    parse_tier: Callable[[str], Awaitable[Optional[Tuple[Dict[str, Any], bool]]]],
+    escalation_parser: Optional[str] = None,
+    threshold: Optional[float] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Parse with the local parser through `parse_tier(parser)` and, when its
+    confidence is below `threshold`, with `escalation_parser` as well,
+    keeping the local values for fields the escalation left empty. If the
+    escalation fails the local parse is used.
+
+    `parse_tier` returns the parse and whether it came from the parse
+    cache, or None (e.g. a cache-only lookup that missed), and so does the
+    cascade then. Only parsers that actually ran are counted in the stats,
+    and a cascade served entirely from the cache is not counted at all.
+    """
+    escalation_parser = escalation_parser or CASCADE_ESCALATION_PARSER
+    threshold = CASCADE_CONFIDENCE_THRESHOLD if threshold is None else threshold
+    start = time.perf_counter()
+    tier_seconds: Dict[str, float] = {}
+
+    result = await parse_tier(LOCAL_PARSER)
+    if result is None:
+        return None
+    local, cached = result
+    if not cached:
+        tier_seconds[LOCAL_PARSER] = time.perf_counter() - start
+    confidence = parse_confidence(local)
+    parsed, outcome = local, LOCAL
+
+    if confidence < threshold:
+        escalation_start = time.perf_counter()
+        cached = False
+        try:
+            result = await parse_tier(escalation_parser)
+            if result is None:
+                return None
+            escalated, cached = result
+            if "error" in escalated:
+                raise ValueError(escalated["error"])
+            parsed, outcome = merge_parses(escalated, local), ESCALATED
+        except Exception as e:
+            logger.warning(f"Escalating a parse with confidence {confidence} to {escalation_parser} failed, keeping the local parse: {str(e)}")
+            outcome = ESCALATION_FAILED
+        if not cached:
+            tier_seconds[escalation_parser] = time.perf_counter() - escalation_start
+
+    if tier_seconds:
+        record_cascade(redis_conn, outcome, time.perf_counter() - start, confidence, tier_seconds)
+    return parsed
+
+
+def cascade_stats(redis_conn: Redis) -> Dict[str, Any]:
+    """
+    Resumes per cascade outcome with their average parse latency, calls and
+    average latency per parser, and how local confidence is distributed,
+    which shows how many resumes a different threshold would escalate.
+    """
+    stats = {
+        (field.decode("utf-8") if isinstance(field, bytes) else field): float(value)
+        for field, value in redis_conn.hgetall(STATS_KEY).items()
+    }
+
+    def average(prefix: str) -> Dict[str, Any]:
+        count = int(stats.get(f"{prefix}:count", 0))
+        seconds = stats.get(f"{prefix}:seconds", 0.0)
+        return {"count": count, "avg_seconds": round(seconds / count, 3) if count else 0.0}
+
+    outcomes = {outcome: average(outcome) for outcome in OUTCOMES}
+    resumes = sum(outcome["count"] for outcome in outcomes.values())
+    total_seconds = sum(stats.get(f"{outcome}:seconds", 0.0) for outcome in OUTCOMES)
+    parsers = sorted({field.split(":")[1] for field in stats if field.startswith("parser:")})
+    return {
+        "threshold": CASCADE_CONFIDENCE_THRESHOLD,
+        "escalation_parser": CASCADE_ESCALATION_PARSER,
+        "resumes": resumes,
+        "escalation_rate": round((resumes - outcomes[LOCAL]["count"]) / resumes, 4) if resumes else 0.0,
+        "avg_parse_seconds": round(total_seconds / resumes, 3) if resumes else 0.0,
+        "outcomes": outcomes,
+        "parsers": {parser: average(f"parser:{parser}") for parser in parsers},
+        "confidence_histogram": {
+            f"{bucket / 10:.1f}": int(stats.get(f"confidence:{bucket / 10:.1f}", 0)) for bucket in range(10)
+        },
+    }
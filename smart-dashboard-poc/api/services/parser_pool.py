@@ -0,0 +1,119 @@
+import os
+import logging
+import threading
+import multiprocessing
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .text_extraction import disable_parallel_extraction
+
+logger = logging.getLogger(__name__)
+
+# Parsing is CPU-bound (PDF text extraction, spaCy), so it runs in processes
+PARSER_POOL_WORKERS = int(os.getenv("PARSER_POOL_WORKERS", "0")) or os.cpu_count() or 1
+# Workers are replaced after this many parses, which bounds the growth of
+# the spaCy vocabularies they keep between resumes
+PARSER_POOL_MAX_JOBS = int(os.getenv("PARSER_POOL_MAX_JOBS_PER_WORKER", "200"))
+# The two pipelines pyresparser loads on every ResumeParser() call. The
+# package is located without importing it: importing spaCy takes seconds,
+# so only parser processes do
+_pyresparser = importlib.util.find_spec("pyresparser")
+PYRESPARSER_MODELS = ("en_core_web_sm", os.path.dirname(os.path.abspath(_pyresparser.origin)) if _pyresparser else "")
+
+
+class PreloadedSpacy:
+    """
+    Stands in for the `spacy` module inside pyresparser, whose parser calls
+    spacy.load() for two pipelines on every resume. load() here returns a
+    pipeline loaded once per process; everything else is spaCy's own.
+    """
+
+    def __init__(self):
+        self._models: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def load(self, name, **kwargs):
+        import spacy
+
+        key = str(name)
+        with self._lock:
+            if key not in self._models:
+                self._models[key] = spacy.load(name, **kwargs)
+            return self._models[key]
+
+    def __getattr__(self, attribute):
+        import spacy
+
+        return getattr(spacy, attribute)
+
+
+def warm_up_parsers() -> None:
+    """
+    Make this process's default parser reuse its spaCy pipelines, loading
+    them now. Safe to call more than once. A pipeline that fails to load
+    is logged and left to fail on the parses that need it.
+    """
+    from pyresparser import resume_parser
+
+    if not isinstance(resume_parser.spacy, PreloadedSpacy):
+        resume_parser.spacy = PreloadedSpacy()
+    for model in PYRESPARSER_MODELS:
+        try:
+            resume_parser.spacy.load(model)
+        except Exception as e:
+            logger.warning(f"Could not preload spaCy pipeline {model}: {str(e)}")
+    logger.info(f"Parser models loaded in process {os.getpid()}")
+
+
+def _init_pool_worker(initializer: Optional[Callable[..., None]], initargs: tuple) -> None:
+    # The pool already has a process per core; extraction processes of its
+    # own would multiply them
+    disable_parallel_extraction()
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def create_parser_pool(
+    max_workers: Optional[int] = None,
+    max_jobs_per_worker: Optional[int] = None,
+    initializer: Optional[Callable[..., None]] = warm_up_parsers,
+    initargs: tuple = (),
+) -> ProcessPoolExecutor:
+    """
+    A pool of parser processes that run `initializer` (by default, load the
+    parser models) once when they start and are replaced after
+    `max_jobs_per_worker` parses (Python 3.11+). Replacement needs spawned
+    rather than forked processes. Workers extract PDF text in-process.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers or PARSER_POOL_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_pool_worker,
+        initargs=(initializer, initargs),
+        max_tasks_per_child=max_jobs_per_worker or PARSER_POOL_MAX_JOBS,
+    )
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_parser_pool() -> ProcessPoolExecutor:
+    """Process-wide warm parser pool, created on first use."""
+    global _pool
+    if _pool is None:
+        _pool = create_parser_pool()
+    return _pool
+
+
+def shutdown_parser_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def discard_parser_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop `pool` if it is the shared pool (e.g. after a worker crashed), so the next caller gets a new one."""
+    if pool is _pool:
+        shutdown_parser_pool()
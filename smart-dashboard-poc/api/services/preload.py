@@ -0,0 +1,43 @@
+import os
+import time
+import logging
+import importlib
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Heavy libraries are imported on first use so the API starts fast. Modules
+# listed here (comma separated, e.g. "openai,bs4") are imported in the
+# background once the app is serving, so the first request that needs one
+# does not wait for it. Empty by default: an API process may never need them.
+PRELOAD_MODULES = [name.strip() for name in os.getenv("API_PRELOAD_MODULES", "").split(",") if name.strip()]
+
+
+def preload_modules(modules: List[str]) -> Dict[str, float]:
+    """Import `modules`, returning the seconds each took. Failures are logged and skipped."""
+    timings = {}
+    for name in modules:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            logger.warning(f"Could not preload {name}: {str(e)}")
+            continue
+        timings[name] = round(time.perf_counter() - start, 3)
+    logger.info(f"Preloaded modules: {timings}")
+    return timings
+
+
+def start_preload(modules: Optional[List[str]] = None) -> Optional[threading.Thread]:
+    """
+    Preload `modules` (PRELOAD_MODULES by default) on a daemon thread, which
+    never delays startup or shutdown. Returns the thread, or None if there
+    is nothing to load.
+    """
+    modules = PRELOAD_MODULES if modules is None else modules
+    if not modules:
+        return None
+    thread = threading.Thread(target=preload_modules, args=(modules,), name="module-preload", daemon=True)
+    thread.start()
+    return thread
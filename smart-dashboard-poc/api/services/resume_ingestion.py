@@ -0,0 +1,217 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from redis import Redis
+from rq import Queue
+
+from ..models import Candidate, IngestionJob, IngestionStatus
+from .candidate_embedding import profile_text, store_candidate_embedding
+from .candidate_index import save_candidate
+from .docai_parser import parse_with_docai
+from .embedding_backends import select_embedding_backend
+from .embeddings import embed_text
+from .gpt4_parser import parse_with_gpt4
+from .parse_cache import cache_parse, file_sha256, get_cached_parse
+from .parser_cascade import CASCADE_PARSER, run_cascade
+from .text_extraction import use_for_pyresparser
+
+logger = logging.getLogger(__name__)
+
+INGESTION_PREFIX = "ingestion"
+INGESTION_TTL_SECONDS = 86400
+# Separate from the default (apply bot) queue so parsing capacity is
+# scaled on its own: `rq worker resume_ingestion`
+INGESTION_QUEUE = os.getenv("RESUME_INGESTION_QUEUE", "resume_ingestion")
+INGESTION_JOB_TIMEOUT = int(os.getenv("RESUME_INGESTION_TIMEOUT_SECONDS", "300"))
+DEFAULT_PARSER = "pyresparser"
+
+
+def ingestion_key(job_id: str) -> str:
+    return f"{INGESTION_PREFIX}:{job_id}"
+
+
+def get_ingestion_queue(redis_conn: Redis) -> Queue:
+    return Queue(INGESTION_QUEUE, connection=redis_conn)
+
+
+def parser_preference(redis_conn: Redis) -> str:
+    preference = redis_conn.get("settings:parser_preference")
+    return preference.decode("utf-8") if preference else DEFAULT_PARSER
+
+
+def parse_with_pyresparser(file_path: str) -> Dict[str, Any]:
+    # Imported on first use: pyresparser pulls in spaCy and NLTK, which only
+    # parsing processes need
+    from pyresparser import ResumeParser
+
+    use_for_pyresparser()
+    return ResumeParser(file_path).get_extracted_data()
+
+
+def parse_resume(file_path: str, parser: str) -> Dict[str, Any]:
+    """Parse a resume file with the named parser (pyresparser by default)."""
+    if parser == "docai":
+        return parse_with_docai(file_path)
+    if parser == "gpt-4":
+        return parse_with_gpt4(file_path)
+    return parse_with_pyresparser(file_path)
+
+
+def _cached_or_parsed(
+    redis_conn: Redis, file_path: str, parser: str, content_sha256: str, record_miss: bool,
+) -> Tuple[Dict[str, Any], bool]:
+    """The parse and whether it came from the cache."""
+    cached = get_cached_parse(redis_conn, content_sha256, parser, record_miss=record_miss)
+    if cached is not None:
+        return cached, True
+    start = time.perf_counter()
+    parsed = parse_resume(file_path, parser)
+    cache_parse(redis_conn, content_sha256, parser, parsed, time.perf_counter() - start)
+    return parsed, False
+
+
+def parse_with_cache(
+    redis_conn: Redis, file_path: str, parser: str, content_sha256: str, record_miss: bool = True,
+) -> Dict[str, Any]:
+    """
+    `parse_resume`, reusing and recording results by file content. The
+    cascade caches each parser it runs under that parser.
+    """
+    if parser == CASCADE_PARSER:
+        async def parse_tier(tier: str) -> Tuple[Dict[str, Any], bool]:
+            return _cached_or_parsed(redis_conn, file_path, tier, content_sha256, record_miss)
+
+        return asyncio.run(run_cascade(redis_conn, parse_tier))
+    return _cached_or_parsed(redis_conn, file_path, parser, content_sha256, record_miss)[0]
+
+
+def build_candidate(parsed_data: Dict[str, Any], file_path: str, candidate_id: Optional[str] = None) -> Candidate:
+    return Candidate(
+        candidate_id=candidate_id or str(uuid.uuid4()),
+        name=parsed_data.get("name"),
+        email=parsed_data.get("email"),
+        mobile_number=parsed_data.get("mobile_number"),
+        skills=parsed_data.get("skills") or [],
+        resume_file_path=file_path,
+        status="Pending",
+    )
+
+
+async def embed_candidate(redis_conn: Redis, candidate: Candidate) -> None:
+    """
+    Embed the candidate's profile once at ingestion so job matching can
+    read the stored vector; a failure only means matching computes it on
+    demand.
+    """
+    try:
+        backend = select_embedding_backend(redis_conn)
+        embedding = await embed_text(profile_text(candidate.skills), backend)
+        store_candidate_embedding(redis_conn, candidate.candidate_id, candidate.skills, embedding, backend.model)
+    except Exception as e:
+        logger.warning(f"Could not precompute embedding for candidate {candidate.candidate_id}: {str(e)}")
+
+
+def load_ingestion(redis_conn: Redis, job_id: str) -> Optional[IngestionJob]:
+    data = redis_conn.get(ingestion_key(job_id))
+    return IngestionJob.parse_raw(data) if data else None
+
+
+def save_ingestion(redis_conn: Redis, job: IngestionJob) -> None:
+    job.updated_at = datetime.utcnow().isoformat()
+    redis_conn.set(ingestion_key(job.job_id), job.json(), ex=INGESTION_TTL_SECONDS)
+
+
+async def ingest_cached(redis_conn: Redis, file_path: str, parser: str, content_sha256: str) -> Optional[IngestionJob]:
+    """
+    Complete the ingestion of an upload at once if `parser` has already
+    parsed a file with the same content (for the cascade, every parser it
+    would run); None if it has not.
+    """
+    if parser == CASCADE_PARSER:
+        # Every tier comes from the cache, so the cascade records no stats
+        async def cached_tier(tier: str) -> Optional[Tuple[Dict[str, Any], bool]]:
+            parsed = get_cached_parse(redis_conn, content_sha256, tier)
+            return None if parsed is None else (parsed, True)
+
+        parsed = await run_cascade(redis_conn, cached_tier)
+    else:
+        parsed = get_cached_parse(redis_conn, content_sha256, parser)
+    if parsed is None:
+        return None
+    candidate = build_candidate(parsed, file_path)
+    save_candidate(redis_conn, candidate)
+    if candidate.skills:
+        await embed_candidate(redis_conn, candidate)
+    now = datetime.utcnow().isoformat()
+    job = IngestionJob(
+        job_id=str(uuid.uuid4()), status=IngestionStatus.COMPLETED, parser=parser, file_path=file_path,
+        content_sha256=content_sha256, candidate_id=candidate.candidate_id, created_at=now, updated_at=now,
+    )
+    save_ingestion(redis_conn, job)
+    return job
+
+
+def submit_ingestion(
+    redis_conn: Redis, queue: Queue, file_path: str, parser: str, content_sha256: Optional[str] = None,
+) -> IngestionJob:
+    """Record a queued ingestion for an uploaded file and enqueue its parsing."""
+    now = datetime.utcnow().isoformat()
+    job = IngestionJob(
+        job_id=str(uuid.uuid4()), parser=parser, file_path=file_path, content_sha256=content_sha256,
+        created_at=now, updated_at=now,
+    )
+    save_ingestion(redis_conn, job)
+    queue.enqueue(
+        "workers.resume_ingest.ingest_resume",
+        job.job_id,
+        job_id=job.job_id,
+        job_timeout=INGESTION_JOB_TIMEOUT,
+    )
+    return job
+
+
+def process_ingestion(redis_conn: Redis, job_id: str) -> Optional[IngestionJob]:
+    """
+    Parse the job's file, store the candidate and precompute its profile
+    embedding, recording progress on the ingestion record. Runs in a worker.
+    """
+    job = load_ingestion(redis_conn, job_id)
+    if job is None:
+        logger.error(f"Ingestion {job_id} not found")
+        return None
+    if job.status == IngestionStatus.COMPLETED:
+        return job
+
+    job.status = IngestionStatus.PROCESSING
+    save_ingestion(redis_conn, job)
+    logger.info(f"Ingesting {job.file_path} with '{job.parser}' (ingestion {job_id})")
+
+    try:
+        # The API already counted the cache miss for jobs it hashed; this
+        # lookup catches identical uploads queued before the first finished
+        parsed = parse_with_cache(
+            redis_conn, job.file_path, job.parser, job.content_sha256 or file_sha256(job.file_path),
+            record_miss=job.content_sha256 is None,
+        )
+        candidate = build_candidate(parsed, job.file_path)
+        save_candidate(redis_conn, candidate)
+    except Exception as e:
+        logger.error(f"Error parsing resume with {job.parser}: {str(e)}")
+        job.status = IngestionStatus.FAILED
+        job.error = f"Error parsing resume with {job.parser}: {str(e)}"
+        save_ingestion(redis_conn, job)
+        return job
+
+    if candidate.skills:
+        asyncio.run(embed_candidate(redis_conn, candidate))
+
+    job.status = IngestionStatus.COMPLETED
+    job.candidate_id = candidate.candidate_id
+    save_ingestion(redis_conn, job)
+    logger.info(f"Successfully created and stored candidate {candidate.candidate_id}")
+    return job
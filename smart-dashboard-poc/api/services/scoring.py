@@ -0,0 +1,70 @@
+from typing import Sequence, Tuple
+
+import numpy as np
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row in place; all-zero rows are left as zeros."""
+    # einsum avoids the full-size temporary that np.linalg.norm(axis=1) allocates
+    norms = np.sqrt(np.einsum("ij,ij->i", matrix, matrix))
+    np.maximum(norms, 1e-8, out=norms)
+    matrix /= norms[:, None]
+    return matrix
+
+
+def stack_embeddings(embeddings: Sequence[np.ndarray]) -> np.ndarray:
+    """Stack embeddings into a contiguous, row-normalized float32 matrix."""
+    if len(embeddings) == 0:
+        return np.zeros((0, 0), dtype=np.float32)
+    matrix = np.array(embeddings, dtype=np.float32, order="C")
+    return normalize_rows(matrix)
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the `k` highest scores, best first, without a full sort."""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.zeros(0, dtype=np.intp)
+    if k < scores.shape[0]:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.shape[0])
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def hybrid_scores(semantic: np.ndarray, lexical: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Blend cosine scores with lexical scores scaled to [0, 1] by their
+    maximum: alpha * semantic + (1 - alpha) * lexical / max(lexical).
+    """
+    lexical = np.asarray(lexical, dtype=np.float32)
+    top = float(lexical.max()) if lexical.size else 0.0
+    scaled = lexical / top if top > 0 else np.zeros_like(lexical)
+    return alpha * np.asarray(semantic, dtype=np.float32) + (1.0 - alpha) * scaled
+
+
+class ScoringEngine:
+    """
+    Cosine-similarity top-k over a fixed set of embeddings.
+
+    The matrix is normalized once when the engine is built, so scoring a
+    query is a single matrix-vector product followed by argpartition.
+    """
+
+    def __init__(self, embeddings: Sequence[np.ndarray]):
+        self.matrix = stack_embeddings(embeddings)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        query = np.asarray(query, dtype=np.float32)
+        return self.matrix @ (query / max(float(np.linalg.norm(query)), 1e-8))
+
+    def top_k(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (indices, cosine scores) of the `k` best matches, best first."""
+        if len(self) == 0:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.float32)
+        scores = self.scores(query)
+        indices = top_k_indices(scores, k)
+        return indices, scores[indices]
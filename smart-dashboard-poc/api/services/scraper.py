@@ -0,0 +1,177 @@
+import os
+import asyncio
+import logging
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlparse
+
+import httpx
+
+from ..models import Job
+from .extraction import INDEED_SELECTORS, extract_cards
+
+logger = logging.getLogger(__name__)
+
+INDEED_BASE_URL = "https://www.indeed.com"
+INDEED_PAGE_SIZE = 10
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+
+class ScraperClient:
+    """
+    Shared async HTTP client for scraping job boards.
+
+    Connections are pooled and kept alive across requests, and each host
+    gets its own semaphore so a burst of page fetches never opens more than
+    `per_host_limit` concurrent requests to one board.
+    """
+
+    def __init__(
+        self,
+        per_host_limit: int = 4,
+        max_connections: int = 50,
+        max_keepalive_connections: int = 20,
+        timeout: float = 10.0,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.per_host_limit = per_host_limit
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections)
+        self._timeout = httpx.Timeout(timeout)
+        self._headers = headers or DEFAULT_HEADERS
+        # The connection pool and semaphores are bound to one event loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _bind_loop(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop or self._client is None:
+            self._loop = loop
+            self._client = httpx.AsyncClient(
+                limits=self._limits, timeout=self._timeout, headers=self._headers, follow_redirects=True
+            )
+            self._host_semaphores = {}
+        return self._client
+
+    async def get_text(self, url: str, params: Optional[Dict[str, str]] = None) -> str:
+        """GET `url` and return the body; raises httpx.HTTPError on failure."""
+        client = self._bind_loop()
+        host = urlparse(url).netloc
+        semaphore = self._host_semaphores.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        async with semaphore:
+            response = await client.get(url, params=params)
+            response.raise_for_status()
+            return response.text
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+
+_client: Optional[ScraperClient] = None
+
+
+def get_scraper_client() -> ScraperClient:
+    """Process-wide scraper client, configured from the environment."""
+    global _client
+    if _client is None:
+        _client = ScraperClient(
+            per_host_limit=int(os.getenv("SCRAPER_PER_HOST_LIMIT", "4")),
+            timeout=float(os.getenv("SCRAPER_TIMEOUT_SECONDS", "10")),
+        )
+    return _client
+
+
+def parse_indeed_page(
+    html: str,
+    base_url: str = INDEED_BASE_URL,
+    limit: Optional[int] = None,
+    backend: Optional[str] = None,
+) -> List[Job]:
+    """Extract job cards from one Indeed results page."""
+    backend = backend or os.getenv("SCRAPER_PARSER", "lxml")
+    if limit is not None and backend == "lxml":
+        # Stop parsing as soon as enough cards have been seen
+        backend = "stream"
+
+    jobs_list = []
+    for record in extract_cards(html, INDEED_SELECTORS, limit=limit, backend=backend):
+        missing = [field for field, value in record.items() if value is None]
+        if missing:
+            logger.error(f"Error parsing job card: missing {', '.join(missing)}")
+            continue
+        jobs_list.append(Job(
+            title=record["title"],
+            company=record["company"],
+            location=record["location"],
+            url=urljoin(base_url, record["link"]),
+            description=record["description"]
+        ))
+
+    return jobs_list
+
+
+async def fetch_indeed_page(
+    client: ScraperClient, search_query: str, location: str, start: int, base_url: str,
+    max_cards: Optional[int] = None,
+) -> List[Job]:
+    """Fetch and parse a single results page; failures yield no jobs."""
+    params = {"q": search_query, "l": location, "sort": "date", "start": str(start)}
+    try:
+        html = await client.get_text(urljoin(base_url, "/jobs"), params=params)
+    except httpx.TimeoutException:
+        logger.error(f"Request timed out while scraping jobs (start={start})")
+        return []
+    except httpx.HTTPError as e:
+        logger.error(f"Network error while scraping jobs (start={start}): {str(e)}")
+        return []
+    return parse_indeed_page(html, base_url, limit=max_cards)
+
+
+def scraper_pages() -> int:
+    """Result pages fetched per search (SCRAPER_PAGES)."""
+    return int(os.getenv("SCRAPER_PAGES", "3"))
+
+
+async def scrape_indeed_jobs(
+    skills: List[str],
+    location: str = "Remote",
+    pages: Optional[int] = None,
+    base_url: Optional[str] = None,
+    client: Optional[ScraperClient] = None,
+    max_cards_per_page: Optional[int] = None,
+) -> List[Job]:
+    """
+    Scrape job listings from Indeed based on candidate skills.
+
+    Result pages are fetched concurrently over the shared connection pool;
+    jobs are returned in page order with duplicate URLs removed.
+    """
+    search_query = " ".join(skills[:3])  # Use top 3 skills
+    pages = pages or scraper_pages()
+    base_url = base_url or os.getenv("INDEED_BASE_URL", INDEED_BASE_URL)
+    client = client or get_scraper_client()
+
+    try:
+        page_results = await asyncio.gather(*[
+            fetch_indeed_page(client, search_query, location, page * INDEED_PAGE_SIZE, base_url, max_cards_per_page)
+            for page in range(pages)
+        ])
+    except Exception as e:
+        logger.error(f"Unexpected error while scraping jobs: {str(e)}")
+        return []
+
+    jobs_list: List[Job] = []
+    seen_urls = set()
+    for page_jobs in page_results:
+        for job in page_jobs:
+            if job.url not in seen_urls:
+                seen_urls.add(job.url)
+                jobs_list.append(job)
+
+    if not jobs_list:
+        logger.warning('Scraper could not find any job listings. The website structure may have changed.')
+    return jobs_list
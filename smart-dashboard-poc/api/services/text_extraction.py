@@ -0,0 +1,208 @@
+import os
+import mmap
+import zlib
+import hashlib
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional
+
+import redis
+from redis import Redis
+
+logger = logging.getLogger(__name__)
+
+# Part of every cache key, and of the parse cache version of the parsers that
+# read text from here: bump it when extraction output changes
+TEXT_EXTRACTION_VERSION = "pypdf2-3/1"
+TEXT_CACHE_PREFIX = "text_cache"
+TEXT_CACHE_TTL_SECONDS = int(os.getenv("TEXT_CACHE_TTL_SECONDS", str(7 * 86400)))
+# Budgets; 0 means no limit
+TEXT_EXTRACTION_MAX_PAGES = int(os.getenv("TEXT_EXTRACTION_MAX_PAGES", "0"))
+TEXT_EXTRACTION_MAX_CHARS = int(os.getenv("TEXT_EXTRACTION_MAX_CHARS", "0"))
+# Processes large PDFs are split across; 1 (the default) extracts in the
+# calling process. Only worth raising for a dedicated parsing process with
+# idle cores: it is ignored in parser pool workers and the API process
+TEXT_EXTRACTION_WORKERS = max(1, int(os.getenv("TEXT_EXTRACTION_WORKERS", "1")))
+# PDFs with at least this many pages (after the page budget) are split
+# across processes; below it, handing pages over costs more than it saves
+PARALLEL_MIN_PAGES = int(os.getenv("TEXT_EXTRACTION_PARALLEL_MIN_PAGES", "24"))
+# Pages per task, so early chunks can end the extraction under a character budget
+PAGES_PER_TASK = 8
+
+
+_parallel_disabled = False
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def disable_parallel_extraction() -> None:
+    """
+    Extract in the calling process from now on, whatever `workers` asks
+    for: for processes that are themselves one of many parsers (parser
+    pool workers) or must not fork (the multithreaded API process).
+    """
+    global _parallel_disabled
+    _parallel_disabled = True
+
+
+def _extraction_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    The process's pool of `workers` extraction processes, started on first
+    use and kept for later PDFs; a forked child starts its own.
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid() or _pool._max_workers != workers:
+            if _pool is not None and _pool_pid == os.getpid():
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+@contextmanager
+def _mapped(file_path: str) -> Iterator[Any]:
+    """The file's bytes, memory-mapped read-only (empty files map to b"")."""
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def _pdf_reader(data: Any):
+    # Imported here so the API process never loads it; only parsers do
+    import PyPDF2
+
+    return PyPDF2.PdfReader(data)
+
+
+def _extract_pdf_pages(file_path: str, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop) of a PDF; runs in extraction worker processes."""
+    with _mapped(file_path) as data:
+        pages = _pdf_reader(data).pages
+        return [pages[index].extract_text() for index in range(start, stop)]
+
+
+def _within_budget(texts: List[str], max_chars: int) -> bool:
+    # Pages are joined with one space
+    return not max_chars or sum(len(text) + 1 for text in texts) <= max_chars
+
+
+def _extract_pdf(file_path: str, data: Any, max_pages: int, max_chars: int, workers: int) -> List[str]:
+    pages = _pdf_reader(data).pages
+    page_count = min(len(pages), max_pages) if max_pages else len(pages)
+
+    if workers <= 1 or _parallel_disabled or page_count < PARALLEL_MIN_PAGES:
+        texts: List[str] = []
+        for index in range(page_count):
+            texts.append(pages[index].extract_text())
+            if not _within_budget(texts, max_chars):
+                break
+        return texts
+
+    # Each process maps and opens the file itself; only page numbers and text cross processes.
+    # Chunks are collected in order so the budget check can cancel the rest.
+    texts = []
+    pool = _extraction_pool(workers)
+    chunks = [
+        pool.submit(_extract_pdf_pages, file_path, start, min(start + PAGES_PER_TASK, page_count))
+        for start in range(0, page_count, PAGES_PER_TASK)
+    ]
+    for chunk in chunks:
+        texts.extend(chunk.result())
+        if not _within_budget(texts, max_chars):
+            for pending in chunks:
+                pending.cancel()
+            break
+    return texts
+
+
+def _extract_docx(file_path: str) -> List[str]:
+    import docx
+
+    # python-docx needs a seekable file object, which mmap is not; documents are small
+    return [paragraph.text for paragraph in docx.Document(file_path).paragraphs]
+
+
+def text_cache_key(content_sha256: str, max_pages: int, max_chars: int) -> str:
+    return f"{TEXT_CACHE_PREFIX}:{content_sha256}:{TEXT_EXTRACTION_VERSION}:{max_pages}:{max_chars}"
+
+
+def extract_text(
+    file_path: str,
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    redis_conn: Optional[Redis] = None,
+    workers: Optional[int] = None,
+) -> str:
+    """
+    The text of a PDF or DOCX resume: PDF pages or DOCX paragraphs joined
+    with single spaces, cut at `max_chars`. PDFs stop after `max_pages`
+    pages, and extraction stops early once `max_chars` is reached. Large
+    PDFs are split across a kept pool of `workers` processes (default
+    TEXT_EXTRACTION_WORKERS, 1) unless this process disabled parallel
+    extraction. Results are cached in Redis by content hash, so reparsing
+    a file with any parser extracts it once. The budgets default to
+    TEXT_EXTRACTION_MAX_PAGES/_MAX_CHARS.
+    """
+    file_ext = file_path.lower().split('.')[-1]
+    if file_ext not in ("pdf", "docx"):
+        raise ValueError(f"Unsupported file format: {file_ext}")
+    max_pages = TEXT_EXTRACTION_MAX_PAGES if max_pages is None else max_pages
+    max_chars = TEXT_EXTRACTION_MAX_CHARS if max_chars is None else max_chars
+    if redis_conn is None:
+        from ..deps import get_redis
+
+        redis_conn = get_redis()
+
+    with _mapped(file_path) as data:
+        key = text_cache_key(hashlib.sha256(data).hexdigest(), max_pages, max_chars)
+        try:
+            cached = redis_conn.get(key)
+            if cached is not None:
+                return zlib.decompress(cached).decode("utf-8")
+        except redis.RedisError as e:
+            logger.warning(f"Text cache read failed: {str(e)}")
+
+        if file_ext == "pdf":
+            texts = _extract_pdf(file_path, data, max_pages, max_chars, workers or TEXT_EXTRACTION_WORKERS)
+        else:
+            texts = _extract_docx(file_path)
+
+    text = " ".join(texts)
+    if max_chars:
+        text = text[:max_chars]
+    try:
+        redis_conn.set(key, zlib.compress(text.encode("utf-8")), ex=TEXT_CACHE_TTL_SECONDS)
+    except redis.RedisError as e:
+        logger.warning(f"Text cache write failed: {str(e)}")
+    return text
+
+
+_pyresparser_extract_text: Optional[Callable[[Any, str], str]] = None
+
+
+def _extract_for_pyresparser(resume: Any, extension: str) -> str:
+    if isinstance(resume, str) and extension in (".pdf", ".docx"):
+        # pyresparser prefixes every page with a space
+        return " " + extract_text(resume)
+    return _pyresparser_extract_text(resume, extension)
+
+
+def use_for_pyresparser() -> None:
+    """
+    Make pyresparser read PDF and DOCX text from `extract_text` in this
+    process. Its own extractor is kept for legacy .doc files and in-memory
+    uploads. Safe to call more than once.
+    """
+    global _pyresparser_extract_text
+    from pyresparser import utils
+
+    if utils.extract_text is not _extract_for_pyresparser:
+        _pyresparser_extract_text = utils.extract_text
+        utils.extract_text = _extract_for_pyresparser
@@ -0,0 +1,214 @@
+import os
+import uuid
+import asyncio
+import hashlib
+import logging
+from typing import BinaryIO, Dict, Optional
+
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = os.getenv("RESUME_UPLOAD_DIR", "uploads")
+MAX_UPLOAD_BYTES = int(float(os.getenv("RESUME_MAX_UPLOAD_MB", "10")) * 1024 * 1024)
+# Room for the multipart boundaries and part headers around the file
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+# Bytes held back before the file is opened, enough to recognise its type
+SNIFF_BYTES = 8 * 1024
+
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+DOC = "application/msword"
+RESUME_TYPES = {PDF: ".pdf", DOCX: ".docx", DOC: ".doc"}
+
+
+class UploadRejected(ValueError):
+    """An upload that cannot be stored; `status_code` is the HTTP status to answer with."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def sniff_mime(head: bytes, filename: str = "") -> Optional[str]:
+    """The resume type of a file from its first bytes, or None for anything else."""
+    if head.startswith(b"%PDF-"):
+        return PDF
+    if head.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"):
+        # OLE2 compound document, the legacy Word format
+        return DOC
+    if head.startswith(b"PK\x03\x04"):
+        # A zip container; Word documents keep their parts under word/
+        if b"word/" in head or filename.lower().endswith(".docx"):
+            return DOCX
+    return None
+
+
+def unique_upload_path(upload_dir: str, filename: str, extension: str = "") -> str:
+    """
+    A new path in `upload_dir` for an uploaded file, keeping its base name
+    for readability. Directory parts of `filename` are dropped.
+    """
+    name = os.path.basename(filename or "") or "resume"
+    if extension and not name.lower().endswith(extension):
+        name += extension
+    return os.path.join(upload_dir, f"{uuid.uuid4().hex}_{name}")
+
+
+class StoredUpload:
+    def __init__(self, filename: str, path: str, size: int, sha256: str, mime_type: str):
+        self.filename = filename
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.mime_type = mime_type
+
+
+class UploadWriter:
+    """
+    Writes one uploaded file to `upload_dir` chunk by chunk, hashing it and
+    counting its size on the way. The first SNIFF_BYTES are held back to
+    detect the type, which picks the file's extension; past that, memory
+    use does not depend on the file's size. Exceeding `max_bytes` or an
+    unsupported type raises UploadRejected and deletes what was written.
+    Its methods do blocking file I/O; async callers run them on a thread.
+    """
+
+    def __init__(self, filename: str, upload_dir: str = UPLOAD_DIR, max_bytes: int = MAX_UPLOAD_BYTES):
+        self.filename = filename
+        self.upload_dir = upload_dir
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.mime_type: Optional[str] = None
+        self.path: Optional[str] = None
+        self._digest = hashlib.sha256()
+        self._head = bytearray()
+        self._file: Optional[BinaryIO] = None
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            self.abort()
+            raise UploadRejected(f"File is larger than {self.max_bytes // (1024 * 1024)} MB", status_code=413)
+        self._digest.update(chunk)
+        if self._file is None:
+            self._head += chunk
+            if len(self._head) >= SNIFF_BYTES:
+                self._open()
+        else:
+            self._file.write(chunk)
+
+    def _open(self) -> None:
+        self.mime_type = sniff_mime(bytes(self._head), self.filename)
+        if self.mime_type is None:
+            self.abort()
+            raise UploadRejected("Only PDF and Word resumes are supported", status_code=415)
+        os.makedirs(self.upload_dir, exist_ok=True)
+        self.path = unique_upload_path(self.upload_dir, self.filename, RESUME_TYPES[self.mime_type])
+        self._file = open(self.path, "wb")
+        self._file.write(self._head)
+        self._head = bytearray()
+
+    def finish(self) -> StoredUpload:
+        if self._file is None:
+            if not self._head:
+                raise UploadRejected("The uploaded file is empty")
+            self._open()
+        self._file.close()
+        return StoredUpload(self.filename, self.path, self.size, self._digest.hexdigest(), self.mime_type)
+
+    def abort(self) -> None:
+        """Close and delete the partial file, if any."""
+        self._head = bytearray()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _header_params(value: bytes) -> Dict[bytes, bytes]:
+    return parse_options_header(value)[1]
+
+
+async def receive_upload(
+    request: Request,
+    field_name: str = "file",
+    upload_dir: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+) -> StoredUpload:
+    """
+    Stream the `field_name` file of a multipart/form-data request straight
+    into `upload_dir`, under a unique name. A Content-Length over the limit
+    is refused before the body is read; otherwise the limit is enforced as
+    bytes arrive. Other form fields are ignored. Parsing and file writes
+    run on a worker thread, one chunk at a time, so large uploads do not
+    block the event loop.
+    """
+    upload_dir = upload_dir or UPLOAD_DIR
+    max_bytes = max_bytes or MAX_UPLOAD_BYTES
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + MULTIPART_OVERHEAD_BYTES:
+        raise UploadRejected(f"File is larger than {max_bytes // (1024 * 1024)} MB", status_code=413)
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise UploadRejected("Expected a multipart/form-data upload")
+
+    part = {"headers": {}, "field": b"", "value": b""}
+    writers = []
+    current: Dict[str, Optional[UploadWriter]] = {"writer": None}
+
+    def on_part_begin() -> None:
+        part["headers"] = {}
+        current["writer"] = None
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        part["field"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        part["value"] += data[start:end]
+
+    def on_header_end() -> None:
+        part["headers"][part["field"].lower()] = part["value"]
+        part["field"], part["value"] = b"", b""
+
+    def on_headers_finished() -> None:
+        disposition = _header_params(part["headers"].get(b"content-disposition", b""))
+        filename = disposition.get(b"filename")
+        if disposition.get(b"name") == field_name.encode("utf-8") and filename is not None and not writers:
+            writer = UploadWriter(filename.decode("utf-8", "replace"), upload_dir, max_bytes)
+            writers.append(writer)
+            current["writer"] = writer
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        if current["writer"] is not None:
+            current["writer"].write(data[start:end])
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+    })
+
+    def abort_all() -> None:
+        for writer in writers:
+            writer.abort()
+
+    try:
+        async for chunk in request.stream():
+            await asyncio.to_thread(parser.write, chunk)
+        await asyncio.to_thread(parser.finalize)
+        if not writers:
+            raise UploadRejected(f"Missing file field '{field_name}'")
+        return await asyncio.to_thread(writers[0].finish)
+    except MultipartParseError as e:
+        await asyncio.to_thread(abort_all)
+        raise UploadRejected(f"Malformed multipart body: {str(e)}")
+    except BaseException:
+        await asyncio.shield(asyncio.to_thread(abort_all))
+        raise
@@ -0,0 +1,165 @@
+import os
+import struct
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .scoring import top_k_indices
+
+# magic, format version, dtype code, reserved, dim, count
+HEADER = struct.Struct("<2sBBxxxxII")
+MAGIC = b"EV"
+FORMAT_VERSION = 1
+
+FLOAT32 = "float32"
+FLOAT16 = "float16"
+INT8 = "int8"
+DTYPES = {FLOAT32: (1, np.float32), FLOAT16: (2, np.float16), INT8: (3, np.int8)}
+_DTYPES_BY_CODE = {code: name for name, (code, _) in DTYPES.items()}
+
+# Rows converted to float32 at a time when scoring float16/int8 matrices;
+# small enough that the temporary stays in cache (1.5 MB at 1536 dims)
+SCORE_CHUNK_ROWS = 256
+
+
+def check_dtype(dtype: str) -> str:
+    if dtype not in DTYPES:
+        raise ValueError(f"Unsupported vector dtype {dtype!r}; expected one of {', '.join(DTYPES)}")
+    return dtype
+
+
+def storage_dtype() -> str:
+    """
+    Format for embeddings stored in Redis, from EMBEDDING_STORAGE_DTYPE:
+    float32 unless float16 or int8 (smaller, but lossy) is chosen.
+    """
+    return check_dtype(os.getenv("EMBEDDING_STORAGE_DTYPE", FLOAT32))
+
+
+class QuantizedVectors:
+    """
+    A matrix of embeddings stored as float32, float16 or int8.
+
+    int8 rows use per-row affine quantization: x ~= scale * (q - zero_point),
+    with the row's min/max mapped onto [-128, 127]. Scales and zero points
+    are kept as float32 alongside the codes (`params`, one (scale, zero
+    point) pair per row).
+    """
+
+    def __init__(self, dtype: str, data: np.ndarray, params: Optional[np.ndarray] = None):
+        self.dtype = check_dtype(dtype)
+        self.data = data
+        self.params = params
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    @property
+    def dim(self) -> int:
+        return self.data.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + (self.params.nbytes if self.params is not None else 0)
+
+    def __getitem__(self, rows) -> "QuantizedVectors":
+        params = self.params[rows] if self.params is not None else None
+        return QuantizedVectors(self.dtype, self.data[rows], params)
+
+    def dequantize(self) -> np.ndarray:
+        """The vectors as a float32 matrix."""
+        matrix = self.data.astype(np.float32)
+        if self.dtype == INT8:
+            matrix -= self.params[:, 1:2]
+            matrix *= self.params[:, 0:1]
+        return matrix
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        """
+        Dot product of every row with `query`, without materializing the
+        whole matrix as float32. For int8 rows the affine terms are applied
+        to the dot products: scale * (q . query - zero_point * sum(query)).
+        """
+        query = np.asarray(query, dtype=np.float32)
+        if self.dtype == FLOAT32:
+            return np.asarray(self.data @ query, dtype=np.float32)
+
+        scores = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), SCORE_CHUNK_ROWS):
+            chunk = self.data[start:start + SCORE_CHUNK_ROWS]
+            scores[start:start + len(chunk)] = chunk.astype(np.float32) @ query
+        if self.dtype == INT8:
+            scores -= self.params[:, 1] * query.sum()
+            scores *= self.params[:, 0]
+        return scores
+
+    def top_k(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and scores of the `k` highest-scoring rows, best first."""
+        scores = self.scores(query)
+        indices = top_k_indices(scores, k)
+        return indices, scores[indices]
+
+
+def quantize(vectors: np.ndarray, dtype: str) -> QuantizedVectors:
+    """Quantize a (rows, dim) matrix (or a single vector, as one row)."""
+    matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    check_dtype(dtype)
+    if dtype != INT8:
+        return QuantizedVectors(dtype, np.ascontiguousarray(matrix, dtype=DTYPES[dtype][1]))
+
+    low = matrix.min(axis=1)
+    high = matrix.max(axis=1)
+    scale = np.maximum(high - low, 1e-12) / 255.0
+    zero_point = np.round(-128.0 - low / scale)
+    codes = np.clip(np.round(matrix / scale[:, None] + zero_point[:, None]), -128, 127).astype(np.int8)
+    params = np.stack([scale, zero_point], axis=1).astype(np.float32)
+    return QuantizedVectors(INT8, codes, params)
+
+
+def encode(vectors: QuantizedVectors) -> bytes:
+    """Header, then the codes, then (int8 only) the per-row params."""
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, DTYPES[vectors.dtype][0], vectors.dim, len(vectors))
+    body = np.ascontiguousarray(vectors.data).tobytes()
+    if vectors.params is not None:
+        body += np.ascontiguousarray(vectors.params, dtype=np.float32).tobytes()
+    return header + body
+
+
+def decode(buffer: bytes) -> QuantizedVectors:
+    """Inverse of `encode`; arrays are read-only views over `buffer`."""
+    if len(buffer) < HEADER.size:
+        raise ValueError("Vector buffer is too short for a header")
+    magic, version, code, dim, count = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != FORMAT_VERSION or code not in _DTYPES_BY_CODE:
+        raise ValueError("Not an encoded vector buffer")
+    dtype = _DTYPES_BY_CODE[code]
+    numpy_dtype = np.dtype(DTYPES[dtype][1])
+    data_end = HEADER.size + count * dim * numpy_dtype.itemsize
+    expected = data_end + (count * 2 * 4 if dtype == INT8 else 0)
+    if len(buffer) != expected:
+        raise ValueError(f"Vector buffer has {len(buffer)} bytes, expected {expected}")
+
+    data = np.frombuffer(buffer, dtype=numpy_dtype, count=count * dim, offset=HEADER.size).reshape(count, dim)
+    params = None
+    if dtype == INT8:
+        params = np.frombuffer(buffer, dtype=np.float32, count=count * 2, offset=data_end).reshape(count, 2)
+    return QuantizedVectors(dtype, data, params)
+
+
+def encode_vector(vector: np.ndarray, dtype: str) -> bytes:
+    return encode(quantize(vector, dtype))
+
+
+def decode_vector(buffer: bytes) -> np.ndarray:
+    """
+    Decode a single encoded vector back to float32. Buffers without a
+    header are vectors stored before the header existed, as raw float32.
+    """
+    if buffer[:len(MAGIC)] != MAGIC:
+        if len(buffer) % 4:
+            raise ValueError("Not an encoded vector buffer")
+        return np.frombuffer(buffer, dtype=np.float32)
+    vectors = decode(buffer)
+    if len(vectors) != 1:
+        raise ValueError(f"Expected one vector, found {len(vectors)}")
+    return vectors.dequantize()[0]
@@ -0,0 +1,102 @@
+"""
+Bulk import throughput versus parser processes.
+
+Generates --docs .docx resumes and imports them through the bulk import
+pipeline (staging, process-pool parsing, candidate storage, batched
+embeddings) into an in-memory Redis, once per pool size. The stub parser
+extracts the document text for real and then burns CPU until --parse-ms
+has passed, standing in for pyresparser's NLP; docs/s should grow with
+processes up to the number of cores.
+
+Run from smart-dashboard-poc/:
+
+    python -m benchmarks.bench_bulk_import --docs 200 --parse-ms 40
+"""
+import os
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("EMBEDDING_BACKEND", "local")
+
+import docx
+
+from api.services import bulk_import
+from api.services.bulk_import import import_resumes, stage_uploads
+from api.services.lexical_index import tokenize
+from api.services.text_extraction import extract_text
+from benchmarks.bench_resume_ingestion import MemoryRedis
+
+SKILLS = ["python", "sql", "docker", "kubernetes", "react", "aws", "spark", "go", "java", "terraform"]
+PARSE_SECONDS = 0.04
+
+
+def stub_parse(file_path, parser):
+    deadline = time.perf_counter() + PARSE_SECONDS
+    words = tokenize(extract_text(file_path, redis_conn=MemoryRedis()))
+    while time.perf_counter() < deadline:
+        tokenize(" ".join(words))
+    return {"name": "Bench Candidate", "skills": [skill for skill in SKILLS if skill in words]}
+
+
+def write_resumes(directory, count):
+    paths = []
+    for i in range(count):
+        document = docx.Document()
+        document.add_paragraph(f"Candidate {i}\ncandidate{i}@example.com")
+        document.add_paragraph("Skills: " + ", ".join(SKILLS[i % 5:i % 5 + 4]))
+        for year in range(2015, 2024):
+            document.add_paragraph(f"{year}: engineer at company {i}-{year}, shipped data pipelines and services.")
+        path = os.path.join(directory, f"resume_{i}.docx")
+        document.save(path)
+        paths.append(path)
+    return paths
+
+
+async def run(paths, workers, dest_dir):
+    uploads = [(os.path.basename(path), open(path, "rb")) for path in paths]
+    try:
+        staged, _ = stage_uploads(uploads, dest_dir)
+    finally:
+        for _, fileobj in uploads:
+            fileobj.close()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Start the processes before timing, as the API's long-lived pool would be
+        list(executor.map(abs, range(workers)))
+        start = time.perf_counter()
+        results = [result async for result in import_resumes(MemoryRedis(), staged, "pyresparser", executor)]
+        elapsed = time.perf_counter() - start
+    failed = [result for result in results if result.status != "Completed"]
+    assert not failed, failed[0]
+    return elapsed
+
+
+def main() -> None:
+    global PARSE_SECONDS
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--parse-ms", type=float, default=40)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    PARSE_SECONDS = args.parse_ms / 1000
+    bulk_import.parse_resume = stub_parse
+    logging.getLogger("api.services.embedding_cache").setLevel(logging.ERROR)
+
+    source_dir, dest_dir = tempfile.mkdtemp(), tempfile.mkdtemp()
+    paths = write_resumes(source_dir, args.docs)
+    print(f"{args.docs} resumes, stub parse >= {args.parse_ms:.0f} ms, {os.cpu_count()} cores")
+    baseline = None
+    workers = 1
+    while workers <= max(args.max_workers, 1):
+        elapsed = asyncio.run(run(paths, workers, dest_dir))
+        rate = args.docs / elapsed
+        baseline = baseline or rate
+        print(f"processes: {workers:2d}  {rate:7.1f} docs/s  ({rate / baseline:.2f}x)")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Dedup stage throughput and accuracy on synthetic multi-board postings.
+
+Generates --jobs postings, of which --dup-rate are copies of an earlier
+posting: half re-listed on another board with light text edits (near
+duplicates) and half the same URL with tracking parameters (exact
+duplicates). Reports MinHash signing and LSH dedup throughput, plus how
+many true duplicates were collapsed and how many distinct postings were
+wrongly dropped.
+
+Run from smart-dashboard-poc/:
+
+    python -m benchmarks.bench_dedup --jobs 100000
+"""
+import time
+import random
+import argparse
+import resource
+
+from api.models import Job
+from api.services.dedup import JobDeduplicator, band_keys, job_text, minhash_signatures
+
+TITLES = ["Senior", "Staff", "Junior", "Lead", "Principal"]
+ROLES = ["Python Developer", "Backend Engineer", "Data Engineer", "ML Engineer", "SRE", "Platform Engineer"]
+VOCABULARY = (
+    "build design own operate scale python go java rust sql postgres redis kafka spark airflow aws gcp azure "
+    "docker kubernetes terraform fastapi django react services pipelines apis platform data models teams "
+    "customers reliability latency observability security testing ci cd on-call mentoring roadmap product"
+).split()
+
+
+def synthetic_postings(n: int, dup_rate: float, seed: int = 0):
+    """Postings plus, for each, the index of the original it duplicates (or its own index)."""
+    rng = random.Random(seed)
+    jobs, originals = [], []
+    for i in range(n):
+        if jobs and rng.random() < dup_rate:
+            source = rng.randrange(len(jobs))
+            original = originals[source]
+            base = jobs[original]
+            if rng.random() < 0.5:
+                words = base.description.split()
+                # One or two small edits, as boards rewrap and trim descriptions
+                for _ in range(rng.randint(1, 2)):
+                    if rng.random() < 0.5 and len(words) > 10:
+                        del words[rng.randrange(len(words))]
+                    else:
+                        words.insert(rng.randrange(len(words)), rng.choice(VOCABULARY))
+                jobs.append(base.copy(update={"description": " ".join(words), "url": f"https://board-b.test/jobs/{i}"}))
+            else:
+                jobs.append(base.copy(update={"url": f"{base.url}&utm_source=feed&from=serp"}))
+            originals.append(original)
+            continue
+        description = " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(30, 80)))
+        jobs.append(Job(
+            title=f"{rng.choice(TITLES)} {rng.choice(ROLES)}",
+            company=f"Company {rng.randrange(5000)}",
+            location="Remote",
+            url=f"https://board-a.test/viewjob?jk={i:08d}",
+            description=description,
+        ))
+        originals.append(i)
+    return jobs, originals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--dup-rate", type=float, default=0.2)
+    parser.add_argument("--threshold", type=float, default=0.7)
+    args = parser.parse_args()
+
+    jobs, originals = synthetic_postings(args.jobs, args.dup_rate)
+    texts = [job_text(job) for job in jobs]
+
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    signatures = minhash_signatures(texts)
+    sign_elapsed = time.perf_counter() - start
+
+    deduplicator = JobDeduplicator(threshold=args.threshold)
+    start = time.perf_counter()
+    keys = band_keys(signatures, deduplicator.bands).tolist()
+    kept = [deduplicator.add(job, signature, job_keys) for job, signature, job_keys in zip(jobs, signatures, keys)]
+    dedup_elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    true_duplicates = sum(1 for i, original in enumerate(originals) if original != i)
+    caught = sum(1 for i, original in enumerate(originals) if original != i and not kept[i])
+    wrongly_dropped = sum(1 for i, original in enumerate(originals) if original == i and not kept[i])
+
+    total = sign_elapsed + dedup_elapsed
+    print(f"postings: {len(jobs)}, true duplicates: {true_duplicates}")
+    print(f"minhash:  {sign_elapsed:6.2f}s  ({len(jobs) / sign_elapsed:,.0f} postings/s)")
+    print(f"lsh:      {dedup_elapsed:6.2f}s  ({len(jobs) / dedup_elapsed:,.0f} postings/s)")
+    print(f"total:    {total:6.2f}s  ({len(jobs) / total:,.0f} postings/s), RSS +{(peak_kb - baseline_kb) / 1024:.0f} MB")
+    print(f"collapsed {caught}/{true_duplicates} duplicates "
+          f"({deduplicator.url_duplicates} by URL, {deduplicator.near_duplicates} near), "
+          f"{wrongly_dropped} distinct postings dropped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Per-document Document AI latency: single requests versus one batch.
+
+Runs --docs synthetic resumes through the local fake processor (a real
+gRPC server; see benchmarks/fake_docai.py):
+
+  - single, new client: one process_document call per resume, building a
+    client and channel each time as parse_with_docai used to
+  - single, shared client: the same over the process-wide client's channel
+  - single, shared, concurrent: --concurrency calls at a time over that channel
+  - batch: one batch_process_documents operation for all of them
+
+The fake's latencies are inputs: --latency per online request, and
+--batch-latency plus --batch-doc-latency per document for a batch, with
+the client polling the operation as it would against Google.
+
+Run from smart-dashboard-poc/:
+
+    python -m benchmarks.bench_docai --docs 50 --latency 0.3 --batch-latency 3
+"""
+import os
+import time
+import logging
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("GOOGLE_CLOUD_PROJECT", "bench")
+os.environ.setdefault("GOOGLE_DOCAI_PROCESSOR_ID", "bench")
+
+from api.services.docai_parser import create_docai_client, parse_batch_with_docai, parse_with_docai
+from benchmarks.bench_text_extraction import make_pdf
+from benchmarks.fake_docai import FakeDocAIServer
+
+
+def write_resumes(directory, count):
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"resume_{i}.pdf")
+        with open(path, "wb") as file:
+            file.write(make_pdf([[f"Name: Candidate {i}", f"Email: candidate{i}@example.com", "Skill: python", "Skill: sql"]]))
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--batch-latency", type=float, default=3.0)
+    parser.add_argument("--batch-doc-latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    logging.getLogger("api.services.docai_parser").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as directory, FakeDocAIServer(
+        latency=args.latency, batch_latency=args.batch_latency, batch_document_latency=args.batch_doc_latency,
+    ) as fake:
+        paths = write_resumes(directory, args.docs)
+        shared = create_docai_client(fake.transport())
+        parse_with_docai(paths[0], client=shared)
+
+        def timed(label, run):
+            start = time.perf_counter()
+            results = run()
+            elapsed = time.perf_counter() - start
+            assert all(result["name"].startswith("Candidate") for result in results), label
+            print(f"{label:>28}: {elapsed:6.2f}s total  {elapsed / args.docs * 1000:7.1f} ms/document")
+
+        print(f"{args.docs} resumes; fake latency {args.latency}s online, {args.batch_latency}s + {args.batch_doc_latency}s/doc batch")
+        timed("single, new client", lambda: [parse_with_docai(path, client=create_docai_client(fake.transport())) for path in paths])
+        timed("single, shared client", lambda: [parse_with_docai(path, client=shared) for path in paths])
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            timed(f"single, shared, {args.concurrency} at a time", lambda: list(pool.map(lambda path: parse_with_docai(path, client=shared), paths)))
+        timed("batch", lambda: [parsed for parsed, _ in parse_batch_with_docai(paths, "gs://bench/docai", client=shared, storage=fake.storage).values()])
+
+
+if __name__ == "__main__":
+    main()
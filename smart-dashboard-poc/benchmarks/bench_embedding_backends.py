@@ -0,0 +1,49 @@
+"""
+Throughput of the local (offline) embedding backend.
+
+Embeds --texts synthetic job descriptions with the hashing backend, cold
+(empty feature memo) and warm, one batch at a time and one text at a
+time, and reports texts per second. The OpenAI backend is not measured;
+it is network bound.
+
+Run from smart-dashboard-poc/:
+
+    python -m benchmarks.bench_embedding_backends --texts 20000 --dim 512
+"""
+import time
+import asyncio
+import argparse
+
+from api.services.embedding_backends import HashingBackend
+from benchmarks.bench_lexical_index import synthetic_documents
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--batch", type=int, default=256)
+    args = parser.parse_args()
+
+    texts = [text for _, text in synthetic_documents(args.texts)]
+    backend = HashingBackend(dim=args.dim)
+
+    for label in ("cold", "warm"):
+        start = time.perf_counter()
+        for i in range(0, len(texts), args.batch):
+            backend.embed_batch(texts[i:i + args.batch])
+        elapsed = time.perf_counter() - start
+        print(f"batched ({label}): {len(texts) / elapsed:,.0f} texts/s")
+
+    async def one_at_a_time():
+        for text in texts:
+            await backend.embed(text)
+
+    start = time.perf_counter()
+    asyncio.run(one_at_a_time())
+    elapsed = time.perf_counter() - start
+    print(f"single (warm):  {len(texts) / elapsed:,.0f} texts/s, {elapsed / len(texts) * 1e6:.0f} us per text")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Embedding requests per ranking: one-call-per-text vs. the batcher.
+
+Run from smart-dashboard-poc/:
+
+    python -m benchmarks.bench_embedding_batcher --jobs 10 50 200
+"""
+import time
+import asyncio
+import argparse
+
+import openai
+
+from api.services.embedding_batcher import EmbeddingBatcher
+from benchmarks.stub_openai import StubOpenAIServer
+
+MODEL = "text-embedding-3-small"
+
+
+async def rank_unbatched(base_url: str, texts: list) -> None:
+    """The original _embed: a new client and one request per text."""
+    async def embed(text):
+        async with openai.AsyncOpenAI(base_url=base_url, api_key="stub") as client:
+            await client.embeddings.create(input=text, model=MODEL)
+
+    await embed(texts[0])
+    await asyncio.gather(*[embed(text) for text in texts[1:]])
+
+
+async def rank_batched(base_url: str, texts: list) -> None:
+    batcher = EmbeddingBatcher(MODEL, client_factory=lambda: openai.AsyncOpenAI(base_url=base_url, api_key="stub"))
+    await batcher.embed_many(texts)
+    await batcher.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--latency", type=float, default=0.02, help="stub server latency per request (s)")
+    args = parser.parse_args()
+
+    with StubOpenAIServer(latency=args.latency) as stub:
+        print(f"{'jobs':>6} {'mode':>10} {'requests':>9} {'seconds':>8}")
+        for n_jobs in args.jobs:
+            texts = ["python fastapi redis"] + [f"Job description {i} for a backend engineer" for i in range(n_jobs)]
+            for mode, rank in (("unbatched", rank_unbatched), ("batched", rank_batched)):
+                stub.reset()
+                start = time.perf_counter()
+                asyncio.run(rank(stub.base_url, texts))
+                elapsed = time.perf_counter() - start
+                print(f"{n_jobs:>6} {mode:>10} {stub.requests:>9} {elapsed:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Job-card extraction throughput and peak memory per parser backend.
+
+Each backend runs in a fresh process so its peak RSS is measured on its
+own. The corpus is every *.html file in --corpus (the saved Indeed pages by
+default). Saved fixture pages are much smaller than live ones, so
+--synthetic N also adds N generated pages padded to a realistic size with
+scripts and navigation markup.
+
+Run from smart-dashboard-poc/:
+
+    python -m benchmarks.bench_extraction --synthetic 50 --repeat 5
+"""
+import os
+import glob
+import time
+import argparse
+import resource
+import tracemalloc
+import multiprocessing
+
+from api.services.extraction import extract_cards
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.dirname(__file__)), "tests", "fixtures", "indeed")
+
+CARD = '''<div class="cardOutline tapItem"><div class="job_seen_beacon">
+<h2 class="jobTitle"><a href="/rc/clk?jk={i:06d}"><span>Software Engineer {i}</span></a></h2>
+<div class="company_location"><span class="companyName">Company {i}</span><div class="companyLocation">Remote</div></div>
+<div class="job-snippet"><ul><li>Build Python services.</li><li>Own CI/CD for team {i}.</li></ul></div>
+</div></div>'''
+FILLER = '<script>window.mosaic = {{"providerData": "{payload}"}};</script><nav>{links}</nav>'
+
+
+def synthetic_page(page: int, cards: int = 15, filler_kb: int = 150) -> str:
+    filler = FILLER.format(payload="x" * (filler_kb * 512), links="<a href='/q'>link</a>" * (filler_kb * 20))
+    body = "\n".join(CARD.format(i=page * cards + i) for i in range(cards))
+    return f"<html><head>{filler}</head><body><div id='mosaic'>{body}</div>{filler}</body></html>"
+
+
+def run_backend(args):
+    backend, pages, limit, repeat = args
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    cards = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            cards += len(extract_cards(html, limit=limit, backend=backend))
+    elapsed = time.perf_counter() - start
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "pages_per_s": len(pages) * repeat / elapsed,
+        "cards": cards // repeat,
+        "rss_growth_mb": (peak_kb - baseline_kb) / 1024,
+        "python_peak_mb": traced_peak / 2**20,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--synthetic", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--stream-limit", type=int, default=10)
+    args = parser.parse_args()
+
+    pages = []
+    for path in sorted(glob.glob(os.path.join(args.corpus, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+    pages += [synthetic_page(i) for i in range(args.synthetic)]
+    total_mb = sum(len(page) for page in pages) / 2**20
+    print(f"corpus: {len(pages)} pages, {total_mb:.1f} MB")
+
+    runs = [
+        ("bs4", "bs4", None),
+        ("lxml", "lxml", None),
+        (f"stream(N={args.stream_limit})", "stream", args.stream_limit),
+    ]
+    context = multiprocessing.get_context("spawn")
+    print(f"{'backend':>14} {'pages/s':>9} {'cards':>6} {'RSS +MB':>8} {'py peak MB':>11}")
+    for label, backend, limit in runs:
+        with context.Pool(1) as pool:
+            result = pool.apply(run_backend, ((backend, pages, limit, args.repeat),))
+        print(f"{label:>14} {result['pages_per_s']:>9.1f} {result['cards']:>6} "
+              f"{result['rss_growth_mb']:>8.1f} {result['python_peak_mb']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Job index query latency and recall@k against exact brute-force search.
+
+Builds a synthetic clustered corpus in a temporary directory. At the
+defaults (1M x 1536) the vector file is ~6 GB, so make sure there is disk
+and page cache to match, or scale down with --jobs/--dim.
+
+Run from smart-dashboard-poc/:
+
+    python -m benchmarks.bench_job_index --jobs 1000000 --dim 1536 --nprobe 8 16 32
+"""
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+from api.models import Job
+from api.services.job_index import JobIndex
+from api.services.scoring import normalize_rows, top_k_indices
+
+
+def synthetic_vectors(rng, topics: np.ndarray, n: int, noise: float = 0.6) -> np.ndarray:
+    """Unit vectors scattered around topic directions (noise is relative to the topic norm)."""
+    dim = topics.shape[1]
+    vectors = topics[rng.integers(0, topics.shape[0], n)]
+    vectors += (noise / np.sqrt(dim)) * rng.standard_normal((n, dim), dtype=np.float32)
+    return normalize_rows(vectors)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--topics", type=int, default=5000)
+    parser.add_argument("--chunk", type=int, default=50_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    topics = normalize_rows(rng.standard_normal((args.topics, args.dim), dtype=np.float32))
+    with tempfile.TemporaryDirectory() as directory:
+        index = JobIndex.open(directory, dim=args.dim, model="bench")
+
+        start = time.perf_counter()
+        for offset in range(0, args.jobs, args.chunk):
+            n = min(args.chunk, args.jobs - offset)
+            jobs = [Job(title="t", company="c", location="Remote", url=f"https://example.com/{offset + i}") for i in range(n)]
+            index.add(jobs, synthetic_vectors(rng, topics, n))
+        print(f"insert: {args.jobs} jobs in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        index.train()
+        print(f"train:  {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        index.save()
+        reloaded = JobIndex.open(directory, dim=args.dim, model="bench")
+        print(f"snapshot + reload: {time.perf_counter() - start:.1f}s")
+
+        queries = synthetic_vectors(rng, topics, args.queries)
+        vectors = np.asarray(reloaded._vectors[:reloaded.count])
+        truth = [set(top_k_indices(vectors @ q, args.k).tolist()) for q in queries]
+
+        print(f"{'nprobe':>7} {'p50 ms':>8} {'p99 ms':>8} {'recall@k':>9}")
+        for nprobe in args.nprobe:
+            latencies, recalls = [], []
+            for query, expected in zip(queries, truth):
+                start = time.perf_counter()
+                results = reloaded.search(query, args.k, nprobe=nprobe)
+                latencies.append((time.perf_counter() - start) * 1e3)
+                rows = {reloaded._rows_by_url[job.url] for job, _ in results}
+                recalls.append(len(rows & expected) / args.k)
+            print(f"{nprobe:>7} {np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 99):>8.2f} "
+                  f"{np.mean(recalls):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
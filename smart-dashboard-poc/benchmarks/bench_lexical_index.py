@@ -0,0 +1,76 @@
+"""
+BM25 prefilter index build time, query latency and memory.
+
+Indexes --docs synthetic postings (titles plus 30-80 word descriptions over
+a skills vocabulary) and reports build throughput, the compact postings
+size against process RSS growth, and latency of skill-profile queries.
+Also times `lexical_prefilter` on a --prefilter-jobs job set, the size the
+ranking path sees per request.
+
+Run from smart-dashboard-poc/:
+
+    python -m benchmarks.bench_lexical_index --docs 100000
+    python -m benchmarks.bench_lexical_index --docs 1000000
+"""
+import time
+import random
+import argparse
+import resource
+
+import numpy as np
+
+from api.models import Job
+from api.services.lexical_index import BM25Index, lexical_prefilter
+from benchmarks.bench_dedup import ROLES, TITLES, VOCABULARY
+
+
+def synthetic_documents(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    for i in range(n):
+        description = " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(30, 80)))
+        yield f"https://board-a.test/viewjob?jk={i:08d}", f"{rng.choice(TITLES)} {rng.choice(ROLES)} {description}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=100)
+    parser.add_argument("--prefilter-jobs", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    queries = [" ".join(rng.sample(VOCABULARY, rng.randint(3, 10))) for _ in range(args.queries)]
+
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    index = BM25Index()
+    start = time.perf_counter()
+    index.add_many(synthetic_documents(args.docs))
+    build_elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, args.k)
+        latencies.append(time.perf_counter() - start)
+    latencies_ms = np.array(latencies) * 1000
+
+    jobs = [
+        Job(title=text.split(" ", 2)[1], company="Acme", location="Remote", url=url, description=text)
+        for url, text in synthetic_documents(args.prefilter_jobs, seed=2)
+    ]
+    start = time.perf_counter()
+    for query in queries[:20]:
+        lexical_prefilter(jobs, query, args.k)
+    prefilter_ms = (time.perf_counter() - start) / 20 * 1000
+
+    print(f"docs: {args.docs}, terms: {len(index._terms)}, avg length: {index._live_length / len(index):.1f}")
+    print(f"build:   {build_elapsed:6.2f}s  ({args.docs / build_elapsed:,.0f} docs/s)")
+    print(f"memory:  postings {index.nbytes / 2**20:,.1f} MB, RSS +{(peak_kb - baseline_kb) / 1024:,.0f} MB")
+    print(f"query:   p50 {np.percentile(latencies_ms, 50):.2f} ms, p95 {np.percentile(latencies_ms, 95):.2f} ms (top {args.k})")
+    print(f"prefilter: {args.prefilter_jobs} jobs to {args.k} in {prefilter_ms:.2f} ms per request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Sustained LLM resume parsing under a requests-per-minute limit.
+
+Parses --resumes synthetic resumes through LLMResumeParser against the
+local stub server, which enforces --rpm and fails --error-rate of requests
+with 500. Runs once without client-side limiting, where the stub answers
+429 and the parser retries, and once with a TokenBucket at the same rate,
+which should hold resumes/minute at the limit with no 429s and no failed
+resumes. The Redis-backed bucket shares this limit across processes; this
+benchmark uses the in-process one so it runs without Redis.
+
+Run from smart-dashboard-poc/:
+
+    python -m benchmarks.bench_llm_parser --resumes 200 --rpm 600
+"""
+import time
+import asyncio
+import logging
+import argparse
+
+import openai
+
+from api.services.llm_parser import LLMResumeParser, TokenBucket
+from benchmarks.stub_openai import StubOpenAIServer
+
+PAGE_HEADER = "Jane Candidate | jane@example.com | Page header"
+
+
+def resume_text(i: int) -> str:
+    lines = [f"Candidate {i}", f"candidate{i}@example.com", "Skills: python, sql, docker"]
+    for page in range(3):
+        lines.append(PAGE_HEADER)
+        lines += [f"{year}: engineer at company {i}-{year}, shipped data pipelines" for year in range(2010 + page * 4, 2014 + page * 4)]
+    return "\n".join(lines)
+
+
+async def run(stub, resumes, rate_limiter, max_concurrency):
+    parser = LLMResumeParser(
+        rate_limiter=rate_limiter,
+        max_concurrency=max_concurrency,
+        backoff_base=0.2,
+        client_factory=lambda: openai.AsyncOpenAI(base_url=stub.base_url, api_key="stub", max_retries=0),
+    )
+    stub.reset()
+    start = time.perf_counter()
+    results = await asyncio.gather(*(parser.parse_text(resume_text(i)) for i in range(resumes)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    await parser.aclose()
+    failed = sum(isinstance(result, Exception) for result in results)
+    return elapsed, failed, parser.stats()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--rpm", type=int, default=600)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    args = parser.parse_args()
+    # Each retry logs a warning
+    logging.getLogger("api.services.llm_parser").setLevel(logging.ERROR)
+
+    print(f"{args.resumes} resumes, stub limit {args.rpm} requests/min, {args.error_rate:.0%} injected 500s")
+    with StubOpenAIServer(latency=args.latency, requests_per_minute=args.rpm, error_rate=args.error_rate) as stub:
+        for label, limiter in (
+            ("no client limit", TokenBucket(requests_per_minute=0, tokens_per_minute=0)),
+            (f"bucket {args.rpm}/min", TokenBucket(requests_per_minute=args.rpm, tokens_per_minute=0, burst_seconds=1)),
+        ):
+            elapsed, failed, stats = asyncio.run(run(stub, args.resumes, limiter, args.max_concurrency))
+            print(
+                f"{label:>18}: {args.resumes / elapsed * 60:7.1f} resumes/min  {failed} failed  "
+                f"{stub.chat_requests} requests  {stub.rate_limited} x 429  {stub.errors} x 500  "
+                f"{stats['retries']} retries  {stats['rate_limited_seconds']:.1f}s waiting on the bucket"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Parser cascade: average parse latency and paid calls per confidence threshold.
+
+Runs --resumes synthetic resumes through run_cascade with stub parsers: a
+local one taking --local-latency seconds that finds every field of a
+resume except those randomly dropped (so --sparse of them come out
+incomplete), and a paid one taking --paid-latency seconds that finds
+everything. Each threshold is compared with sending every resume to the
+paid parser, on average seconds per resume, paid calls, and the average
+confidence of the final parses. The confidence histogram printed first is
+what GET /metrics/parser-cascade reports for real traffic.
+
+Run from smart-dashboard-poc/:
+
+    python -m benchmarks.bench_parser_cascade --resumes 200 --sparse 0.3
+"""
+import random
+import asyncio
+import argparse
+
+from api.services.parser_cascade import cascade_stats, parse_confidence, run_cascade
+
+THRESHOLDS = (0.0, 0.5, 0.75, 0.9, 1.0)
+FIELDS = ("name", "email", "mobile_number", "skills")
+
+
+class StatsStore:
+    """The Redis hash commands the cascade stats use, kept in memory."""
+
+    def __init__(self):
+        self.fields = {}
+
+    def pipeline(self):
+        return self
+
+    def hincrby(self, key, field, amount=1):
+        self.fields[field] = self.fields.get(field, 0) + amount
+
+    hincrbyfloat = hincrby
+
+    def execute(self):
+        pass
+
+    def hgetall(self, key):
+        return dict(self.fields)
+
+
+def complete_parse(i):
+    return {
+        "name": f"Candidate Number{i}", "email": f"candidate{i}@example.com", "mobile_number": f"+1 555 {i:07d}",
+        "skills": ["python", "sql", "docker", "aws", "react", "go"],
+    }
+
+
+def local_parse(i, sparse, rng):
+    parsed = complete_parse(i)
+    if rng.random() < sparse:
+        for field in rng.sample(FIELDS, rng.randint(1, len(FIELDS))):
+            parsed[field] = parsed["skills"][:rng.randint(0, 4)] if field == "skills" else ""
+    return parsed
+
+
+async def run(resumes, local_results, args, threshold):
+    redis_conn = StatsStore()
+    paid_calls = 0
+
+    async def parse_tier(parser, i):
+        nonlocal paid_calls
+        if parser == "pyresparser":
+            await asyncio.sleep(args.local_latency)
+            return local_results[i], False
+        paid_calls += 1
+        await asyncio.sleep(args.paid_latency)
+        return complete_parse(i), False
+
+    results = await asyncio.gather(*(
+        run_cascade(redis_conn, lambda parser, i=i: parse_tier(parser, i), "gpt-4", threshold) for i in range(resumes)
+    ))
+    return cascade_stats(redis_conn), paid_calls, sum(map(parse_confidence, results)) / resumes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--sparse", type=float, default=0.3)
+    parser.add_argument("--local-latency", type=float, default=0.05)
+    parser.add_argument("--paid-latency", type=float, default=1.5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    local_results = [local_parse(i, args.sparse, rng) for i in range(args.resumes)]
+    print(f"{args.resumes} resumes, {args.sparse:.0%} parsed incompletely by the local parser; "
+          f"local {args.local_latency}s, paid {args.paid_latency}s per resume")
+
+    histogram = asyncio.run(run(args.resumes, local_results, args, 0.0))[0]["confidence_histogram"]
+    print("local confidence: " + "  ".join(f"{bucket}: {count}" for bucket, count in histogram.items() if count))
+
+    print(f"{'paid only':>16}: {args.paid_latency:6.3f} s/resume  {args.resumes:4d} paid calls  confidence 1.000")
+    for threshold in THRESHOLDS:
+        stats, paid_calls, confidence = asyncio.run(run(args.resumes, local_results, args, threshold))
+        print(
+            f"{f'threshold {threshold:.2f}':>16}: {stats['avg_parse_seconds']:6.3f} s/resume  {paid_calls:4d} paid calls  "
+            f"confidence {confidence:.3f}  ({stats['escalation_rate']:.0%} escalated)"
+        )
+
+
+if __name__ == "__main__":
+    main()
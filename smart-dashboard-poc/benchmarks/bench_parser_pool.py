@@ -0,0 +1,155 @@
+"""
+Default-parser latency and throughput: models loaded per call (cold)
+versus once per worker process (warm).
+
+pyresparser loads two spaCy pipelines on every ResumeParser() call. With
+--real the benchmark times the real parser, which needs en_core_web_sm
+and a spaCy release pyresparser supports. By default it builds untrained
+stand-in pipelines of the same shape (tagger, parser and NER; about
+12 MB on disk) and runs pyresparser's text extraction, email, phone and
+skill extraction through them, loading them with the same two
+spacy.load() calls the parser makes.
+
+Run from smart-dashboard-poc/:
+
+    python -m benchmarks.bench_parser_pool --docs 40 --workers 2
+"""
+import os
+import time
+import argparse
+import tempfile
+
+import docx
+import numpy as np
+import spacy
+from spacy.training import Example
+from pyresparser import resume_parser, utils
+
+from api.services.parser_pool import PYRESPARSER_MODELS, create_parser_pool, warm_up_parsers
+from api.services.resume_ingestion import parse_resume
+
+REAL_PARSER = False
+
+
+def build_standin(path, pipes):
+    nlp = spacy.blank("en")
+    for pipe in pipes:
+        nlp.add_pipe(pipe)
+    words = ["John", "Smith", "writes", "Python", "code", "at", "Acme", "."]
+    example = Example.from_dict(nlp.make_doc(" ".join(words)), {
+        "words": words,
+        "tags": ["NNP", "NNP", "VBZ", "NNP", "NN", "IN", "NNP", "."],
+        "heads": [1, 2, 2, 4, 2, 2, 5, 2],
+        "deps": ["compound", "nsubj", "ROOT", "compound", "dobj", "prep", "pobj", "punct"],
+        "entities": ["B-PERSON", "L-PERSON", "O", "O", "O", "O", "U-ORG", "O"],
+    })
+    nlp.initialize(lambda: [example])
+    nlp.to_disk(path)
+
+
+def use_standins(paths):
+    """Point this process's spacy.load() at the stand-in pipelines."""
+    load = spacy.load
+    redirects = dict(zip(PYRESPARSER_MODELS, paths))
+    spacy.load = lambda name, **kwargs: load(redirects.get(str(name), name), **kwargs)
+
+
+def warm_standins(paths):
+    use_standins(paths)
+    warm_up_parsers()
+
+
+def standin_parse(file_path, real=False):
+    if real:
+        return parse_resume(file_path, "pyresparser")
+    # ResumeParser.__init__ and its extraction steps, minus the spaCy 2-only name matcher
+    nlp = resume_parser.spacy.load(PYRESPARSER_MODELS[0])
+    custom_nlp = resume_parser.spacy.load(PYRESPARSER_MODELS[1])
+    text_raw = utils.extract_text(file_path, ".docx")
+    text = " ".join(text_raw.split())
+    doc = nlp(text)
+    custom_doc = custom_nlp(text_raw)
+    return {
+        "name": next((ent.text for ent in custom_doc.ents), None),
+        "email": utils.extract_email(text),
+        "mobile_number": utils.extract_mobile_number(text),
+        "skills": utils.extract_skills(doc, list(doc.noun_chunks)),
+    }
+
+
+def write_resumes(directory, count):
+    skills = ["Python", "SQL", "Docker", "Kubernetes", "React", "AWS", "Spark", "Java"]
+    paths = []
+    for i in range(count):
+        document = docx.Document()
+        document.add_paragraph(f"Candidate {i}\ncandidate{i}@example.com\n+1 555 010 {i:04d}")
+        document.add_paragraph("Skills: " + ", ".join(skills[i % 4:i % 4 + 4]))
+        for year in range(2012, 2024):
+            document.add_paragraph(f"{year}: software engineer at Company {i}, built data pipelines and APIs in Python.")
+        path = os.path.join(directory, f"resume_{i}.docx")
+        document.save(path)
+        paths.append(path)
+    return paths
+
+
+def in_process(paths, warm):
+    resume_parser.spacy = spacy
+    if warm:
+        warm_up_parsers()
+    latencies = []
+    for path in paths:
+        start = time.perf_counter()
+        standin_parse(path, REAL_PARSER)
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000
+
+
+def pooled(paths, workers, max_jobs, initializer, initargs):
+    pool = create_parser_pool(workers, max_jobs, initializer, initargs)
+    try:
+        # Start (and warm) every worker before timing, as a long-lived pool would be
+        for future in [pool.submit(os.getpid) for _ in range(workers)]:
+            future.result()
+        start = time.perf_counter()
+        # Spawned workers do not see REAL_PARSER, so it goes with each task
+        list(pool.map(standin_parse, paths, [REAL_PARSER] * len(paths)))
+        return len(paths) / (time.perf_counter() - start)
+    finally:
+        pool.shutdown()
+
+
+def main() -> None:
+    global REAL_PARSER
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-jobs", type=int, default=200, help="parses per worker before it is replaced")
+    parser.add_argument("--real", action="store_true", help="time the real pyresparser parser")
+    args = parser.parse_args()
+    REAL_PARSER = args.real
+
+    directory = tempfile.mkdtemp()
+    paths = write_resumes(directory, args.docs)
+    if REAL_PARSER:
+        model_paths = None
+        setup, warm_setup = None, warm_up_parsers
+    else:
+        model_paths = (os.path.join(directory, "sm"), os.path.join(directory, "custom"))
+        build_standin(model_paths[0], ["tagger", "parser", "ner"])
+        build_standin(model_paths[1], ["ner"])
+        use_standins(model_paths)
+        setup, warm_setup = use_standins, warm_standins
+    initargs = (model_paths,) if model_paths else ()
+
+    print(f"{args.docs} resumes, {'real pyresparser' if REAL_PARSER else 'stand-in pipelines'}")
+    for label, warm in (("cold, per call", False), ("warm, in process", True)):
+        latencies = in_process(paths, warm)
+        print(f"  {label:18s} p50 {np.percentile(latencies, 50):7.1f} ms  p95 {np.percentile(latencies, 95):7.1f} ms  "
+              f"{1000 / latencies.mean():6.1f} docs/s")
+    for label, initializer in (("cold pool", setup), ("warm pool", warm_setup)):
+        rate = pooled(paths, args.workers, args.max_jobs, initializer, initargs if initializer else ())
+        print(f"  {label:18s} {args.workers} workers, replaced every {args.max_jobs} jobs: {rate:6.1f} docs/s")
+
+
+if __name__ == "__main__":
+    main()
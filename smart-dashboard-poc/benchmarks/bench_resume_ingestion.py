@@ -0,0 +1,154 @@
+"""
+Load test of asynchronous resume ingestion with stubbed parsers.
+
+Part 1 posts --uploads concurrent resumes to /resume/upload in-process
+(httpx over ASGI, in-memory Redis, a recording queue) and reports upload
+latency: it covers storing the file and queueing only, whatever
+--parse-ms is. Part 2 drains the queued jobs with 1, 2, 4, ... worker
+processes running the real ingestion job around a stub parser that waits
+--parse-ms, like a remote parser call, and reports jobs per second per worker count.
+
+Run from smart-dashboard-poc/:
+
+    python -m benchmarks.bench_resume_ingestion --uploads 200 --parse-ms 100 --max-workers 4
+"""
+import os
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+import multiprocessing
+
+# Embed profiles with the offline backend so no request leaves the process
+os.environ.setdefault("EMBEDDING_BACKEND", "local")
+
+import httpx
+import numpy as np
+
+from api.deps import get_redis
+from api.main import app
+from api.routers.resume import get_queue
+from api.services import resume_ingestion
+from api.services.resume_ingestion import process_ingestion
+
+PARSE_SECONDS = 0.1
+
+
+class MemoryRedis:
+    """The Redis commands ingestion uses, on a dict (sorted sets and hash counters are ignored)."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value.encode("utf-8") if isinstance(value, str) else value
+
+    def hset(self, key, mapping):
+        self.store[key] = mapping
+
+    def zadd(self, *args, **kwargs):
+        pass
+
+    zrem = zremrangebyscore = expire = hincrby = hincrbyfloat = delete = zadd
+
+    def zcard(self, key):
+        return 0
+
+    def pipeline(self):
+        return MemoryPipeline(self)
+
+
+class MemoryPipeline:
+    def __init__(self, redis_conn):
+        self.redis = redis_conn
+        self.commands = []
+
+    def __getattr__(self, name):
+        command = getattr(self.redis, name)
+        return lambda *args, **kwargs: self.commands.append((command, args, kwargs))
+
+    def execute(self):
+        return [command(*args, **kwargs) for command, args, kwargs in self.commands]
+
+
+class RecordingQueue:
+    def __init__(self):
+        self.job_ids = []
+
+    def enqueue(self, func, *args, **kwargs):
+        self.job_ids.append(kwargs["job_id"])
+
+
+def stub_parse(file_path, parser):
+    # Both real parsers spend their time waiting on a remote API
+    time.sleep(PARSE_SECONDS)
+    return {"name": "Load Test", "email": "load@test.dev", "skills": ["python", "sql", "aws"]}
+
+
+_worker_redis = None
+
+
+def _ingest(job_id):
+    process_ingestion(_worker_redis, job_id)
+
+
+def _init_worker(store):
+    global _worker_redis
+    _worker_redis = MemoryRedis()
+    _worker_redis.store = dict(store)
+
+
+async def upload_all(n):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def upload(i):
+            start = time.perf_counter()
+            response = await client.post("/resume/upload", files={"file": (f"resume_{i}.pdf", b"%%PDF-1.4 stub %d" % i, "application/pdf")})
+            assert response.status_code == 202, response.text
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*[upload(i) for i in range(n)])
+        return latencies, time.perf_counter() - start
+
+
+def main() -> None:
+    global PARSE_SECONDS
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uploads", type=int, default=200)
+    parser.add_argument("--parse-ms", type=float, default=100)
+    parser.add_argument("--max-workers", type=int, default=4)
+    args = parser.parse_args()
+    PARSE_SECONDS = args.parse_ms / 1000
+    # No Redis server is needed; the shared embedding cache just misses
+    logging.getLogger("api.services.embedding_cache").setLevel(logging.ERROR)
+    resume_ingestion.parse_resume = stub_parse
+
+    redis_conn, queue = MemoryRedis(), RecordingQueue()
+    app.dependency_overrides[get_redis] = lambda: redis_conn
+    app.dependency_overrides[get_queue] = lambda: queue
+    os.chdir(tempfile.mkdtemp())
+
+    latencies, elapsed = asyncio.run(upload_all(args.uploads))
+    latencies_ms = np.array(latencies) * 1000
+    print(f"uploads: {args.uploads} concurrent, stub parse {args.parse_ms:.0f} ms each")
+    print(f"  {args.uploads / elapsed:,.0f} uploads/s, latency p50 {np.percentile(latencies_ms, 50):.1f} ms, "
+          f"p95 {np.percentile(latencies_ms, 95):.1f} ms")
+
+    context = multiprocessing.get_context("fork")
+    workers = 1
+    while workers <= args.max_workers:
+        with context.Pool(workers, initializer=_init_worker, initargs=(redis_conn.store,)) as pool:
+            start = time.perf_counter()
+            pool.map(_ingest, queue.job_ids, chunksize=1)
+            elapsed = time.perf_counter() - start
+        print(f"workers: {workers}  {len(queue.job_ids) / elapsed:6.1f} ingestions/s")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
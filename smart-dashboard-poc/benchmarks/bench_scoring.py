@@ -0,0 +1,59 @@
+"""
+Top-k job scoring: the per-job cosine_sim loop vs. ScoringEngine.
+
+Run from smart-dashboard-poc/:
+
+    python -m benchmarks.bench_scoring --jobs 1000 10000 100000 --k 10
+"""
+import time
+import argparse
+
+import numpy as np
+
+from api.routers.jobs import cosine_sim
+from api.services.scoring import ScoringEngine
+
+
+def loop_top_k(query: np.ndarray, embeddings: list, k: int) -> list:
+    scores = [cosine_sim(query, emb) for emb in embeddings]
+    return sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:k]
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    query = rng.standard_normal(args.dim)
+    print(f"{'jobs':>8} {'loop ms':>10} {'build ms':>10} {'query ms':>10} {'speedup':>8}")
+    for n_jobs in args.jobs:
+        # _embed returns float32 vectors
+        embeddings = list(rng.standard_normal((n_jobs, args.dim), dtype=np.float32))
+
+        loop_s = best_of(lambda: loop_top_k(query, embeddings, args.k), args.repeat)
+        build_s = best_of(lambda: ScoringEngine(embeddings), args.repeat)
+        engine = ScoringEngine(embeddings)
+        query_s = best_of(lambda: engine.top_k(query, args.k), args.repeat)
+
+        expected = loop_top_k(query, embeddings, args.k)
+        assert list(engine.top_k(query, args.k)[0]) == expected, "engine disagrees with loop"
+
+        print(f"{n_jobs:>8} {loop_s * 1e3:>10.1f} {build_s * 1e3:>10.1f} {query_s * 1e3:>10.2f} "
+              f"{loop_s / (build_s + query_s):>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
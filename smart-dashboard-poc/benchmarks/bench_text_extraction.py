@@ -0,0 +1,110 @@
+"""
+Resume text extraction on synthetic 1-, 10- and 100-page PDFs.
+
+For each size, times the previous serial extraction (open the file and
+join every page's text), then `extract_text` in one process, split across
+--workers processes, under a two-page budget, and from the text cache.
+Page-parallel extraction only pays off with more than one core.
+
+Run from smart-dashboard-poc/:
+
+    python -m benchmarks.bench_text_extraction --workers 4 --repeat 3
+"""
+import os
+import time
+import argparse
+import tempfile
+from typing import List
+
+import PyPDF2
+
+from api.services import text_extraction
+from api.services.text_extraction import extract_text
+from benchmarks.bench_resume_ingestion import MemoryRedis
+
+LINES_PER_PAGE = 45
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """A minimal PDF with one Helvetica text line per string on each page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        stream = "BT /F1 10 Tf 14 TL 50 800 Td " + " ".join(f"({_escape(line)}) Tj T*" for line in lines) + " ET"
+        content = stream.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> "
+            b"/Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(output)
+
+
+def resume_pages(count: int) -> List[List[str]]:
+    return [
+        [f"Page {page + 1} line {line}: engineer, shipped python and sql data pipelines" for line in range(LINES_PER_PAGE)]
+        for page in range(count)
+    ]
+
+
+def previous_extraction(file_path: str) -> str:
+    with open(file_path, "rb") as file:
+        return " ".join(page.extract_text() for page in PyPDF2.PdfReader(file).pages)
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Let the 10-page document be split too, to show the crossover
+    text_extraction.PARALLEL_MIN_PAGES = 8
+    print(f"{'pages':>5} {'previous':>9} {'serial':>9} {'parallel':>9} {'2 pages':>9} {'cached':>9}  (ms, best of {args.repeat})")
+    with tempfile.TemporaryDirectory() as directory:
+        for pages in (1, 10, 100):
+            path = os.path.join(directory, f"resume_{pages}.pdf")
+            with open(path, "wb") as file:
+                file.write(make_pdf(resume_pages(pages)))
+            expected = previous_extraction(path)
+            assert extract_text(path, redis_conn=MemoryRedis(), workers=args.workers) == expected
+
+            cache = MemoryRedis()
+            extract_text(path, redis_conn=cache)
+            timings = [
+                best_of(args.repeat, lambda: previous_extraction(path)),
+                best_of(args.repeat, lambda: extract_text(path, redis_conn=MemoryRedis(), workers=1)),
+                best_of(args.repeat, lambda: extract_text(path, redis_conn=MemoryRedis(), workers=args.workers)),
+                best_of(args.repeat, lambda: extract_text(path, max_pages=2, redis_conn=MemoryRedis(), workers=1)),
+                best_of(args.repeat, lambda: extract_text(path, redis_conn=cache)),
+            ]
+            print(f"{pages:>5} " + " ".join(f"{seconds * 1000:>9.1f}" for seconds in timings))
+
+
+if __name__ == "__main__":
+    main()
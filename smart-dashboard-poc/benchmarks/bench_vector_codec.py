@@ -0,0 +1,58 @@
+"""
+Memory and top-k recall of quantized embedding storage.
+
+Encodes a synthetic clustered corpus with each storage dtype and reports
+the encoded size per million vectors, scoring throughput on the quantized
+rows, and top-k recall against exact float64 scores. Queries are corpus
+vectors' neighbourhoods (topic direction plus fresh noise), like candidate
+profiles against job postings.
+
+Run from smart-dashboard-poc/:
+
+    python -m benchmarks.bench_vector_codec --vectors 100000 --dim 1536
+"""
+import time
+import argparse
+
+import numpy as np
+
+from api.services.vector_codec import DTYPES, decode, encode, quantize
+from benchmarks.bench_job_index import synthetic_vectors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--topics", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    topics = synthetic_vectors(rng, rng.standard_normal((args.topics, args.dim), dtype=np.float32), args.topics, noise=0)
+    corpus = synthetic_vectors(rng, topics, args.vectors)
+    queries = synthetic_vectors(rng, topics, args.queries)
+
+    exact = corpus.astype(np.float64) @ queries.astype(np.float64).T
+    truth = [set(np.argsort(-exact[:, q])[:args.k].tolist()) for q in range(args.queries)]
+    del exact
+
+    print(f"{args.vectors} x {args.dim} unit vectors, recall@{args.k} vs float64 over {args.queries} queries")
+    print(f"{'dtype':>8} {'bytes/vec':>10} {'MB per 1M':>10} {'queries/s':>10} {'recall@k':>9}")
+    for dtype in DTYPES:
+        vectors = decode(encode(quantize(corpus, dtype)))
+        per_vector = vectors.nbytes / len(vectors)
+
+        start = time.perf_counter()
+        found = [vectors.top_k(query, args.k)[0] for query in queries]
+        elapsed = time.perf_counter() - start
+
+        recall = np.mean([len(truth[q] & set(found[q].tolist())) / args.k for q in range(args.queries)])
+        print(f"{dtype:>8} {per_vector:>10.0f} {per_vector * 1e6 / 2**20:>10,.0f} "
+              f"{args.queries / elapsed:>10.1f} {recall:>9.4f}")
+    print(f"{'float64':>8} {args.dim * 8:>10} {args.dim * 8 * 1e6 / 2**20:>10,.0f} {'-':>10} {1.0:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
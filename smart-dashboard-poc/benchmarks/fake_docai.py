@@ -0,0 +1,171 @@
+"""
+Local fake Document AI processor used by the tests and benchmarks.
+
+A real gRPC server implementing ProcessDocument, BatchProcessDocuments and
+the long-running operations' GetOperation, so the real client library,
+channel and operation polling are exercised. "Entities" are the
+`(Name: ...)`, `(Email: ...)`, `(Phone: ...)` and `(Skill: ...)` strings
+in the document bytes, which is how the synthetic PDFs store their text.
+Cloud Storage is replaced by MemoryStorage.
+"""
+import re
+import time
+import threading
+from concurrent import futures
+from typing import Dict, List
+
+import grpc
+from google.cloud import documentai
+from google.cloud.documentai_v1.services.document_processor_service.transports import (
+    DocumentProcessorServiceGrpcTransport,
+)
+from google.longrunning import operations_pb2
+from google.protobuf import any_pb2
+
+SERVICE = "google.cloud.documentai.v1.DocumentProcessorService"
+OPERATIONS_SERVICE = "google.longrunning.Operations"
+ENTITY_PATTERN = re.compile(rb"\((Name|Email|Phone|Skill): ([^)]*)\)")
+ENTITY_TYPES = {b"Name": "person_name", b"Email": "email_address", b"Phone": "phone_number", b"Skill": "skill"}
+
+
+class MemoryStorage:
+    """Stands in for GcsStorage."""
+
+    def __init__(self):
+        self.objects: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def upload(self, uri: str, data: bytes, content_type: str) -> None:
+        with self._lock:
+            self.objects[uri] = bytes(data)
+
+    def list(self, prefix_uri: str) -> List[str]:
+        with self._lock:
+            return [uri for uri in self.objects if uri.startswith(prefix_uri)]
+
+    def download(self, uri: str) -> bytes:
+        with self._lock:
+            return self.objects[uri]
+
+    def delete(self, uri: str) -> None:
+        with self._lock:
+            self.objects.pop(uri, None)
+
+
+def fake_document(content: bytes, mime_type: str) -> "documentai.Document":
+    entities = [
+        documentai.Document.Entity(type_=ENTITY_TYPES[kind], mention_text=value.decode("latin-1"))
+        for kind, value in ENTITY_PATTERN.findall(content)
+    ]
+    return documentai.Document(mime_type=mime_type, entities=entities)
+
+
+class FakeDocAIServer:
+    """
+    `with FakeDocAIServer(storage) as fake: client = create_docai_client(fake.transport())`.
+
+    Online requests take `latency` seconds. A batch operation takes
+    `batch_latency` plus `batch_document_latency` per document before it
+    reports done; with both at 0 it is done when submitted.
+    """
+
+    def __init__(self, storage: MemoryStorage = None, latency: float = 0.0,
+                 batch_latency: float = 0.0, batch_document_latency: float = 0.0):
+        self.storage = storage or MemoryStorage()
+        self.latency = latency
+        self.batch_latency = batch_latency
+        self.batch_document_latency = batch_document_latency
+        self.process_requests = 0
+        self.batch_requests = 0
+        self.get_operation_requests = 0
+        self.mime_types: List[str] = []
+        # Operation name -> (finished operation, time it is done)
+        self._operations: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._server = grpc.server(futures.ThreadPoolExecutor(max_workers=16))
+        self._server.add_generic_rpc_handlers([
+            grpc.method_handlers_generic_handler(SERVICE, {
+                "ProcessDocument": grpc.unary_unary_rpc_method_handler(
+                    self._process,
+                    request_deserializer=documentai.ProcessRequest.deserialize,
+                    response_serializer=documentai.ProcessResponse.serialize,
+                ),
+                "BatchProcessDocuments": grpc.unary_unary_rpc_method_handler(
+                    self._batch,
+                    request_deserializer=documentai.BatchProcessRequest.deserialize,
+                    response_serializer=operations_pb2.Operation.SerializeToString,
+                ),
+            }),
+            grpc.method_handlers_generic_handler(OPERATIONS_SERVICE, {
+                "GetOperation": grpc.unary_unary_rpc_method_handler(
+                    self._get_operation,
+                    request_deserializer=operations_pb2.GetOperationRequest.FromString,
+                    response_serializer=operations_pb2.Operation.SerializeToString,
+                ),
+            }),
+        ])
+        self.port = self._server.add_insecure_port("127.0.0.1:0")
+
+    @property
+    def endpoint(self) -> str:
+        return f"127.0.0.1:{self.port}"
+
+    def transport(self) -> DocumentProcessorServiceGrpcTransport:
+        return DocumentProcessorServiceGrpcTransport(channel=grpc.insecure_channel(self.endpoint))
+
+    def __enter__(self) -> "FakeDocAIServer":
+        self._server.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.stop(grace=None)
+
+    def _process(self, request, context):
+        with self._lock:
+            self.process_requests += 1
+            self.mime_types.append(request.raw_document.mime_type)
+        if self.latency:
+            time.sleep(self.latency)
+        return documentai.ProcessResponse(document=fake_document(request.raw_document.content, request.raw_document.mime_type))
+
+    def _batch(self, request, context):
+        output_prefix = request.document_output_config.gcs_output_config.gcs_uri
+        metadata = documentai.BatchProcessMetadata(state=documentai.BatchProcessMetadata.State.SUCCEEDED)
+        for index, source in enumerate(request.input_documents.gcs_documents.documents):
+            destination = f"{output_prefix.rstrip('/')}/{index}"
+            status = documentai.BatchProcessMetadata.IndividualProcessStatus(
+                input_gcs_source=source.gcs_uri, output_gcs_destination=destination,
+            )
+            try:
+                document = fake_document(self.storage.download(source.gcs_uri), source.mime_type)
+                self.storage.upload(f"{destination}/doc-0.json", documentai.Document.to_json(document).encode("utf-8"), "application/json")
+            except KeyError:
+                status.status.code = 5
+                status.status.message = f"{source.gcs_uri} not found"
+            metadata.individual_process_statuses.append(status)
+
+        with self._lock:
+            self.batch_requests += 1
+            name = f"operations/batch-{self.batch_requests}"
+        finished = operations_pb2.Operation(name=name, done=True)
+        finished.metadata.Pack(documentai.BatchProcessMetadata.pb(metadata))
+        finished.response.Pack(documentai.BatchProcessResponse.pb(documentai.BatchProcessResponse()))
+        delay = self.batch_latency + self.batch_document_latency * len(metadata.individual_process_statuses)
+        if not delay:
+            return finished
+        with self._lock:
+            self._operations[name] = (finished, time.monotonic() + delay)
+        running = operations_pb2.Operation(name=name, done=False)
+        running_metadata = documentai.BatchProcessMetadata(state=documentai.BatchProcessMetadata.State.RUNNING)
+        running.metadata.Pack(documentai.BatchProcessMetadata.pb(running_metadata))
+        return running
+
+    def _get_operation(self, request, context):
+        with self._lock:
+            self.get_operation_requests += 1
+            finished, done_at = self._operations[request.name]
+        if time.monotonic() >= done_at:
+            return finished
+        running = operations_pb2.Operation(name=request.name, done=False)
+        running.metadata.CopyFrom(any_pb2.Any())
+        return running
@@ -0,0 +1,94 @@
+"""
+Event-loop responsiveness while scrapes are in flight.
+
+Serves the saved Indeed pages from tests/fixtures with an artificial delay,
+then fires concurrent scrape requests at a small uvicorn app while polling
+/ping. The blocking variant reproduces the old `requests.get` inside an
+`async def` handler; the async variant uses the pooled scraper.
+
+Run from smart-dashboard-poc/:
+
+    python -m benchmarks.load_scrape_event_loop --scrapes 8 --delay 1.0
+"""
+import time
+import asyncio
+import argparse
+import threading
+
+import httpx
+import numpy as np
+import requests
+import uvicorn
+from fastapi import FastAPI
+
+from api.services.scraper import parse_indeed_page, scrape_indeed_jobs
+from benchmarks.fixture_server import FixtureServer
+
+
+def build_app(fixture_url: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        return {"pong": True}
+
+    @app.get("/scrape/blocking")
+    async def scrape_blocking():
+        response = requests.get(f"{fixture_url}/jobs", params={"q": "python", "start": "0"}, timeout=10)
+        return len(parse_indeed_page(response.text, fixture_url))
+
+    @app.get("/scrape/async")
+    async def scrape_async():
+        return len(await scrape_indeed_jobs(["python"], pages=3, base_url=fixture_url))
+
+    return app
+
+
+async def measure(api_url: str, mode: str, scrapes: int) -> dict:
+    async with httpx.AsyncClient(base_url=api_url, timeout=60) as client:
+        start = time.perf_counter()
+        scrape_tasks = [asyncio.create_task(client.get(f"/scrape/{mode}")) for _ in range(scrapes)]
+        ping_latencies = []
+        while not all(task.done() for task in scrape_tasks):
+            ping_start = time.perf_counter()
+            await client.get("/ping")
+            ping_latencies.append((time.perf_counter() - ping_start) * 1e3)
+            await asyncio.sleep(0.05)
+        await asyncio.gather(*scrape_tasks)
+        return {
+            "wall_s": time.perf_counter() - start,
+            "ping_p50_ms": float(np.percentile(ping_latencies, 50)),
+            "ping_max_ms": max(ping_latencies),
+            "pings": len(ping_latencies),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scrapes", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=1.0, help="fixture server latency per page (s)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    fixtures = FixtureServer(delay=args.delay).start()
+    server = uvicorn.Server(uvicorn.Config(build_app(fixtures.base_url), port=args.port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    try:
+        api_url = f"http://127.0.0.1:{args.port}"
+        print(f"{'mode':>9} {'wall s':>7} {'pings':>6} {'ping p50 ms':>12} {'ping max ms':>12}")
+        for mode in ("blocking", "async"):
+            result = asyncio.run(measure(api_url, mode, args.scrapes))
+            print(f"{mode:>9} {result['wall_s']:>7.2f} {result['pings']:>6} "
+                  f"{result['ping_p50_ms']:>12.1f} {result['ping_max_ms']:>12.1f}")
+    finally:
+        server.should_exit = True
+        thread.join()
+        fixtures.stop()
+
+
+if __name__ == "__main__":
+    main()
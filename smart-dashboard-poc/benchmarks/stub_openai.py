@@ -0,0 +1,151 @@
+"""
+Local OpenAI-compatible stub server used by the benchmarks.
+
+Only the endpoints the API actually calls are implemented. Every request is
+counted so benchmarks can report request volume rather than wall time alone.
+Chat completions can enforce a requests-per-minute limit, answering 429
+with Retry-After like the real API, and fail a share of requests with 500.
+"""
+import json
+import time
+import random
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+import numpy as np
+
+EMBEDDING_DIM = 1536
+
+
+def fake_embedding(text: str, dim: int = EMBEDDING_DIM) -> list:
+    """Deterministic pseudo-embedding for `text`."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "little")
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32).tolist()
+
+
+class StubOpenAIServer:
+    """Runs the stub on a background thread: `with StubOpenAIServer() as stub: ...`."""
+
+    def __init__(self, latency: float = 0.0, requests_per_minute: int = 0, error_rate: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        self.inputs = 0
+        self.chat_requests = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.error_rate = error_rate
+        # The limit holds two seconds of requests, like a per-minute limit enforced over short windows
+        self._rate = requests_per_minute / 60
+        self._allowance = self._capacity = max(self._rate * 2, 1.0)
+        self._updated = time.monotonic()
+        self._random = random.Random(0)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.inputs = 0
+            self.chat_requests = 0
+            self.rate_limited = 0
+            self.errors = 0
+            self._allowance = self._capacity
+            self._updated = time.monotonic()
+
+    def __enter__(self) -> "StubOpenAIServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _admit_chat(self) -> int:
+        """The status to answer a chat request with."""
+        with self._lock:
+            self.chat_requests += 1
+            if self._rate:
+                now = time.monotonic()
+                self._allowance = min(self._capacity, self._allowance + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._allowance < 1:
+                    self.rate_limited += 1
+                    return 429
+                self._allowance -= 1
+            if self._random.random() < self.error_rate:
+                self.errors += 1
+                return 500
+            return 200
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if self.path.endswith("/embeddings"):
+                    inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+                    with stub._lock:
+                        stub.requests += 1
+                        stub.inputs += len(inputs)
+                    if stub.latency:
+                        threading.Event().wait(stub.latency)
+                    payload = {
+                        "object": "list",
+                        "model": body["model"],
+                        "data": [
+                            {"object": "embedding", "index": i, "embedding": fake_embedding(text)}
+                            for i, text in enumerate(inputs)
+                        ],
+                        "usage": {"prompt_tokens": 0, "total_tokens": 0},
+                    }
+                    self._send(200, payload)
+                elif self.path.endswith("/chat/completions"):
+                    status = stub._admit_chat()
+                    if status != 200:
+                        self._send(status, {"error": {"message": f"stub {status}", "type": "stub"}}, {"Retry-After": "0.5"} if status == 429 else {})
+                        return
+                    if stub.latency:
+                        threading.Event().wait(stub.latency)
+                    resume = body["messages"][-1]["content"]
+                    answer = {"name": resume.splitlines()[0] if resume else "", "skills": [], "prompt_chars": len(resume)}
+                    payload = {
+                        "id": "chatcmpl-stub",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": body["model"],
+                        "choices": [{
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {"role": "assistant", "content": json.dumps(answer)},
+                        }],
+                        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                    }
+                    self._send(200, payload)
+                else:
+                    self._send(404, {"error": {"message": "not found"}})
+
+            def _send(self, status: int, payload: dict, headers: Optional[Dict[str, str]] = None) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
@@ -1,11 +1,196 @@
 # Minimal conftest for pytest (can be empty unless fixtures are needed globally) 
 
+import time
+
 import pytest
 from unittest.mock import MagicMock
 
+from benchmarks.fixture_server import FixtureServer
+
 @pytest.fixture(scope="function")
 def mock_redis_conn():
     """Fixture to mock the Redis connection."""
     mock_redis = MagicMock()
     mock_redis.get.return_value = None
-    return mock_redis 
\ No newline at end of file
+    return mock_redis 
+
+
+def _key(key):
+    return key.decode("utf-8") if isinstance(key, bytes) else key
+
+
+def _encode(value):
+    return value if isinstance(value, bytes) else str(value).encode("utf-8")
+
+
+class FakePipeline:
+    def __init__(self, redis_conn):
+        self.redis = redis_conn
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeLock:
+    def __init__(self, redis_conn, name):
+        self.redis = redis_conn
+        self.name = name
+
+    def acquire(self):
+        return bool(self.redis.set(self.name, "token", nx=True))
+
+    def release(self):
+        self.redis.delete(self.name)
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for one Redis server: strings with expiry, hashes
+    and sorted sets (with Redis' (score, member) ordering), pipelines and
+    locks. `commands` records the MGETs, so tests can count round trips.
+    """
+
+    def __init__(self):
+        self.strings = {}
+        self.ttls = {}
+        self.expires_at = {}
+        self.hashes = {}
+        self.zsets = {}
+        self.commands = []
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def lock(self, name, timeout=None, blocking=False):
+        return FakeLock(self, name)
+
+    def _live(self, key):
+        key = _key(key)
+        if key in self.expires_at and self.expires_at[key] <= time.monotonic():
+            self.delete(key)
+        return key
+
+    def _expire_in(self, key, seconds):
+        self.ttls[key] = seconds
+        self.expires_at[key] = time.monotonic() + seconds
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        key = self._live(key)
+        if nx and key in self.strings:
+            return False
+        self.strings[key] = _encode(value)
+        self.ttls.pop(key, None)
+        self.expires_at.pop(key, None)
+        if ex or px:
+            self._expire_in(key, ex or px / 1000)
+        return True
+
+    def setex(self, key, seconds, value):
+        return self.set(key, value, ex=seconds)
+
+    def get(self, key):
+        return self.strings.get(self._live(key))
+
+    def mget(self, keys):
+        self.commands.append("mget")
+        return [self.get(key) for key in keys]
+
+    def exists(self, key):
+        return int(self._live(key) in self.strings)
+
+    def delete(self, *keys):
+        for key in map(_key, keys):
+            for store in (self.strings, self.ttls, self.expires_at, self.hashes, self.zsets):
+                store.pop(key, None)
+
+    def expire(self, key, seconds):
+        self._expire_in(_key(key), seconds)
+
+    def pttl(self, key):
+        key = self._live(key)
+        if key not in self.strings:
+            return -2
+        if key not in self.expires_at:
+            return -1
+        return int((self.expires_at[key] - time.monotonic()) * 1000)
+
+    def keys(self, pattern):
+        raise AssertionError("KEYS must not be used")
+
+    def scan_iter(self, pattern, count=None):
+        prefix = pattern.rstrip("*")
+        return [key.encode("utf-8") for key in list(self.strings) if key.startswith(prefix)]
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(_key(key), {}).update({field: _encode(value) for field, value in mapping.items()})
+
+    def hmget(self, key, fields):
+        stored = self.hashes.get(_key(key), {})
+        return [stored.get(field) for field in fields]
+
+    def hincrby(self, key, field, amount=1):
+        fields = self.hashes.setdefault(_key(key), {})
+        fields[field] = _encode(int(fields.get(field, 0)) + amount)
+
+    def hincrbyfloat(self, key, field, amount=1.0):
+        fields = self.hashes.setdefault(_key(key), {})
+        fields[field] = _encode(float(fields.get(field, 0)) + amount)
+
+    def hgetall(self, key):
+        return {_encode(field): value for field, value in self.hashes.get(_key(key), {}).items()}
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update({_encode(member): float(score) for member, score in mapping.items()})
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.zsets.get(key, {}).pop(_encode(member), None)
+
+    def zremrangebyscore(self, key, low, high):
+        limit = float(high.lstrip("("))
+        zset = self.zsets.get(key, {})
+        for member in [m for m, score in zset.items() if score < limit]:
+            del zset[member]
+
+    def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    def zpopmin(self, key, count=1):
+        rows = sorted(self.zsets.get(key, {}).items(), key=lambda item: (item[1], item[0]))[:count]
+        for member, _ in rows:
+            del self.zsets[key][member]
+        return rows
+
+    def _descending(self, key):
+        return sorted(self.zsets.get(key, {}).items(), key=lambda item: (item[1], item[0]), reverse=True)
+
+    def zrevrange(self, key, start, end, withscores=False):
+        return self._descending(key)[start:end + 1]
+
+    def zrevrangebyscore(self, key, high, low, start=0, num=None, withscores=False):
+        rows = [row for row in self._descending(key) if row[1] <= high]
+        return rows[start:start + num]
+
+    def zcount(self, key, low, high):
+        return sum(1 for score in self.zsets.get(key, {}).values() if low <= score <= high)
+
+
+@pytest.fixture(scope="function")
+def fake_redis():
+    """An empty in-memory Redis."""
+    return FakeRedis()
+
+
+@pytest.fixture(scope="function")
+def fixture_server():
+    """Local HTTP server serving the saved Indeed result pages."""
+    server = FixtureServer().start()
+    yield server
+    server.stop()
@@ -0,0 +1,168 @@
+import hashlib
+import io
+import json
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.deps import get_redis
+from api.main import app
+from api.models import Candidate
+from api.routers.resume import get_parse_executor
+from api.services import bulk_import
+from api.services.bulk_import import stage_uploads
+
+client = TestClient(app)
+
+
+def zip_bytes(entries):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in entries.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def fake_parse(file_path, parser):
+    if "broken" in file_path:
+        raise ValueError("unreadable PDF")
+    return {"name": os.path.basename(file_path).split("_", 1)[1], "skills": ["python"]}
+
+
+@pytest.fixture
+def bulk_app(fake_redis, tmp_path, monkeypatch, mocker):
+    monkeypatch.chdir(tmp_path)
+    mocker.patch("api.services.bulk_import.parse_resume", side_effect=fake_parse)
+    embed = mocker.patch("api.services.bulk_import.embed_candidate")
+    executor = ThreadPoolExecutor(max_workers=2)
+    app.dependency_overrides[get_redis] = lambda: fake_redis
+    app.dependency_overrides[get_parse_executor] = lambda: executor
+    yield fake_redis, embed
+    app.dependency_overrides = {}
+    executor.shutdown()
+
+
+def test_stage_uploads_extracts_archives_and_rejects_other_files(tmp_path):
+    archive = zip_bytes({
+        "batch/a.pdf": b"%PDF a",
+        "batch/b.docx": b"docx b",
+        "batch/notes.txt": b"notes",
+        "../../escape.pdf": b"%PDF escape",
+        "__MACOSX/batch/._a.pdf": b"resource fork",
+    })
+    uploads = [
+        ("batch.zip", io.BytesIO(archive)),
+        ("c.PDF", io.BytesIO(b"%PDF c")),
+        ("broken.zip", io.BytesIO(b"not a zip")),
+        ("photo.png", io.BytesIO(b"png")),
+    ]
+
+    staged, rejected = stage_uploads(uploads, str(tmp_path))
+
+    assert [name for name, _, _ in staged] == ["batch.zip/batch/a.pdf", "batch.zip/batch/b.docx", "batch.zip/../../escape.pdf", "c.PDF"]
+    for _, path, _ in staged:
+        assert os.path.dirname(path) == str(tmp_path)
+    assert staged[0][2] == hashlib.sha256(b"%PDF a").hexdigest()
+    with open(staged[0][1], "rb") as stored:
+        assert stored.read() == b"%PDF a"
+    assert {result.file: result.error for result in rejected} == {
+        "batch.zip/batch/notes.txt": "Unsupported file type",
+        "broken.zip": "Not a valid zip archive",
+        "photo.png": "Unsupported file type",
+    }
+
+
+def test_stage_uploads_enforces_archive_limits(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk_import, "MAX_ARCHIVE_FILES", 1)
+    archive = zip_bytes({"a.pdf": b"a", "b.pdf": b"b"})
+
+    staged, rejected = stage_uploads([("big.zip", io.BytesIO(archive))], str(tmp_path))
+
+    assert staged == []
+    assert "limit is 1" in rejected[0].error
+    assert os.listdir(tmp_path) == []
+
+
+def test_bulk_import_streams_one_line_per_file(bulk_app):
+    fake_redis, embed = bulk_app
+    archive = zip_bytes({"alice.pdf": b"%PDF", "broken.pdf": b"??", "readme.md": b"#"})
+    files = [
+        ("files", ("batch.zip", archive, "application/zip")),
+        ("files", ("bob.docx", b"docx", "application/octet-stream")),
+    ]
+
+    response = client.post("/resume/bulk", files=files)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = {line["file"]: line for line in map(json.loads, response.text.splitlines())}
+    assert set(results) == {"batch.zip/alice.pdf", "batch.zip/broken.pdf", "batch.zip/readme.md", "bob.docx"}
+    assert results["batch.zip/broken.pdf"]["status"] == "Failed"
+    assert "unreadable PDF" in results["batch.zip/broken.pdf"]["error"]
+    assert results["batch.zip/readme.md"]["status"] == "Failed"
+    for name, expected in (("batch.zip/alice.pdf", "alice.pdf"), ("bob.docx", "bob.docx")):
+        assert results[name]["status"] == "Completed"
+        stored = Candidate.parse_raw(fake_redis.get(f"candidate:{results[name]['candidate_id']}"))
+        assert stored.name == expected
+    assert embed.call_count == 2
+
+
+def test_large_docai_imports_use_one_batch(bulk_app, mocker, monkeypatch):
+    fake_redis, embed = bulk_app
+    fake_redis.set("settings:parser_preference", "docai")
+    monkeypatch.setattr(bulk_import.docai_parser, "DOCAI_BATCH_GCS_URI", "gs://resumes/batches")
+    monkeypatch.setattr(bulk_import.docai_parser, "DOCAI_BATCH_MIN_FILES", 2)
+    batch = mocker.patch(
+        "api.services.docai_parser.parse_batch_with_docai",
+        side_effect=lambda paths: {
+            path: (None, "processor failed") if "broken" in path else ({"name": os.path.basename(path).split("_", 1)[1], "skills": []}, None)
+            for path in paths
+        },
+    )
+    files = [
+        ("files", ("alice.pdf", b"%PDF alice", "application/pdf")),
+        ("files", ("broken.pdf", b"%PDF broken", "application/pdf")),
+        ("files", ("carol.pdf", b"%PDF carol", "application/pdf")),
+    ]
+
+    response = client.post("/resume/bulk", files=files)
+
+    results = {line["file"]: line for line in map(json.loads, response.text.splitlines())}
+    assert batch.call_count == 1 and len(batch.call_args.args[0]) == 3
+    assert results["alice.pdf"]["status"] == "Completed" and results["carol.pdf"]["status"] == "Completed"
+    assert results["broken.pdf"]["error"].endswith("processor failed")
+    # Batched parses are cached like single ones
+    assert bulk_import.get_cached_parse(fake_redis, hashlib.sha256(b"%PDF alice").hexdigest(), "docai")["name"] == "alice.pdf"
+
+
+def test_cascade_imports_escalate_only_incomplete_parses(bulk_app, mocker, monkeypatch):
+    fake_redis, _ = bulk_app
+    fake_redis.set("settings:parser_preference", "cascade")
+    monkeypatch.setattr("api.services.parser_cascade.CASCADE_ESCALATION_PARSER", "docai")
+
+    def parse(file_path, parser):
+        if parser == "docai":
+            return {"name": "Carol Paid", "email": "carol@example.com", "skills": ["go"]}
+        if "carol" in file_path:
+            return {"name": "", "skills": []}
+        return {"name": "Alice Local", "email": "alice@example.com", "mobile_number": "555 010 0100", "skills": list("abcde")}
+
+    parse_resume = mocker.patch("api.services.bulk_import.parse_resume", side_effect=parse)
+    files = [
+        ("files", ("alice.pdf", b"%PDF alice", "application/pdf")),
+        ("files", ("carol.pdf", b"%PDF carol", "application/pdf")),
+    ]
+
+    response = client.post("/resume/bulk", files=files)
+
+    results = {line["file"]: line for line in map(json.loads, response.text.splitlines())}
+    names = {
+        file: Candidate.parse_raw(fake_redis.get(f"candidate:{result['candidate_id']}")).name
+        for file, result in results.items()
+    }
+    assert names == {"alice.pdf": "Alice Local", "carol.pdf": "Carol Paid"}
+    assert sorted(call.args[1] for call in parse_resume.call_args_list) == ["docai", "pyresparser", "pyresparser"]
+    assert client.get("/metrics/parser-cascade").json()["outcomes"]["escalated"]["count"] == 1
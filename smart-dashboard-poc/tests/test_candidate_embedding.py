@@ -0,0 +1,40 @@
+import asyncio
+
+import numpy as np
+
+from api.services import candidate_embedding
+from api.services.candidate_embedding import (
+    candidate_embedding_key, get_candidate_embedding, load_candidate_embedding, store_candidate_embedding,
+)
+
+
+def test_stored_embedding_round_trips_as_float32(fake_redis, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_STORAGE_DTYPE", "float16")
+    store_candidate_embedding(fake_redis, "c1", ["python", "sql"], np.array([0.25, -1.5], dtype=np.float64))
+
+    loaded = load_candidate_embedding(fake_redis, "c1", ["python", "sql"])
+
+    assert loaded.dtype == np.float32
+    np.testing.assert_array_equal(loaded, [0.25, -1.5])
+    # 16-byte header plus two float16 values
+    assert len(fake_redis.hashes[candidate_embedding_key("c1")]["vector"]) == 20
+    assert fake_redis.ttls[candidate_embedding_key("c1")] == 86400
+
+
+def test_changed_skills_invalidate_and_recompute(fake_redis, mocker):
+    store_candidate_embedding(fake_redis, "c1", ["python"], np.array([1.0, 0.0]))
+    calls = []
+
+    async def fake_embed(text, backend):
+        calls.append(text)
+        return np.array([0.0, 1.0], dtype=np.float32)
+
+    mocker.patch.object(candidate_embedding, "embed_text", side_effect=fake_embed)
+
+    assert load_candidate_embedding(fake_redis, "c1", ["python", "go"]) is None
+    first = asyncio.run(get_candidate_embedding(fake_redis, "c1", ["python", "go"]))
+    second = asyncio.run(get_candidate_embedding(fake_redis, "c1", ["python", "go"]))
+
+    np.testing.assert_array_equal(first, [0.0, 1.0])
+    np.testing.assert_array_equal(second, [0.0, 1.0])
+    assert calls == ["python go"]
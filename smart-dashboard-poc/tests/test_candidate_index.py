@@ -0,0 +1,93 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from api.deps import get_redis
+from api.main import app
+from api.models import Candidate, CandidateStatus
+from api.services.candidate_index import (
+    CREATED_INDEX_KEY, list_candidates_page, rebuild_candidate_index, save_candidate, status_index_key,
+)
+
+
+NOW = int(time.time() * 1000)
+
+
+def make_candidate(i, status=CandidateStatus.PENDING):
+    return Candidate(candidate_id=f"c{i:02d}", name=f"User {i}", skills=["python"], status=status)
+
+
+def page_ids(candidates):
+    return [candidate.candidate_id for candidate in candidates]
+
+
+def test_cursor_pages_walk_newest_first_including_timestamp_ties(fake_redis):
+    now = NOW
+    for i in range(7):
+        # c02..c04 share a timestamp, as in a bulk upload
+        created = now + (3 if 2 <= i <= 4 else i) * 1000
+        save_candidate(fake_redis, make_candidate(i), created_ms=created, ttl_seconds=10**9)
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = list_candidates_page(fake_redis, limit=2, cursor=cursor)
+        seen.extend(page_ids(page))
+        if cursor is None:
+            break
+
+    assert seen == ["c06", "c05", "c04", "c03", "c02", "c01", "c00"]
+    # One MGET per page, never a GET per row
+    assert fake_redis.commands == ["mget"] * 4
+
+
+def test_status_filter_follows_status_changes(fake_redis):
+    save_candidate(fake_redis, make_candidate(1), created_ms=NOW + 1, ttl_seconds=10**9)
+    save_candidate(fake_redis, make_candidate(2), created_ms=NOW + 2, ttl_seconds=10**9)
+    save_candidate(fake_redis, make_candidate(1, CandidateStatus.APPROVED), created_ms=NOW + 1, ttl_seconds=10**9)
+
+    approved, _ = list_candidates_page(fake_redis, 10, status=CandidateStatus.APPROVED)
+    pending, _ = list_candidates_page(fake_redis, 10, status=CandidateStatus.PENDING)
+
+    assert page_ids(approved) == ["c01"]
+    assert page_ids(pending) == ["c02"]
+
+
+def test_expired_records_are_dropped_from_the_index(fake_redis):
+    save_candidate(fake_redis, make_candidate(1), created_ms=NOW + 1, ttl_seconds=10**9)
+    save_candidate(fake_redis, make_candidate(2), created_ms=NOW + 2, ttl_seconds=10**9)
+    del fake_redis.strings["candidate:c02"]
+
+    page, cursor = list_candidates_page(fake_redis, 10)
+
+    assert page_ids(page) == ["c01"] and cursor is None
+    assert b"c02" not in fake_redis.zsets[CREATED_INDEX_KEY]
+    assert b"c02" not in fake_redis.zsets[status_index_key(CandidateStatus.PENDING)]
+
+
+def test_rebuild_indexes_existing_records_and_skips_sub_keys(fake_redis):
+    fake_redis.set("candidate:c01", make_candidate(1).json(), ex=86400)
+    fake_redis.set("candidate:c02", make_candidate(2).json(), ex=3600)
+    fake_redis.set("candidate:c01:applications", "not a candidate")
+
+    assert rebuild_candidate_index(fake_redis) == 2
+    page, _ = list_candidates_page(fake_redis, 10)
+    # c01 has more TTL left, so it was created more recently
+    assert page_ids(page) == ["c01", "c02"]
+
+
+def test_list_endpoint_returns_next_cursor_header(fake_redis):
+    for i in range(3):
+        save_candidate(fake_redis, make_candidate(i), created_ms=NOW + i, ttl_seconds=10**9)
+    app.dependency_overrides[get_redis] = lambda: fake_redis
+    try:
+        client = TestClient(app)
+        first = client.get("/resume/", params={"limit": 2})
+        second = client.get("/resume/", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+        invalid = client.get("/resume/", params={"cursor": "garbage"})
+    finally:
+        app.dependency_overrides = {}
+
+    assert [c["candidate_id"] for c in first.json()] == ["c02", "c01"]
+    assert [c["candidate_id"] for c in second.json()] == ["c00"]
+    assert "X-Next-Cursor" not in second.headers
+    assert invalid.status_code == 400
@@ -0,0 +1,115 @@
+import docx
+import pytest
+
+from api.services import docai_parser
+from api.services.docai_parser import (
+    create_docai_client, detect_mime_type, get_docai_client, parse_batch_with_docai, parse_with_docai,
+)
+from api.services.uploads import DOCX
+from benchmarks.bench_text_extraction import make_pdf
+from benchmarks.fake_docai import FakeDocAIServer
+
+RESUME_LINES = ["Name: Jane Doe", "Email: jane@example.com", "Phone: 555-0100", "Skill: python", "Skill: sql"]
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    monkeypatch.setenv("GOOGLE_CLOUD_PROJECT", "test-project")
+    monkeypatch.setenv("GOOGLE_DOCAI_PROCESSOR_ID", "test-processor")
+    with FakeDocAIServer() as fake:
+        yield fake, create_docai_client(fake.transport())
+
+
+def write_pdf(path, lines):
+    path.write_bytes(make_pdf([lines]))
+    return str(path)
+
+
+def test_mime_type_comes_from_the_content():
+    assert detect_mime_type(b"%PDF-1.7 ...", "resume.docx") == "application/pdf"
+    assert detect_mime_type(b"PK\x03\x04...word/document.xml") == DOCX
+    assert detect_mime_type(b"\x89PNG\r\n\x1a\n...", "scan.pdf") == "image/png"
+    assert detect_mime_type(b"\xff\xd8\xff\xe0...") == "image/jpeg"
+    with pytest.raises(ValueError):
+        detect_mime_type(b"plain text resume", "resume.pdf")
+
+
+def test_client_is_reused_within_a_process(monkeypatch, mocker):
+    create = mocker.patch("api.services.docai_parser.create_docai_client", side_effect=lambda: object())
+    monkeypatch.setattr(docai_parser, "_client", None)
+
+    first = get_docai_client()
+    assert get_docai_client() is first
+    # A forked child builds its own channel
+    monkeypatch.setattr(docai_parser.os, "getpid", lambda: -1)
+    assert get_docai_client() is not first
+    assert create.call_count == 2
+
+
+def test_single_documents_send_their_detected_type(processor, tmp_path):
+    fake, client = processor
+    document = docx.Document()
+    document.add_paragraph("(Name: Word Resume)")
+    document.save(tmp_path / "resume.docx")
+    pdf = write_pdf(tmp_path / "resume.pdf", RESUME_LINES)
+
+    parsed = parse_with_docai(pdf, client=client)
+    parse_with_docai(str(tmp_path / "resume.docx"), client=client)
+
+    assert parsed == {
+        "name": "Jane Doe", "email": "jane@example.com", "mobile_number": "555-0100",
+        "skills": ["python", "sql"], "experience": [], "education": [],
+    }
+    assert fake.mime_types == ["application/pdf", DOCX]
+
+
+def test_batch_maps_entities_back_to_each_file(processor, tmp_path):
+    fake, client = processor
+    paths = [write_pdf(tmp_path / f"resume_{i}.pdf", [f"Name: Candidate {i}", "Skill: go"]) for i in range(3)]
+    (tmp_path / "notes.pdf").write_bytes(b"not a pdf")
+    paths.append(str(tmp_path / "notes.pdf"))
+
+    results = parse_batch_with_docai(paths, "gs://resumes/batches", client=client, storage=fake.storage)
+
+    assert fake.batch_requests == 1 and fake.process_requests == 0
+    for i in range(3):
+        parsed, error = results[paths[i]]
+        assert error is None
+        assert (parsed["name"], parsed["skills"]) == (f"Candidate {i}", ["go"])
+    assert results[paths[3]] == (None, "Unsupported document type for Document AI")
+    # Staged inputs and outputs are removed
+    assert fake.storage.objects == {}
+
+
+def test_batch_polls_until_the_operation_is_done(processor, tmp_path):
+    fake, client = processor
+    fake.batch_latency = 0.2
+    path = write_pdf(tmp_path / "resume.pdf", RESUME_LINES)
+
+    results = parse_batch_with_docai([path], "gs://resumes/batches", client=client, storage=fake.storage)
+
+    assert results[path][0]["name"] == "Jane Doe"
+    assert fake.get_operation_requests >= 1
+
+
+def test_batch_reports_every_file_when_staging_fails(processor, tmp_path):
+    fake, client = processor
+    paths = [write_pdf(tmp_path / f"resume_{i}.pdf", RESUME_LINES) for i in range(3)]
+    upload = fake.storage.upload
+
+    def flaky_upload(uri, data, content_type):
+        if "/input/1" in uri:
+            raise OSError("storage unavailable")
+        upload(uri, data, content_type)
+
+    fake.storage.upload = flaky_upload
+    results = parse_batch_with_docai(paths, "gs://resumes/batches", client=client, storage=fake.storage)
+
+    assert set(results) == set(paths)
+    assert all(parsed is None and "storage unavailable" in error for parsed, error in results.values())
+    assert fake.batch_requests == 0 and fake.storage.objects == {}
+
+
+def test_batch_needs_a_bucket(tmp_path):
+    with pytest.raises(ValueError):
+        parse_batch_with_docai([str(tmp_path / "a.pdf")], gcs_uri="", client=object(), storage=object())
@@ -0,0 +1,164 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from api.models import Job
+from api.routers import jobs as jobs_router
+from api.services import embedding_backends
+from api.services.embedding_backends import (
+    AUTO, HashingBackend, LatencyMonitor, OpenAIBackend, SETTINGS_KEY, fallback_backend,
+    get_embedding_backend, get_latency_monitor, invalidate_backend_setting, select_embedding_backend,
+)
+
+
+class SettingsRedis:
+    def __init__(self, value=None):
+        self.value = value
+
+    def get(self, key):
+        assert key == SETTINGS_KEY
+        return self.value.encode("utf-8") if self.value else None
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def fresh_backends(monkeypatch):
+    monkeypatch.setattr(embedding_backends, "_monitors", {})
+    invalidate_backend_setting()
+    yield
+    invalidate_backend_setting()
+
+
+def test_hashing_backend_places_related_texts_closer():
+    backend = HashingBackend(dim=256)
+    python_job, python_job_2, nurse_job = backend.embed_batch([
+        "Senior Python developer, Django and PostgreSQL",
+        "Python engineer working with django and postgres",
+        "Registered nurse for the night shift in a hospital ward",
+    ])
+
+    assert python_job @ python_job_2 > 0.25
+    assert python_job @ python_job_2 > python_job @ nurse_job + 0.3
+    np.testing.assert_allclose(np.linalg.norm(python_job), 1.0, rtol=1e-5)
+
+
+def test_hashing_backend_is_deterministic_and_batch_consistent():
+    texts = ["python sql", "", "go kubernetes go"]
+    batch = HashingBackend(dim=64).embed_batch(texts)
+    single = [asyncio.run(HashingBackend(dim=64).embed(text)) for text in texts]
+
+    np.testing.assert_allclose(batch, np.stack(single), atol=1e-6)
+    assert not batch[1].any()
+    assert HashingBackend(dim=64).model != HashingBackend(dim=128).model
+
+
+def test_latency_monitor_trips_on_slow_average_and_recovers():
+    clock = FakeClock()
+    monitor = LatencyMonitor(max_latency=1.0, cooldown=30, smoothing=0.5, clock=clock)
+
+    monitor.observe(0.2)
+    monitor.observe(1.5)
+    assert not monitor.tripped
+    monitor.observe(3.0)
+    assert monitor.tripped
+
+    clock.now = 31
+    assert not monitor.tripped
+    # The average starts over once the primary is retried
+    monitor.observe(0.3)
+    assert not monitor.tripped
+    assert monitor.stats()["trips"] == 1
+
+
+def test_latency_monitor_trips_on_failure():
+    monitor = LatencyMonitor(max_latency=1.0, cooldown=30, clock=FakeClock())
+    monitor.failure()
+    assert monitor.tripped
+    assert monitor.stats()["failures"] == 1
+
+
+def test_auto_falls_back_to_local_while_openai_is_tripped():
+    settings = SettingsRedis()
+    assert select_embedding_backend(settings).name == OpenAIBackend.name
+
+    get_latency_monitor(get_embedding_backend(OpenAIBackend.name)).failure()
+
+    assert select_embedding_backend(settings).name == HashingBackend.name
+    assert fallback_backend(get_embedding_backend(OpenAIBackend.name)).name == HashingBackend.name
+
+
+def test_explicit_setting_disables_fallback():
+    settings = SettingsRedis("openai")
+    get_latency_monitor(get_embedding_backend(OpenAIBackend.name)).failure()
+
+    assert select_embedding_backend(settings).name == OpenAIBackend.name
+    assert fallback_backend(get_embedding_backend(OpenAIBackend.name)) is None
+
+
+def test_unknown_setting_uses_default():
+    assert embedding_backends.configured_backend(SettingsRedis("word2vec")) == AUTO
+
+
+def test_rank_jobs_reranks_locally_when_openai_fails(mocker):
+    async def failing_embed(self, text):
+        raise RuntimeError("API unavailable")
+
+    mocker.patch.object(OpenAIBackend, "embed", failing_embed)
+    embedding_backends.configured_backend(SettingsRedis())
+    jobs = [
+        Job(title="Nurse", company="Acme", location="Remote", url="https://example.com/0", description="nurse ward shifts"),
+        Job(title="Dev", company="Acme", location="Remote", url="https://example.com/1", description="python django developer"),
+    ]
+
+    ranked = asyncio.run(jobs_router.rank_jobs(jobs, ["python", "django"], backend=get_embedding_backend("openai")))
+
+    assert [job.url for job in ranked] == ["https://example.com/1", "https://example.com/0"]
+    assert ranked[0].score > ranked[1].score
+
+
+def test_hashing_backend_memo_is_bounded_and_keeps_results():
+    texts = [f"word{i} shared word{i + 1}" for i in range(40)]
+    bounded = HashingBackend(dim=64, memo_size=8)
+
+    vectors = np.concatenate([bounded.embed_batch([text]) for text in texts])
+
+    assert len(bounded._word_ids) <= 8 + 3 and len(bounded._bigrams) <= 8
+    # The most recent words survive eviction
+    assert "shared" in bounded._word_ids
+    np.testing.assert_allclose(vectors, HashingBackend(dim=64).embed_batch(texts), atol=1e-6)
+
+
+def test_fallback_rankings_are_cached_for_the_fallback_backend(fake_redis, mocker, tmp_path):
+    from api.services.candidate_embedding import profile_version
+    from api.services.job_index import JobIndex
+
+    openai, local = get_embedding_backend("openai"), get_embedding_backend("local")
+    jobs = [Job(title="Dev", company="Acme", location="Remote", url="https://example.com/0", description="python")]
+    mocker.patch.object(jobs_router, "get_job_index", return_value=JobIndex.open(str(tmp_path), dim=2, model="m"))
+    mocker.patch.object(jobs_router, "scrape_job_set", return_value='[{"title": "Dev", "company": "Acme", "location": "Remote", "url": "https://example.com/0", "description": "python"}]')
+    mocker.patch.object(jobs_router, "get_candidate_embedding", return_value=np.ones(2, dtype=np.float32))
+    mocker.patch.object(jobs_router, "ingest_jobs")
+    mocker.patch.object(jobs_router, "rank_jobs_with_backend", return_value=(jobs, local))
+
+    asyncio.run(jobs_router.find_ranked_jobs(fake_redis, "c1", ["python"], backend=openai))
+
+    cached = [key for key in fake_redis.strings if key.startswith(jobs_router.RANKING_CACHE_PREFIX)]
+    assert len(cached) == 1
+    assert profile_version(["python"], local.model) in cached[0]
+    assert profile_version(["python"], openai.model) not in cached[0]
+
+
+def test_backends_must_implement_embed():
+    class Incomplete(embedding_backends.EmbeddingBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+
+from api.services.embedding_batcher import EmbeddingBatcher
+
+
+class FakeEmbeddingsClient:
+    """Mimics `AsyncOpenAI().embeddings.create` and records each request."""
+
+    def __init__(self):
+        self.calls = []
+        self.embeddings = self
+
+    async def create(self, input, model):
+        self.calls.append(list(input))
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=[float(len(text)), 1.0]) for i, text in enumerate(input)
+        ])
+
+    async def close(self):
+        pass
+
+
+def test_concurrent_embeds_share_one_request():
+    client = FakeEmbeddingsClient()
+    batcher = EmbeddingBatcher("m", client_factory=lambda: client)
+
+    async def run():
+        return await asyncio.gather(*[batcher.embed(text) for text in ["a", "bb", "a", "ccc"]])
+
+    vectors = asyncio.run(run())
+
+    assert client.calls == [["a", "bb", "ccc"]]
+    assert [v[0] for v in vectors] == [1.0, 2.0, 1.0, 3.0]
+    assert vectors[0].dtype == np.float32
+
+
+def test_batches_respect_item_and_token_limits():
+    client = FakeEmbeddingsClient()
+    batcher = EmbeddingBatcher("m", max_batch_items=2, max_batch_tokens=10, client_factory=lambda: client)
+
+    asyncio.run(batcher.embed_many(["a", "b", "c", "x" * 40]))
+
+    assert client.calls == [["a", "b"], ["c"], ["x" * 40]]
+    assert batcher.stats()["requests"] == 3
+
+
+def test_batch_failure_propagates_to_every_caller():
+    class FailingClient(FakeEmbeddingsClient):
+        async def create(self, input, model):
+            raise RuntimeError("rate limited")
+
+    batcher = EmbeddingBatcher("m", client_factory=FailingClient)
+
+    async def run():
+        return await asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert batcher.stats()["failed_requests"] == 1
+
+
+def test_malformed_response_fails_every_caller():
+    class MalformedClient(FakeEmbeddingsClient):
+        async def create(self, input, model):
+            return SimpleNamespace(data=[SimpleNamespace(index=len(input), embedding=[1.0])])
+
+    batcher = EmbeddingBatcher("m", client_factory=MalformedClient)
+
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True), timeout=5,
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, IndexError) for r in results)
+    assert batcher.stats()["failed_requests"] == 1
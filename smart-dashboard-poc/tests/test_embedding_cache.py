@@ -0,0 +1,124 @@
+import asyncio
+
+import numpy as np
+import redis
+from unittest.mock import MagicMock
+
+from api.services import embeddings
+from api.services.embedding_backends import HashingBackend
+from api.services.embedding_cache import EmbeddingCache, embedding_key
+from api.services.vector_codec import HEADER
+
+
+def make_dict_redis():
+    """A MagicMock Redis whose get/mget/setex are backed by a real dict."""
+    store = {}
+    mock_redis = MagicMock()
+    mock_redis.get.side_effect = lambda key: store.get(key)
+    mock_redis.mget.side_effect = lambda keys: [store.get(key) for key in keys]
+    mock_redis.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+    return mock_redis, store
+
+
+def test_embedding_key_normalizes_whitespace_and_includes_model():
+    assert embedding_key("m", "python  developer\n") == embedding_key("m", " python developer")
+    assert embedding_key("m", "python") != embedding_key("other-model", "python")
+
+
+def test_memory_tier_hit_after_set():
+    mock_redis, _ = make_dict_redis()
+    cache = EmbeddingCache(redis_factory=lambda: mock_redis)
+
+    assert cache.get("m", "python") is None
+    cache.set("m", "python", np.array([0.1, 0.2, 0.3]))
+    vector = cache.get("m", "python")
+
+    assert vector.dtype == np.float32
+    np.testing.assert_allclose(vector, [0.1, 0.2, 0.3], rtol=1e-6)
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_redis_tier_stores_encoded_vectors():
+    mock_redis, store = make_dict_redis()
+    writer = EmbeddingCache(redis_factory=lambda: mock_redis, ttl_seconds=60, storage_dtype="float16")
+    writer.set("m", "python", np.array([1.0, 2.0], dtype=np.float64))
+
+    raw = store[embedding_key("m", "python")]
+    assert raw[HEADER.size:] == np.array([1.0, 2.0], dtype=np.float16).tobytes()
+    mock_redis.setex.assert_called_once()
+    assert mock_redis.setex.call_args[0][1] == 60
+
+    # A fresh process only has the Redis tier
+    reader = EmbeddingCache(redis_factory=lambda: mock_redis)
+    np.testing.assert_array_equal(reader.get("m", "python"), [1.0, 2.0])
+    assert reader.stats()["redis_hits"] == 1
+
+
+def test_get_many_reads_redis_once_for_every_memory_miss():
+    mock_redis, store = make_dict_redis()
+    EmbeddingCache(redis_factory=lambda: mock_redis).set("m", "sql", np.array([0.0, 1.0]))
+    cache = EmbeddingCache(redis_factory=lambda: mock_redis)
+    cache.set("m", "python", np.array([1.0, 0.0]))
+
+    vectors = cache.get_many("m", ["python", "sql", "go", "sql"])
+
+    np.testing.assert_array_equal(vectors[0], [1.0, 0.0])
+    np.testing.assert_array_equal(vectors[1], [0.0, 1.0])
+    assert vectors[2] is None and vectors[3] is vectors[1]
+    mock_redis.mget.assert_called_once()
+    assert len(mock_redis.mget.call_args[0][0]) == 2
+    assert not mock_redis.get.called
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["redis_hits"], stats["misses"]) == (1, 2, 1)
+
+
+def test_lru_is_bounded():
+    mock_redis, _ = make_dict_redis()
+    mock_redis.get.side_effect = lambda key: None
+    cache = EmbeddingCache(max_entries=2, redis_factory=lambda: mock_redis)
+
+    for text in ["a", "b", "c"]:
+        cache.set("m", text, np.ones(2))
+
+    assert cache.stats()["memory_entries"] == 2
+    assert cache.get("m", "a") is None
+    assert cache.get("m", "c") is not None
+
+
+def test_redis_errors_are_treated_as_misses():
+    mock_redis = MagicMock()
+    mock_redis.get.side_effect = redis.RedisError("down")
+    mock_redis.setex.side_effect = redis.RedisError("down")
+    cache = EmbeddingCache(redis_factory=lambda: mock_redis)
+
+    assert cache.get("m", "python") is None
+    cache.set("m", "python", np.ones(2))
+    assert cache.stats()["redis_errors"] == 2
+
+
+def test_raw_float32_values_are_read_and_foreign_values_are_misses():
+    mock_redis, store = make_dict_redis()
+    # Entries written before vectors had a header are raw float32
+    store[embedding_key("m", "python")] = np.array([1.0, 2.0], dtype=np.float32).tobytes()
+    store[embedding_key("m", "sql")] = b"not a vector"[:-1]
+    cache = EmbeddingCache(redis_factory=lambda: mock_redis)
+
+    np.testing.assert_array_equal(cache.get("m", "python"), [1.0, 2.0])
+    assert cache.get("m", "sql") is None
+    assert (cache.stats()["redis_hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_embed_texts_reads_the_cache_once_and_embeds_each_miss_once(fake_redis, mocker):
+    backend = HashingBackend(dim=8)
+    EmbeddingCache(redis_factory=lambda: fake_redis).set(backend.model, "python", np.ones(8))
+    mocker.patch.object(embeddings, "get_embedding_cache", return_value=EmbeddingCache(redis_factory=lambda: fake_redis))
+    embed = mocker.spy(backend, "embed")
+
+    vectors = asyncio.run(embeddings.embed_texts(["python", "sql", "sql"], backend))
+
+    np.testing.assert_array_equal(vectors[0], np.ones(8))
+    assert vectors[1] is vectors[2]
+    assert embed.call_count == 1
+    assert fake_redis.commands == ["mget"]
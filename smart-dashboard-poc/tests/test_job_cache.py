@@ -0,0 +1,75 @@
+import time
+import asyncio
+
+from api.services.job_cache import LOCK_PREFIX, StaleWhileRevalidateCache, pack_entry
+
+
+def make_cache(fake_redis, **kwargs):
+    return StaleWhileRevalidateCache(redis_factory=lambda: fake_redis, poll_interval=0.01, **kwargs)
+
+
+def test_concurrent_misses_compute_once(fake_redis):
+    # Two caches sharing one Redis stand in for two API processes
+    caches = [make_cache(fake_redis), make_cache(fake_redis)]
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "ranked"
+
+    async def run():
+        return await asyncio.gather(*[caches[i % 2].get_or_compute("k", compute) for i in range(6)])
+
+    assert asyncio.run(run()) == ["ranked"] * 6
+    assert len(calls) == 1
+    assert sum(cache.stats()["coalesced_waiters"] for cache in caches) == 5
+    assert LOCK_PREFIX + "k" not in fake_redis.strings
+
+
+def test_stale_entry_is_served_and_refreshed_once(fake_redis):
+    fake_redis.set("k", pack_entry("old", time.time() - 1))
+    cache = make_cache(fake_redis)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return "new"
+
+    async def run():
+        served = await asyncio.gather(*[cache.get_or_compute("k", compute) for _ in range(3)])
+        await asyncio.sleep(0.05)
+        return served
+
+    assert asyncio.run(run()) == ["old", "old", "old"]
+    assert len(calls) == 1
+    assert cache.read("k")[1] == "new"
+    stats = cache.stats()
+    assert stats["stale_serves"] == 3
+    assert stats["background_refreshes"] == 1
+
+
+def test_empty_result_is_not_cached_and_waiters_stop_waiting(fake_redis):
+    cache = make_cache(fake_redis, wait_timeout=5)
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        return None
+
+    async def run():
+        return await asyncio.gather(cache.get_or_compute("k", compute), cache.get_or_compute("k", compute))
+
+    start = time.monotonic()
+    assert asyncio.run(run()) == [None, None]
+    assert time.monotonic() - start < 1
+    assert "k" not in fake_redis.strings
+
+
+def test_legacy_entries_count_as_misses(fake_redis):
+    fake_redis.set("k", '[{"title": "old format"}]')
+    cache = make_cache(fake_redis)
+
+    async def compute():
+        return "fresh"
+
+    assert asyncio.run(cache.get_or_compute("k", compute)) == "fresh"
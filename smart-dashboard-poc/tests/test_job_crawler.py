@@ -0,0 +1,103 @@
+import time
+import asyncio
+
+from api.models import Candidate
+from api.services.candidate_index import save_candidate
+from workers import job_crawler
+from workers.job_crawler import SourceRateLimiter, cycle_pending, schedule_next_cycle, top_search_combinations
+
+
+def test_top_search_combinations_groups_by_top_three_skills(fake_redis):
+    for candidate_id, skills in (
+        ("1", ["python", "sql", "aws", "docker"]), ("2", ["aws", "python", "sql"]), ("3", ["java"]), ("4", []),
+    ):
+        save_candidate(fake_redis, Candidate(candidate_id=candidate_id, name="Test", email="t@example.com", skills=skills))
+    fake_redis.set("candidate:1:applications", "[]")
+
+    searches = top_search_combinations(fake_redis, limit=5)
+
+    # Candidates 1 and 2 share a search; either one's top three skills stand for it
+    assert sorted(searches[0][0]) == ["aws", "python", "sql"] and searches[0][1] == "Remote"
+    assert searches[1] == (("java",), "Remote")
+    assert len(searches) == 2
+
+
+def test_rate_limiter_spaces_requests(fake_redis, monkeypatch):
+    monkeypatch.setenv("CRAWL_RATE_PER_MINUTE_INDEED", "600")  # one request per 100ms
+    limiter = SourceRateLimiter(fake_redis, "indeed")
+
+    async def run():
+        start = time.monotonic()
+        for _ in range(3):
+            await limiter.wait()
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.19
+
+
+def test_rate_limiter_counts_every_request_of_a_search(fake_redis, monkeypatch):
+    monkeypatch.setenv("CRAWL_RATE_PER_MINUTE_INDEED", "600")
+    limiter = SourceRateLimiter(fake_redis, "indeed")
+
+    async def run():
+        start = time.monotonic()
+        # Two searches of three pages each: the second waits for three slots
+        await limiter.wait(3)
+        await limiter.wait(3)
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.29
+
+
+class FakeRegistry:
+    def __init__(self, job_ids):
+        self.job_ids = job_ids
+
+    def get_job_ids(self):
+        return list(self.job_ids)
+
+
+class FakeQueue:
+    """Keeps jobs by id like RQ, including expiring a finished job's hash."""
+
+    def __init__(self):
+        self.jobs = {}
+        self.scheduled_job_registry = FakeRegistry([])
+        self.started_job_registry = FakeRegistry([])
+
+    def enqueue_in(self, delay, func, job_id):
+        self.jobs[job_id] = func
+        self.scheduled_job_registry.job_ids.append(job_id)
+
+    def get_job_ids(self):
+        return []
+
+    def fetch_job(self, job_id):
+        return self.jobs.get(job_id)
+
+    def run_next(self):
+        job_id = self.scheduled_job_registry.job_ids.pop(0)
+        self.started_job_registry.job_ids.append(job_id)
+        assert self.jobs[job_id] == "workers.job_crawler.run_crawl_cycle"
+        job_crawler.run_crawl_cycle()
+        self.started_job_registry.job_ids.remove(job_id)
+        # After result_ttl the finished job's hash is gone
+        del self.jobs[job_id]
+
+
+def test_next_cycle_stays_scheduled_after_a_cycle_finishes(monkeypatch):
+    queue = FakeQueue()
+    monkeypatch.setattr(job_crawler, "get_crawl_queue", lambda: queue)
+
+    async def crawl():
+        return {"searches": 0, "jobs": 0}
+
+    monkeypatch.setattr(job_crawler, "crawl_popular_searches", crawl)
+    assert not cycle_pending(queue)
+    schedule_next_cycle()
+
+    queue.run_next()
+
+    assert len(queue.scheduled_job_registry.job_ids) == 1
+    assert queue.fetch_job(queue.scheduled_job_registry.job_ids[0]) is not None
+    assert cycle_pending(queue)
@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+
+from api.models import Job
+from api.services.job_index import JobIndex
+
+DIM = 16
+
+
+def make_jobs(n: int, prefix: str = "job"):
+    rng = np.random.default_rng(len(prefix) + n)
+    jobs = [Job(title=f"{prefix} {i}", company="Acme", location="Remote", url=f"https://example.com/{prefix}/{i}") for i in range(n)]
+    return jobs, list(rng.standard_normal((n, DIM)))
+
+
+def test_exact_search_before_training(tmp_path):
+    index = JobIndex.open(str(tmp_path), dim=DIM, model="m")
+    jobs, embeddings = make_jobs(50)
+    index.add(jobs, embeddings)
+
+    results = index.search(embeddings[7], k=3)
+
+    assert results[0][0].url == jobs[7].url
+    assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert len(results) == 3
+
+
+def test_snapshot_and_reload(tmp_path):
+    index = JobIndex.open(str(tmp_path), dim=DIM, model="m")
+    jobs, embeddings = make_jobs(300)
+    index.add(jobs, embeddings)
+    index.train(n_lists=8)
+    index.delete([jobs[0].url])
+    index.save()
+
+    reloaded = JobIndex.open(str(tmp_path), dim=DIM, model="m")
+
+    assert len(reloaded) == 299
+    assert reloaded.trained
+    assert reloaded.search(embeddings[42], k=1, nprobe=8)[0][0].url == jobs[42].url
+    assert all(job.url != jobs[0].url for job, _ in reloaded.search(embeddings[0], k=5, nprobe=8))
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_quantized_storage_snapshot_and_reload(tmp_path, dtype):
+    index = JobIndex.open(str(tmp_path), dim=DIM, model="m", dtype=dtype)
+    jobs, embeddings = make_jobs(300)
+    index.add(jobs[:200], embeddings[:200])
+    index.add(jobs[200:], embeddings[200:])  # grows the memory-mapped file
+    index.train(n_lists=8)
+    index.save()
+
+    reloaded = JobIndex.open(str(tmp_path), dim=DIM, model="m", dtype=dtype)
+    job, score = reloaded.search(embeddings[250], k=1, nprobe=8)[0]
+
+    assert job.url == jobs[250].url
+    assert score == pytest.approx(1.0, abs=2e-2)
+    with pytest.raises(ValueError):
+        JobIndex.open(str(tmp_path), dim=DIM, model="m", dtype="float32")
+
+
+def test_reload_rejects_a_different_model(tmp_path):
+    index = JobIndex.open(str(tmp_path), dim=DIM, model="m")
+    index.add(*make_jobs(2))
+    index.save()
+
+    with pytest.raises(ValueError):
+        JobIndex.open(str(tmp_path), dim=DIM, model="other")
+
+
+def test_incremental_insert_after_training_and_reingest(tmp_path):
+    index = JobIndex.open(str(tmp_path), dim=DIM, model="m")
+    index.add(*make_jobs(200))
+    index.train(n_lists=4)
+
+    new_jobs, new_embeddings = make_jobs(5, prefix="new")
+    index.add(new_jobs, new_embeddings)
+    # Re-ingesting a posting replaces it instead of duplicating it
+    index.add(new_jobs[:1], new_embeddings[:1])
+
+    assert len(index) == 205
+    assert index.search(new_embeddings[3], k=1, nprobe=4)[0][0].url == new_jobs[3].url
+
+
+def test_delete_expired(tmp_path):
+    index = JobIndex.open(str(tmp_path), dim=DIM, model="m")
+    old_jobs, old_embeddings = make_jobs(3, prefix="old")
+    index.add(old_jobs, old_embeddings, now=1000.0)
+    index.add(*make_jobs(2, prefix="fresh"), now=5000.0)
+
+    assert index.delete_expired(max_age_seconds=3600, now=5000.0) == 3
+    assert len(index) == 2
+
+
+def test_deleted_rows_leave_their_lists(tmp_path):
+    index = JobIndex.open(str(tmp_path), dim=DIM, model="m")
+    jobs, embeddings = make_jobs(40)
+    index.add(jobs, embeddings)
+
+    assert index.delete([jobs[3].url, jobs[9].url, "https://example.com/unknown"]) == 2
+
+    assert sum(len(rows) for rows in index._lists) == 38
+    assert {job.url for job, _ in index.search(embeddings[3], k=40)} == {job.url for job in jobs} - {jobs[3].url, jobs[9].url}
+
+
+def test_repeated_urls_in_a_batch_are_added_once(tmp_path):
+    index = JobIndex.open(str(tmp_path), dim=DIM, model="m")
+    jobs, embeddings = make_jobs(3)
+
+    assert index.add(jobs + jobs[:1], embeddings + embeddings[1:2]) == 3
+
+    assert len(index) == 3 and sum(len(rows) for rows in index._lists) == 3
+    # The last occurrence wins
+    assert index.search(embeddings[1], k=3)[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert [job.url for job, _ in index.search(embeddings[1], k=3)].count(jobs[0].url) == 1
+
+
+def test_only_one_process_writes_a_directory(tmp_path):
+    writer = JobIndex.open(str(tmp_path), dim=DIM, model="m")
+    writer.add(*make_jobs(5))
+    writer.save()
+
+    reader = JobIndex.open(str(tmp_path), dim=DIM, model="m")
+
+    assert not writer.read_only and reader.read_only
+    assert len(reader) == 5
+    with pytest.raises(RuntimeError):
+        reader.add(*make_jobs(1, prefix="other"))
+    with pytest.raises(RuntimeError):
+        reader.save()
+    writer.close()
+    assert not JobIndex.open(str(tmp_path), dim=DIM, model="m").read_only
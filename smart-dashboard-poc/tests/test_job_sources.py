@@ -0,0 +1,98 @@
+import time
+import asyncio
+
+import pytest
+
+from api.models import Job
+from api.services.dedup import canonicalize_url, dedupe_jobs, estimated_similarity, minhash_signatures
+from api.services.job_sources import IndeedSource, JobSource, search_job_sources
+from api.services.scraper import ScraperClient
+
+
+class StaticSource(JobSource):
+    name = "static"
+
+    def __init__(self, jobs, delay=0.0, timeout=5.0):
+        super().__init__(timeout)
+        self.jobs = jobs
+        self.delay = delay
+
+    async def search(self, skills, location):
+        await asyncio.sleep(self.delay)
+        return self.jobs
+
+
+def job(title, company, description, url):
+    return Job(title=title, company=company, location="Remote", url=url, description=description)
+
+
+def test_canonicalize_url_drops_tracking_and_normalizes():
+    assert canonicalize_url("HTTP://WWW.Indeed.com//viewjob/?utm_source=x&jk=a001&from=serp#apply") == \
+        "https://indeed.com/viewjob?jk=a001"
+    assert canonicalize_url("https://boards.example.com/jobs/1?b=2&a=1") == \
+        canonicalize_url("https://boards.example.com/jobs/1/?a=1&b=2")
+
+
+def test_minhash_separates_near_and_distinct_postings():
+    base = "Senior Python Developer Acme Corp Build FastAPI services backed by Redis and PostgreSQL on AWS with Docker"
+    near, distinct, empty = base + " and Kubernetes", "Data Engineer Initech Own Airflow pipelines and Spark jobs", ""
+    signatures = minhash_signatures([base, near, distinct, empty])
+
+    assert estimated_similarity(signatures[0], signatures[1]) >= 0.7
+    assert estimated_similarity(signatures[0], signatures[2]) < 0.2
+    # Postings with no text are only deduplicated by URL
+    assert len(dedupe_jobs([job("", "", "", f"https://x.test/{i}") for i in range(2)])) == 2
+
+
+def test_dedupe_keeps_first_of_each_group():
+    jobs = [
+        job("Senior Python Developer", "Acme Corp", "Build FastAPI services backed by Redis and PostgreSQL.",
+            "https://www.indeed.com/rc/clk?jk=a001"),
+        job("Senior Python Developer", "Acme Corp", "Build FastAPI services backed by Redis and PostgreSQL",
+            "https://remote-board.test/jobs/991?ref=feed"),
+        job("Backend Engineer", "Globex", "Design REST APIs in Python and Go.", "https://indeed.com/rc/clk?jk=a002&from=serp"),
+        job("Backend Engineer", "Globex", "Totally different text", "https://www.indeed.com/rc/clk?jk=a002"),
+        job("Data Engineer", "Initech", "Own Airflow pipelines and Spark jobs on AWS.", "https://remote-board.test/jobs/7"),
+    ]
+
+    unique = dedupe_jobs(jobs)
+
+    assert [j.url for j in unique] == [jobs[0].url, jobs[2].url, jobs[4].url]
+
+
+def test_search_job_sources_merges_boards_and_collapses_duplicates(fixture_server):
+    other_board = StaticSource([
+        # Same Acme posting as on the Indeed fixture, listed on another board
+        job("Senior Python Developer", "Acme Corp", "Build FastAPI services backed by Redis and PostgreSQL.",
+            "https://remote-board.test/jobs/1?utm_source=feed"),
+        job("Site Reliability Engineer", "Hooli", "Run Kubernetes clusters and Terraform modules.",
+            "https://remote-board.test/jobs/2"),
+    ])
+    indeed = IndeedSource(base_url=fixture_server.base_url, pages=3, client=ScraperClient())
+
+    jobs = asyncio.run(search_job_sources(["python"], "Remote", [indeed, other_board]))
+
+    titles = [j.title for j in jobs]
+    assert titles.count("Senior Python Developer") == 1
+    assert "Site Reliability Engineer" in titles
+    assert len(jobs) == 7
+    assert jobs[0].url.startswith(fixture_server.base_url)
+
+
+def test_slow_source_times_out_without_blocking_others():
+    fast = StaticSource([job("Backend Engineer", "Globex", "Go and Python APIs", "https://a.test/1")])
+    slow = StaticSource([job("Data Engineer", "Initech", "Spark", "https://b.test/1")], delay=5.0, timeout=0.1)
+
+    start = time.monotonic()
+    jobs = asyncio.run(search_job_sources(["python"], "Remote", [slow, fast]))
+
+    assert [j.title for j in jobs] == ["Backend Engineer"]
+    assert time.monotonic() - start < 1.0
+
+
+def test_sources_must_implement_search():
+    class Incomplete(JobSource):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
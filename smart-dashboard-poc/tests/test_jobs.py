@@ -0,0 +1,136 @@
+import asyncio
+
+import numpy as np
+
+from api.models import Job
+from api.routers import jobs as jobs_router
+from api.services.job_cache import StaleWhileRevalidateCache
+from api.services.job_index import JobIndex
+from api.services.scoring import ScoringEngine
+
+
+def patch_embeddings(mocker, fake_embed):
+    """Embed through `fake_embed(text, backend)`, one text at a time."""
+    async def embed_many(texts, backend):
+        return [await fake_embed(text, backend) for text in texts]
+
+    mocker.patch.object(jobs_router, "_embed", side_effect=fake_embed)
+    mocker.patch.object(jobs_router, "_embed_many", side_effect=embed_many)
+
+
+def make_job(i: int, description: str) -> Job:
+    return Job(title=f"Job {i}", company="Acme", location="Remote", url=f"https://example.com/{i}", description=description)
+
+
+def test_scoring_engine_matches_brute_force():
+    rng = np.random.default_rng(0)
+    embeddings = list(rng.standard_normal((500, 32)))
+    query = rng.standard_normal(32)
+
+    indices, scores = ScoringEngine(embeddings).top_k(query, 5)
+
+    expected = sorted(range(500), key=lambda i: jobs_router.cosine_sim(query, embeddings[i]), reverse=True)[:5]
+    assert list(indices) == expected
+    np.testing.assert_allclose(scores, [jobs_router.cosine_sim(query, embeddings[i]) for i in expected], rtol=1e-4)
+
+
+def test_scoring_engine_handles_k_larger_than_corpus():
+    indices, _ = ScoringEngine([np.array([1.0, 0.0]), np.array([0.0, 1.0])]).top_k(np.array([0.0, 1.0]), 10)
+    assert list(indices) == [1, 0]
+
+
+def test_rank_jobs_returns_top_k_by_similarity(mocker):
+    vectors = {"python": [1.0, 0.0], "a": [1.0, 0.1], "b": [0.0, 1.0], "c": [1.0, 0.5]}
+
+    async def fake_embed(text, backend):
+        return np.array(vectors[text], dtype=np.float32)
+
+    patch_embeddings(mocker, fake_embed)
+    jobs = [make_job(0, "a"), make_job(1, "b"), make_job(2, "c")]
+
+    ranked = asyncio.run(jobs_router.rank_jobs(jobs, ["python"], top_k=2))
+
+    assert [job.description for job in ranked] == ["a", "c"]
+    assert ranked[0].score == 99.5
+
+
+def test_rank_jobs_uses_stored_candidate_embedding(mocker):
+    vectors = {"a": [1.0, 0.1], "b": [0.0, 1.0]}
+    embedded = []
+
+    async def fake_embed(text, backend):
+        embedded.append(text)
+        return np.array(vectors[text], dtype=np.float32)
+
+    patch_embeddings(mocker, fake_embed)
+    jobs = [make_job(0, "a"), make_job(1, "b")]
+
+    ranked = asyncio.run(jobs_router.rank_jobs(
+        jobs, ["python"], top_k=1, candidate_embedding=np.array([0.0, 1.0], dtype=np.float32)
+    ))
+
+    assert [job.description for job in ranked] == ["b"]
+    assert sorted(embedded) == ["a", "b"]
+
+
+def test_scrapes_are_shared_and_rankings_are_per_candidate(fake_redis, mocker, tmp_path):
+    mocker.patch.object(jobs_router, "get_job_cache", return_value=StaleWhileRevalidateCache(redis_factory=lambda: fake_redis))
+    mocker.patch.object(jobs_router, "get_job_index", return_value=JobIndex.open(str(tmp_path), dim=2, model="m"))
+    scrapes = []
+
+    async def fake_search(skills, location):
+        scrapes.append(skills[:3])
+        return [make_job(0, "a"), make_job(1, "b")]
+
+    async def fake_embed(text, backend):
+        return np.array({"a": [1.0, 0.0], "b": [0.0, 1.0]}[text], dtype=np.float32)
+
+    profiles = {"c1": [1.0, 0.1], "c2": [0.1, 1.0]}
+
+    async def fake_candidate_embedding(redis_client, candidate_id, skills, backend):
+        return np.array(profiles[candidate_id], dtype=np.float32)
+
+    mocker.patch.object(jobs_router, "search_job_sources", side_effect=fake_search)
+    patch_embeddings(mocker, fake_embed)
+    candidate_embedding = mocker.patch.object(jobs_router, "get_candidate_embedding", side_effect=fake_candidate_embedding)
+
+    async def run():
+        # Same top 3 skills, different profiles
+        first = await jobs_router.find_ranked_jobs(fake_redis, "c1", ["python", "sql", "aws", "go"])
+        second = await jobs_router.find_ranked_jobs(fake_redis, "c2", ["python", "sql", "aws", "rust"])
+        again = await jobs_router.find_ranked_jobs(fake_redis, "c1", ["python", "sql", "aws", "go"])
+        return first, second, again
+
+    first, second, again = asyncio.run(run())
+
+    assert len(scrapes) == 1
+    assert [job.description for job in first] == ["a", "b"]
+    assert [job.description for job in second] == ["b", "a"]
+    assert [job.description for job in again] == ["a", "b"]
+    # The repeat request was served from c1's cached ranking
+    assert candidate_embedding.call_count == 2
+
+
+def test_rank_jobs_prefilters_large_sets_lexically(mocker):
+    mocker.patch.object(jobs_router, "PREFILTER_TOP_M", 2)
+    embedded = []
+
+    async def fake_embed(text, backend):
+        embedded.append(text)
+        return np.array([1.0, 0.0], dtype=np.float32)
+
+    patch_embeddings(mocker, fake_embed)
+    jobs = [
+        make_job(0, "java spring"),
+        make_job(1, "python django python"),
+        make_job(2, "frontend react"),
+        make_job(3, "python"),
+    ]
+
+    ranked = asyncio.run(jobs_router.rank_jobs(
+        jobs, ["python"], top_k=2, candidate_embedding=np.array([1.0, 0.0], dtype=np.float32)
+    ))
+
+    assert sorted(embedded) == ["python", "python django python"]
+    # Equal cosine scores leave the BM25 score to break the tie
+    assert [job.description for job in ranked] == ["python django python", "python"]
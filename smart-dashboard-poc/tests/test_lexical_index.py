@@ -0,0 +1,68 @@
+import numpy as np
+
+from api.models import Job
+from api.services.lexical_index import BM25Index, lexical_prefilter, tokenize
+from api.services.scoring import hybrid_scores
+
+
+def make_job(i, title, description=""):
+    return Job(title=title, company="Acme", location="Remote", url=f"https://example.com/{i}", description=description)
+
+
+def test_tokenize_keeps_skill_tokens_and_drops_stop_words():
+    assert tokenize("The C++ and Node.js role, with C#.") == ["c++", "node.js", "role", "c#"]
+
+
+def test_bm25_ranks_rarer_and_denser_matches_first():
+    index = BM25Index()
+    index.add_many([
+        ("a", "python django python"),
+        ("b", "python django"),
+        ("c", "java django"),
+        ("d", "kubernetes"),
+    ])
+
+    results = index.search("python django", 10)
+
+    assert [key for key, _ in results] == ["a", "b", "c"]
+    assert results[0][1] > results[1][1] > results[2][1] > 0
+
+
+def test_bm25_remove_replace_and_compact():
+    index = BM25Index()
+    index.add_many((str(i), "python") for i in range(8))
+    full = index.nbytes
+
+    assert index.remove("0")
+    assert not index.remove("0")
+    assert "0" not in index and len(index) == 7
+    # Tombstoned: still in the postings, but never returned
+    assert index.nbytes == full
+    assert {key for key, _ in index.search("python", 10)} == {str(i) for i in range(1, 8)}
+
+    # Re-adding a key replaces its document
+    index.add("1", "java")
+    assert "1" not in {key for key, _ in index.search("python", 10)}
+    assert [key for key, _ in index.search("java", 10)] == ["1"]
+
+    # A third removal passes a quarter of the documents and compacts
+    index.remove("2")
+    postings = index.nbytes - len(index._doc_lengths) * 5
+    assert postings == 5 * 6
+    assert {key for key, _ in index.search("python", 10)} == {"3", "4", "5", "6", "7"}
+
+
+def test_lexical_prefilter_selects_best_matches():
+    jobs = [make_job(0, "Java Engineer"), make_job(1, "Python Engineer", "python, sql"), make_job(2, "Designer")]
+
+    positions, scores = lexical_prefilter(jobs, "python sql", top_m=2)
+
+    assert positions[0] == 1
+    assert len(positions) == 2
+    assert scores[0] > 0
+
+
+def test_hybrid_scores_normalizes_lexical_scores():
+    blended = hybrid_scores(np.array([0.5, 0.5]), np.array([4.0, 2.0]), alpha=0.5)
+    assert np.allclose(blended, [0.75, 0.5])
+    assert np.allclose(hybrid_scores(np.array([0.2]), np.array([0.0]), alpha=0.5), [0.1])
@@ -0,0 +1,145 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import httpx
+import openai
+import pytest
+import redis
+
+from api.services import llm_parser
+from api.services.llm_parser import (
+    LLMResumeParser, RedisTokenBucket, TokenBucket, condense_resume_text, parse_file_sync,
+)
+from benchmarks.stub_openai import StubOpenAIServer
+
+
+def api_error(error_class, status, headers=None):
+    response = httpx.Response(status, headers=headers, request=httpx.Request("POST", "http://stub/v1/chat/completions"))
+    return error_class(f"stub {status}", response=response, body=None)
+
+
+class FlakyChatClient:
+    """Mimics `AsyncOpenAI().chat.completions.create`, raising the queued errors first."""
+
+    def __init__(self, errors=(), content='{"name": "Jane Doe", "skills": ["python"]}'):
+        self.errors = list(errors)
+        self.content = content
+        self.calls = []
+        self.chat = SimpleNamespace(completions=self)
+
+    async def create(self, **request):
+        self.calls.append(request)
+        if self.errors:
+            raise self.errors.pop(0)
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    async def close(self):
+        pass
+
+
+def test_condense_drops_repeated_headers_and_cuts_at_a_line():
+    text = "Jane Doe\n  jane@example.com \n\nPage header\nPython,   SQL\nPage header\n" + "\n".join(
+        f"{year}: engineer" for year in range(2000, 2020)
+    )
+
+    condensed = condense_resume_text(text, max_tokens=1000)
+    assert condensed.splitlines()[:4] == ["Jane Doe", "jane@example.com", "Page header", "Python, SQL"]
+    assert condensed.count("Page header") == 1
+
+    short = condense_resume_text(text, max_tokens=13)
+    assert short == "Jane Doe\njane@example.com\nPage header\nPython, SQL"
+
+
+def test_token_bucket_waits_for_requests_and_tokens():
+    bucket = TokenBucket(requests_per_minute=60, tokens_per_minute=0, burst_seconds=2)
+    assert bucket._take(10) == 0 and bucket._take(10) == 0
+    assert bucket._take(10) == pytest.approx(1.0, abs=0.05)
+
+    # A request bigger than the bucket goes through once it is full, and is paid off afterwards
+    bucket = TokenBucket(requests_per_minute=0, tokens_per_minute=600, burst_seconds=1)
+    assert bucket._take(25) == 0
+    assert bucket._take(1) == pytest.approx(1.6, abs=0.05)
+
+
+def test_redis_token_bucket_shares_state_and_falls_back_to_the_process():
+    redis_conn = MagicMock()
+    script = redis_conn.register_script.return_value
+    script.return_value = b"0.25"
+    bucket = RedisTokenBucket(redis_conn, "gpt", requests_per_minute=60, tokens_per_minute=600, burst_seconds=1)
+
+    assert bucket._take(5) == 0.25
+    script.assert_called_once_with(keys=["llm_rate:gpt"], args=[1.0, 1.0, 1, 10.0, 10.0, 5, 61])
+
+    script.side_effect = redis.ConnectionError("down")
+    assert bucket._take(5) == 0
+    assert bucket._take(5) > 0
+
+
+def test_retries_rate_limits_and_server_errors_then_gives_up_on_client_errors(monkeypatch):
+    monkeypatch.setattr(llm_parser.random, "uniform", lambda low, high: 0)
+    client = FlakyChatClient([
+        api_error(openai.RateLimitError, 429, {"retry-after": "0.01"}),
+        api_error(openai.InternalServerError, 503),
+    ])
+    parser = LLMResumeParser(rate_limiter=TokenBucket(0, 0), client_factory=lambda: client)
+
+    parsed = asyncio.run(parser.parse_text("Jane Doe\njane@example.com"))
+
+    assert parsed["name"] == "Jane Doe" and parsed["education"] == []
+    assert len(client.calls) == 3
+    assert client.calls[0]["messages"][1]["content"] == "Jane Doe\njane@example.com"
+    assert parser.stats()["retries"] == 2
+
+    client = FlakyChatClient([api_error(openai.BadRequestError, 400)])
+    parser = LLMResumeParser(rate_limiter=TokenBucket(0, 0), client_factory=lambda: client)
+    with pytest.raises(openai.BadRequestError):
+        asyncio.run(parser.parse_text("Jane Doe"))
+    assert len(client.calls) == 1
+
+
+def test_unparseable_answers_raise():
+    client = FlakyChatClient(content="Sorry, I cannot help with that.")
+    parser = LLMResumeParser(rate_limiter=TokenBucket(0, 0), client_factory=lambda: client)
+
+    with pytest.raises(ValueError, match="Failed to parse GPT-4 response"):
+        asyncio.run(parser.parse_text("Jane Doe"))
+
+
+def test_rebinding_to_a_new_loop_closes_the_previous_client():
+    class ClosingClient(FlakyChatClient):
+        closed = 0
+
+        async def close(self):
+            self.closed += 1
+
+    clients = []
+    parser = LLMResumeParser(rate_limiter=TokenBucket(0, 0), client_factory=lambda: clients.append(ClosingClient()) or clients[-1])
+
+    asyncio.run(parser.parse_text("Jane Doe"))
+    asyncio.run(parser.parse_text("Jane Doe"))
+    asyncio.run(parser.aclose())
+
+    assert len(clients) == 2
+    assert [client.closed for client in clients] == [1, 1]
+
+
+def test_sync_parsing_runs_against_an_openai_compatible_server(tmp_path, monkeypatch):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(b"%PDF-1.4")
+    monkeypatch.setattr(llm_parser, "extract_text", lambda file_path: "Jane Doe\n\n  jane@example.com")
+    monkeypatch.setattr(llm_parser, "_sync_loop", None)
+    monkeypatch.setattr(llm_parser, "_sync_parser", None)
+
+    with StubOpenAIServer() as stub:
+        monkeypatch.setattr(llm_parser, "create_llm_parser", lambda: LLMResumeParser(
+            rate_limiter=TokenBucket(0, 0),
+            client_factory=lambda: openai.AsyncOpenAI(base_url=stub.base_url, api_key="stub", max_retries=0),
+        ))
+        first = parse_file_sync(str(path))
+        second = parse_file_sync(str(path))
+
+    assert first == second
+    assert first["name"] == "Jane Doe" and first["mobile_number"] == ""
+    assert stub.chat_requests == 2
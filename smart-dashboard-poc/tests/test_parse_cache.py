@@ -0,0 +1,86 @@
+import hashlib
+from unittest.mock import MagicMock
+
+from fastapi.testclient import TestClient
+
+from api.deps import get_redis
+from api.main import app
+from api.models import IngestionStatus
+from api.routers.resume import get_queue
+from api.services import parse_cache
+from api.services.parse_cache import LRU_KEY, cache_parse, get_cached_parse, parse_cache_key, parse_cache_stats
+from api.services.resume_ingestion import process_ingestion
+
+client = TestClient(app)
+
+PARSED = {"name": "Test User", "email": "test@example.com", "skills": ["pytest"]}
+SHA = "ab" * 32
+
+
+def test_hits_count_the_parse_time_they_saved(fake_redis):
+    assert get_cached_parse(fake_redis, SHA, "gpt-4") is None
+    cache_parse(fake_redis, SHA, "gpt-4", PARSED, parse_seconds=4.5)
+
+    assert get_cached_parse(fake_redis, SHA, "gpt-4") == PARSED
+    assert get_cached_parse(fake_redis, SHA, "gpt-4") == PARSED
+    # Another parser's result for the same file is a separate entry
+    assert get_cached_parse(fake_redis, SHA, "docai") is None
+
+    stats = parse_cache_stats(fake_redis)
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (2, 2, 0.5)
+    assert stats["parser_seconds_saved"] == 9.0
+    assert stats["entries"] == 1
+
+
+def test_failed_parses_are_not_cached(fake_redis):
+    cache_parse(fake_redis, SHA, "gpt-4", {"error": "Failed to parse GPT-4 response"}, parse_seconds=3.0)
+
+    assert get_cached_parse(fake_redis, SHA, "gpt-4") is None
+    assert parse_cache_stats(fake_redis)["entries"] == 0
+
+
+def test_new_parser_version_misses(fake_redis, monkeypatch):
+    cache_parse(fake_redis, SHA, "pyresparser", PARSED, parse_seconds=1.0)
+    monkeypatch.setattr(parse_cache, "PYRESPARSER_VERSION", "99.0")
+
+    assert get_cached_parse(fake_redis, SHA, "pyresparser") is None
+
+
+def test_least_recently_used_entries_are_evicted(fake_redis):
+    shas = ["a" * 64, "b" * 64, "c" * 64]
+    cache_parse(fake_redis, shas[0], "docai", PARSED, 1.0, max_entries=2)
+    cache_parse(fake_redis, shas[1], "docai", PARSED, 1.0, max_entries=2)
+    get_cached_parse(fake_redis, shas[0], "docai")
+    cache_parse(fake_redis, shas[2], "docai", PARSED, 1.0, max_entries=2)
+
+    assert get_cached_parse(fake_redis, shas[1], "docai") is None
+    assert get_cached_parse(fake_redis, shas[0], "docai") == PARSED
+    assert fake_redis.zcard(LRU_KEY) == 2
+    assert parse_cache_key(shas[1], "docai") not in fake_redis.strings
+    assert parse_cache_stats(fake_redis)["evictions"] == 1
+
+
+def test_reupload_is_ingested_from_the_cache(fake_redis, tmp_path, monkeypatch, mocker):
+    monkeypatch.chdir(tmp_path)
+    queue = MagicMock()
+    parser = mocker.patch("api.services.resume_ingestion.parse_with_docai", return_value=PARSED)
+    mocker.patch("api.services.resume_ingestion.embed_candidate")
+    fake_redis.set("settings:parser_preference", "docai")
+    app.dependency_overrides[get_redis] = lambda: fake_redis
+    app.dependency_overrides[get_queue] = lambda: queue
+    content = b"%PDF-1.4 resume"
+
+    first = client.post("/resume/upload", files={"file": ("resume.pdf", content, "application/pdf")}).json()
+    process_ingestion(fake_redis, first["job_id"])
+    second = client.post("/resume/upload", files={"file": ("resume-copy.pdf", content, "application/pdf")})
+    metrics = client.get("/metrics/parse-cache").json()
+    app.dependency_overrides = {}
+
+    assert first["status"] == IngestionStatus.QUEUED
+    assert first["content_sha256"] == hashlib.sha256(content).hexdigest()
+    assert second.status_code == 202
+    assert second.json()["status"] == IngestionStatus.COMPLETED
+    assert second.json()["candidate_id"] not in (None, first["job_id"])
+    assert queue.enqueue.call_count == 1
+    assert parser.call_count == 1
+    assert (metrics["hits"], metrics["misses"]) == (1, 1)
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from api.services.parse_cache import cache_parse
+from api.services.parser_cascade import cascade_stats, merge_parses, parse_confidence, run_cascade
+from api.services.resume_ingestion import ingest_cached, parse_with_cache
+
+COMPLETE = {
+    "name": "Jane Doe", "email": "jane@example.com", "mobile_number": "+1 555 010 0100",
+    "skills": ["python", "sql", "docker", "aws", "react"],
+}
+SPARSE = {"name": "Resume", "email": None, "mobile_number": None, "skills": ["python"]}
+ESCALATED = {"name": "Jane Doe", "email": "jane@example.com", "mobile_number": "", "skills": ["python", "sql"]}
+SHA = "cd" * 32
+
+
+def tiers(results, cached=()):
+    calls = []
+
+    async def parse_tier(parser):
+        calls.append(parser)
+        result = results[parser]
+        if isinstance(result, Exception):
+            raise result
+        return result, parser in cached
+
+    return parse_tier, calls
+
+
+def test_confidence_scores_field_coverage():
+    assert parse_confidence(COMPLETE) == 1.0
+    assert parse_confidence({}) == 0.0
+    assert parse_confidence(SPARSE) == 0.06
+    assert parse_confidence({**COMPLETE, "email": "not an email", "mobile_number": "123"}) == 0.6
+
+
+def test_confident_local_parses_are_not_escalated(fake_redis):
+    parse_tier, calls = tiers({"pyresparser": COMPLETE})
+
+    assert asyncio.run(run_cascade(fake_redis, parse_tier, "gpt-4", 0.75)) == COMPLETE
+    assert calls == ["pyresparser"]
+    stats = cascade_stats(fake_redis)
+    assert stats["outcomes"]["local"]["count"] == 1 and stats["escalation_rate"] == 0.0
+    assert stats["confidence_histogram"]["0.9"] == 1
+
+
+def test_unsure_parses_escalate_and_keep_local_fields_the_escalation_missed(fake_redis):
+    local = {**SPARSE, "mobile_number": "555-010-0100"}
+    parse_tier, calls = tiers({"pyresparser": local, "gpt-4": ESCALATED})
+
+    parsed = asyncio.run(run_cascade(fake_redis, parse_tier, "gpt-4", 0.75))
+
+    assert calls == ["pyresparser", "gpt-4"]
+    assert parsed == {**ESCALATED, "mobile_number": "555-010-0100"}
+    stats = cascade_stats(fake_redis)
+    assert stats["outcomes"]["escalated"]["count"] == 1 and stats["escalation_rate"] == 1.0
+    assert set(stats["parsers"]) == {"pyresparser", "gpt-4"}
+
+
+def test_failed_escalation_keeps_the_local_parse(fake_redis):
+    parse_tier, _ = tiers({"pyresparser": SPARSE, "docai": RuntimeError("quota exceeded")})
+
+    assert asyncio.run(run_cascade(fake_redis, parse_tier, "docai", 0.75)) == SPARSE
+    assert cascade_stats(fake_redis)["outcomes"]["escalation_failed"]["count"] == 1
+
+
+def test_merge_prefers_non_empty_primary_values():
+    assert merge_parses({"name": "A", "skills": [], "error": None}, {"name": "B", "skills": ["x"]}) == {"name": "A", "skills": ["x"]}
+
+
+def test_cascade_caches_each_parser_it_runs(fake_redis, mocker, monkeypatch):
+    monkeypatch.setattr("api.services.parser_cascade.CASCADE_ESCALATION_PARSER", "gpt-4")
+    local = mocker.patch("api.services.resume_ingestion.parse_with_pyresparser", return_value=SPARSE)
+    paid = mocker.patch("api.services.resume_ingestion.parse_with_gpt4", return_value=ESCALATED)
+
+    first = parse_with_cache(fake_redis, "resume.pdf", "cascade", SHA)
+    again = parse_with_cache(fake_redis, "resume.pdf", "cascade", SHA)
+
+    assert first == again == merge_parses(ESCALATED, SPARSE)
+    assert local.call_count == paid.call_count == 1
+    # The second parse came from the cache, so only the first is counted
+    stats = cascade_stats(fake_redis)
+    assert stats["resumes"] == 1
+    assert stats["parsers"]["pyresparser"]["count"] == stats["parsers"]["gpt-4"]["count"] == 1
+
+
+def test_only_parsers_that_ran_are_counted(fake_redis):
+    parse_tier, _ = tiers({"pyresparser": SPARSE, "gpt-4": ESCALATED}, cached=("pyresparser",))
+
+    asyncio.run(run_cascade(fake_redis, parse_tier, "gpt-4", 0.75))
+
+    stats = cascade_stats(fake_redis)
+    assert stats["resumes"] == 1
+    assert set(stats["parsers"]) == {"gpt-4"}
+
+
+@pytest.mark.parametrize("cached_parsers, completes", [(["pyresparser"], False), (["pyresparser", "gpt-4"], True)])
+def test_upload_completes_from_cache_only_when_every_needed_tier_is_cached(fake_redis, cached_parsers, completes, monkeypatch, mocker):
+    monkeypatch.setattr("api.services.parser_cascade.CASCADE_ESCALATION_PARSER", "gpt-4")
+    mocker.patch("api.services.resume_ingestion.embed_candidate")
+    results = {"pyresparser": SPARSE, "gpt-4": ESCALATED}
+    for parser in cached_parsers:
+        cache_parse(fake_redis, SHA, parser, results[parser], 1.0)
+
+    job = asyncio.run(ingest_cached(fake_redis, "resume.pdf", "cascade", SHA))
+
+    assert (job is not None) == completes
+    assert cascade_stats(fake_redis)["resumes"] == 0
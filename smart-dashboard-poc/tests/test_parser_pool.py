@@ -0,0 +1,43 @@
+import os
+
+import spacy
+from pyresparser import resume_parser
+
+from api.services.parser_pool import PYRESPARSER_MODELS, PreloadedSpacy, create_parser_pool, warm_up_parsers
+
+
+def test_warm_up_loads_each_pyresparser_model_once(mocker, monkeypatch):
+    monkeypatch.setattr(resume_parser, "spacy", spacy)
+    load = mocker.patch("spacy.load", side_effect=lambda name, **kwargs: f"pipeline:{name}")
+
+    warm_up_parsers()
+    warm_up_parsers()
+    # What ResumeParser.__init__ does for every resume
+    pipelines = [resume_parser.spacy.load(model) for model in PYRESPARSER_MODELS for _ in range(3)]
+
+    assert isinstance(resume_parser.spacy, PreloadedSpacy)
+    assert load.call_count == len(PYRESPARSER_MODELS)
+    assert set(pipelines) == {f"pipeline:{model}" for model in PYRESPARSER_MODELS}
+    # Everything but load() is spaCy's own
+    assert resume_parser.spacy.blank is spacy.blank
+
+
+def test_warm_up_tolerates_missing_models(mocker, monkeypatch):
+    monkeypatch.setattr(resume_parser, "spacy", spacy)
+    mocker.patch("spacy.load", side_effect=OSError("[E050] Can't find model"))
+
+    warm_up_parsers()
+
+    assert isinstance(resume_parser.spacy, PreloadedSpacy)
+
+
+def test_pool_workers_are_replaced_after_max_jobs():
+    pool = create_parser_pool(max_workers=1, max_jobs_per_worker=2, initializer=None)
+    try:
+        pids = [pool.submit(os.getpid).result() for _ in range(4)]
+    finally:
+        pool.shutdown()
+
+    assert pids[0] == pids[1]
+    assert pids[2] == pids[3]
+    assert pids[1] != pids[2]
@@ -8,106 +8,97 @@ import shutil
 # Import the main FastAPI app and dependency
 from api.main import app
 from api.deps import get_redis
+from api.models import Candidate, IngestionStatus
+from api.routers.resume import get_queue
+from api.services.resume_ingestion import load_ingestion, process_ingestion, submit_ingestion
 
 client = TestClient(app)
 
-@pytest.mark.parametrize("parser_preference, expected_parser_path", [
-    ("pyresparser", "api.routers.resume.ResumeParser"),
-    ("docai", "api.services.docai_parser.parse_with_docai"),
-    ("gpt-4", "api.services.gpt4_parser.parse_with_gpt4"),
-])
-def test_upload_resume_dynamic_parser(
-    parser_preference,
-    expected_parser_path,
-    mocker,
-    mock_redis_conn
-):
-    app.dependency_overrides[get_redis] = lambda: mock_redis_conn
-    mock_redis_conn.get.return_value = parser_preference.encode('utf-8')
-    mock_parser = mocker.patch(expected_parser_path)
-    mock_parser.return_value = {"name": "Test User", "email": "test@example.com", "skills": ["pytest"]}
-    dummy_file_content = b"dummy resume content"
-    files = {"file": ("test_resume.pdf", dummy_file_content, "application/pdf")}
-    response = client.post("/resume/upload", files=files)
-    assert response.status_code == 201
-    mock_parser.assert_called_once()
-    mock_redis_conn.set.assert_called_once()
-    call_args = mock_redis_conn.set.call_args[0]
-    assert call_args[0].startswith("candidate:")
-    assert '"name": "Test User"' in call_args[1]
-    app.dependency_overrides = {}
+PARSED = {"name": "Test User", "email": "test@example.com", "skills": ["pytest"]}
+
+
+def mock_parsers(mocker, side_effect=None):
+    """Patch all three parsers."""
+    return {
+        "pyresparser": mocker.patch("api.services.resume_ingestion.parse_with_pyresparser", return_value=PARSED, side_effect=side_effect),
+        "docai": mocker.patch("api.services.resume_ingestion.parse_with_docai", return_value=PARSED, side_effect=side_effect),
+        "gpt-4": mocker.patch("api.services.resume_ingestion.parse_with_gpt4", return_value=PARSED, side_effect=side_effect),
+    }
+
+
+def queued_ingestion(fake_redis, parser):
+    queue = MagicMock()
+    return submit_ingestion(fake_redis, queue, "uploads/test_resume.pdf", parser, content_sha256="ab" * 32), queue
 
-def test_upload_resume_default_parser(mocker, mock_redis_conn):
-    """Test that pyresparser is used as default when no preference is set."""
+
+@pytest.mark.parametrize("parser_preference", ["pyresparser", "docai", "gpt-4"])
+def test_ingestion_uses_the_parser_chosen_at_upload(fake_redis, parser_preference, mocker):
+    parsers = mock_parsers(mocker)
+    mocker.patch("api.services.resume_ingestion.embed_text", side_effect=RuntimeError("offline"))
+    job, _ = queued_ingestion(fake_redis, parser_preference)
+
+    result = process_ingestion(fake_redis, job.job_id)
+
+    assert result.status == IngestionStatus.COMPLETED
+    for name, parser in parsers.items():
+        assert parser.call_count == (1 if name == parser_preference else 0)
+    stored = Candidate.parse_raw(fake_redis.get(f"candidate:{result.candidate_id}"))
+    assert stored.name == "Test User"
+    assert stored.resume_file_path == "uploads/test_resume.pdf"
+    assert load_ingestion(fake_redis, job.job_id).candidate_id == stored.candidate_id
+
+def test_upload_returns_202_and_queues_parsing(mocker, mock_redis_conn, tmp_path, monkeypatch):
+    """Uploads only store the file and queue the parse, with pyresparser by default."""
     # --- Arrange ---
+    monkeypatch.chdir(tmp_path)
+    queue = MagicMock()
     app.dependency_overrides[get_redis] = lambda: mock_redis_conn
+    app.dependency_overrides[get_queue] = lambda: queue
     
     # Mock Redis to return None (no preference set)
     mock_redis_conn.get.return_value = None
-    
-    # Mock pyresparser
-    mock_parser = mocker.patch("api.routers.resume.ResumeParser")
-    mock_parser_instance = MagicMock()
-    mock_parser_instance.get_extracted_data.return_value = {
-        "name": "Default User",
-        "email": "default@example.com",
-        "skills": ["default"],
-        "mobile_number": "123-456-7890",
-        "experience": [],
-        "education": []
-    }
-    mock_parser.return_value = mock_parser_instance
+    parsers = mock_parsers(mocker)
+    files = {"file": ("test_resume.pdf", b"%PDF-1.4 dummy content", "application/pdf")}
 
-    # Mock file operations
-    with patch('builtins.open', create=True) as mock_open:
-        mock_file = MagicMock()
-        mock_file.read.return_value = b"dummy resume content"
-        mock_open.return_value.__enter__.return_value = mock_file
-        
-        with patch('os.makedirs'):
-            with patch('os.rename'):
-                files = {"file": ("test_resume.pdf", b"dummy content", "application/pdf")}
-                
-                # --- Act ---
-                response = client.post("/resume/upload", files=files)
+    # --- Act ---
+    response = client.post("/resume/upload", files=files)
 
     # --- Assert ---
-    assert response.status_code == 201
-    mock_parser.assert_called_once()
-    
-    response_data = response.json()
-    assert response_data["name"] == "Default User"
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "Queued"
+    assert job["parser"] == "pyresparser"
+    assert job["file_path"].startswith("uploads/") and job["file_path"].endswith("_test_resume.pdf")
+    with open(tmp_path / job["file_path"], "rb") as stored:
+        assert stored.read() == b"%PDF-1.4 dummy content"
+    queue.enqueue.assert_called_once()
+    assert queue.enqueue.call_args.args == ("workers.resume_ingest.ingest_resume", job["job_id"])
+    assert not any(parser.called for parser in parsers.values())
     
     app.dependency_overrides = {}
 
-def test_upload_resume_parser_error(mocker, mock_redis_conn):
+def test_ingestion_parser_error_marks_job_failed(fake_redis, mocker):
     """Test error handling when parser fails."""
-    # --- Arrange ---
-    app.dependency_overrides[get_redis] = lambda: mock_redis_conn
-    mock_redis_conn.get.return_value = "pyresparser".encode('utf-8')
-    
-    # Mock parser to raise an exception
-    mock_parser = mocker.patch("api.routers.resume.ResumeParser")
-    mock_parser_instance = MagicMock()
-    mock_parser_instance.get_extracted_data.side_effect = Exception("Parser failed")
-    mock_parser.return_value = mock_parser_instance
-
-    # Mock file operations
-    with patch('builtins.open', create=True) as mock_open:
-        mock_file = MagicMock()
-        mock_file.read.return_value = b"dummy resume content"
-        mock_open.return_value.__enter__.return_value = mock_file
-        
-        with patch('os.makedirs'):
-            with patch('os.rename'):
-                files = {"file": ("test_resume.pdf", b"dummy content", "application/pdf")}
-                
-                # --- Act ---
-                response = client.post("/resume/upload", files=files)
+    mock_parsers(mocker, side_effect=Exception("Parser failed"))
+    job, _ = queued_ingestion(fake_redis, "pyresparser")
 
-    # --- Assert ---
-    assert response.status_code == 500
-    assert "Error parsing resume" in response.json()["detail"]
+    process_ingestion(fake_redis, job.job_id)
+
+    failed = load_ingestion(fake_redis, job.job_id)
+    assert failed.status == IngestionStatus.FAILED
+    assert "Error parsing resume" in failed.error
+    assert failed.candidate_id is None
+
+def test_get_ingestion_status(fake_redis, mock_redis_conn):
+    job, _ = queued_ingestion(fake_redis, "docai")
+    app.dependency_overrides[get_redis] = lambda: fake_redis
+
+    response = client.get(f"/resume/ingestions/{job.job_id}")
+    missing = client.get("/resume/ingestions/nonexistent")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "Queued"
+    assert missing.status_code == 404
     
     app.dependency_overrides = {}
 
@@ -115,10 +106,11 @@ def test_upload_resume_file_error(mocker, mock_redis_conn):
     """Test error handling when file operations fail."""
     # --- Arrange ---
     app.dependency_overrides[get_redis] = lambda: mock_redis_conn
+    app.dependency_overrides[get_queue] = lambda: MagicMock()
     
     # Mock file operations to raise an exception
     with patch('builtins.open', create=True, side_effect=Exception("File error")):
-        files = {"file": ("test_resume.pdf", b"dummy content", "application/pdf")}
+        files = {"file": ("test_resume.pdf", b"%PDF-1.4 dummy content", "application/pdf")}
         
         # --- Act ---
         response = client.post("/resume/upload", files=files)
@@ -134,9 +126,9 @@ def test_list_candidates(mock_redis_conn):
     # --- Arrange ---
     app.dependency_overrides[get_redis] = lambda: mock_redis_conn
     
-    # Mock Redis to return candidate data
-    mock_redis_conn.keys.return_value = [b"candidate:123", b"candidate:456"]
-    mock_redis_conn.get.side_effect = [
+    # Mock the created-time index and the batched record fetch
+    mock_redis_conn.zrevrange.return_value = [(b"123", 2000.0), (b"456", 1000.0)]
+    mock_redis_conn.mget.return_value = [
         b'{"candidate_id": "123", "name": "User 1", "email": "user1@test.com", "skills": ["python"]}',
         b'{"candidate_id": "456", "name": "User 2", "email": "user2@test.com", "skills": ["java"]}'
     ]
@@ -150,6 +142,8 @@ def test_list_candidates(mock_redis_conn):
     assert len(candidates) == 2
     assert candidates[0]["name"] == "User 1"
     assert candidates[1]["name"] == "User 2"
+    mock_redis_conn.keys.assert_not_called()
+    assert "X-Next-Cursor" not in response.headers
     
     app.dependency_overrides = {}
 
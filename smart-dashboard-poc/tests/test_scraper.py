@@ -0,0 +1,75 @@
+import os
+import asyncio
+
+import pytest
+
+from api.services.extraction import extract_cards
+from api.services.scraper import ScraperClient, parse_indeed_page, scrape_indeed_jobs
+from benchmarks.fixture_server import FIXTURES_DIR
+
+
+def test_scrapes_pages_concurrently_and_dedupes(fixture_server):
+    jobs = asyncio.run(scrape_indeed_jobs(
+        ["python", "fastapi"], pages=3, base_url=fixture_server.base_url, client=ScraperClient()
+    ))
+
+    # 3 + 3 + 1 cards, one duplicate across pages, one malformed card skipped
+    assert [job.title for job in jobs] == [
+        "Senior Python Developer", "Backend Engineer", "Data Engineer",
+        "Machine Learning Engineer", "Platform Engineer", "Full Stack Developer",
+    ]
+    assert jobs[0].url == f"{fixture_server.base_url}/rc/clk?jk=a001"
+    assert jobs[0].company == "Acme Corp"
+    assert sorted(path.split("start=")[1] for path in fixture_server.requests) == ["0", "10", "20"]
+
+
+def test_missing_pages_are_skipped(fixture_server):
+    jobs = asyncio.run(scrape_indeed_jobs(
+        ["python"], pages=5, base_url=fixture_server.base_url, client=ScraperClient()
+    ))
+
+    assert len(jobs) == 6
+    assert len(fixture_server.requests) == 5
+
+
+def test_per_host_limit_caps_concurrent_requests(fixture_server):
+    fixture_server.delay = 0.1
+    client = ScraperClient(per_host_limit=2)
+
+    async def run():
+        await asyncio.gather(*[
+            scrape_indeed_jobs(["python"], pages=3, base_url=fixture_server.base_url, client=client)
+            for _ in range(3)
+        ])
+        await client.aclose()
+
+    asyncio.run(run())
+
+    assert len(fixture_server.requests) == 9
+    assert fixture_server.max_in_flight == 2
+
+
+def test_unreachable_host_returns_no_jobs():
+    jobs = asyncio.run(scrape_indeed_jobs(
+        ["python"], pages=1, base_url="http://127.0.0.1:9", client=ScraperClient(timeout=1.0)
+    ))
+    assert jobs == []
+
+
+@pytest.mark.parametrize("page", ["page_0.html", "page_10.html", "page_20.html"])
+def test_lxml_and_streaming_extraction_match_beautifulsoup(page):
+    with open(os.path.join(FIXTURES_DIR, "indeed", page)) as f:
+        html = f.read()
+
+    expected = extract_cards(html, backend="bs4")
+
+    assert extract_cards(html, backend="lxml") == expected
+    assert extract_cards(html, backend="stream") == expected
+    assert extract_cards(html, backend="stream", limit=1) == expected[:1]
+
+
+def test_parse_indeed_page_stops_after_limit():
+    with open(os.path.join(FIXTURES_DIR, "indeed", "page_0.html")) as f:
+        jobs = parse_indeed_page(f.read(), "https://www.indeed.com", limit=2)
+
+    assert [job.title for job in jobs] == ["Senior Python Developer", "Backend Engineer"]
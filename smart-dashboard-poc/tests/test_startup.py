@@ -0,0 +1,63 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from api.services.preload import preload_modules, start_preload
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Measured at ~1s and ~75 MB; importing every parser eagerly took ~3.8s and ~215 MB
+IMPORT_SECONDS_BUDGET = 2.5
+IMPORT_RSS_MB_BUDGET = 150
+DEFERRED_MODULES = ["spacy", "pyresparser", "openai", "google.cloud.documentai", "PyPDF2", "docx", "bs4"]
+
+MEASURE = f"""
+import json, sys, time
+start = time.perf_counter()
+import api.main
+seconds = time.perf_counter() - start
+# Peak RSS of this process; ru_maxrss would include the parent's, as Linux keeps it across exec
+with open("/proc/self/status") as status:
+    peak_kb = next(int(line.split()[1]) for line in status if line.startswith("VmHWM:"))
+print(json.dumps({{
+    "seconds": seconds,
+    "rss_mb": peak_kb / 1024,
+    "loaded": [name for name in {DEFERRED_MODULES!r} if name in sys.modules],
+}}))
+"""
+
+
+def measure_startup():
+    output = subprocess.run(
+        [sys.executable, "-c", MEASURE], cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="reads peak RSS from /proc")
+def test_api_import_stays_within_startup_budget():
+    # Best of two runs, so one slow run on a busy machine does not fail the test
+    runs = [measure_startup() for _ in range(2)]
+
+    assert runs[0]["loaded"] == []
+    assert min(run["seconds"] for run in runs) < IMPORT_SECONDS_BUDGET
+    assert min(run["rss_mb"] for run in runs) < IMPORT_RSS_MB_BUDGET
+
+
+def test_preload_modules_skips_failures():
+    timings = preload_modules(["json", "no_such_module_for_preload"])
+
+    assert list(timings) == ["json"]
+
+
+def test_start_preload_runs_in_background():
+    assert start_preload([]) is None
+
+    thread = start_preload(["json"])
+    thread.join(timeout=5)
+
+    assert thread.daemon
+    assert not thread.is_alive()
@@ -0,0 +1,104 @@
+import docx
+import PyPDF2
+import pytest
+import redis
+from pyresparser import utils
+
+from api.services import text_extraction
+from api.services.text_extraction import extract_text, use_for_pyresparser
+from benchmarks.bench_text_extraction import make_pdf, previous_extraction
+
+PAGES = [[f"Page {page} line {line}" for line in range(3)] for page in range(1, 6)]
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(make_pdf(PAGES))
+    return str(path)
+
+
+def test_pdf_text_matches_the_previous_extraction(fake_redis, pdf_path):
+    text = extract_text(pdf_path, redis_conn=fake_redis, workers=1)
+
+    assert text == previous_extraction(pdf_path)
+    assert text.startswith("Page 1 line 0") and "Page 5 line 2" in text
+
+
+def test_page_parallel_extraction_keeps_page_order(fake_redis, pdf_path, monkeypatch):
+    monkeypatch.setattr(text_extraction, "_parallel_disabled", False)
+    monkeypatch.setattr(text_extraction, "PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(text_extraction, "PAGES_PER_TASK", 2)
+
+    assert extract_text(pdf_path, redis_conn=fake_redis, workers=2) == previous_extraction(pdf_path)
+    # The pool is kept for the next PDF
+    pool = text_extraction._pool
+    assert extract_text(pdf_path, max_chars=50, redis_conn=fake_redis, workers=2) == previous_extraction(pdf_path)[:50]
+    assert text_extraction._pool is pool
+
+
+def test_parallel_extraction_can_be_disabled(fake_redis, pdf_path, monkeypatch, mocker):
+    monkeypatch.setattr(text_extraction, "_parallel_disabled", False)
+    monkeypatch.setattr(text_extraction, "PARALLEL_MIN_PAGES", 2)
+    pool = mocker.patch.object(text_extraction, "_extraction_pool")
+
+    text_extraction.disable_parallel_extraction()
+
+    assert extract_text(pdf_path, redis_conn=fake_redis, workers=4) == previous_extraction(pdf_path)
+    assert not pool.called
+
+
+def test_budgets_stop_extraction_early(fake_redis, pdf_path, mocker):
+    text = extract_text(pdf_path, max_pages=2, redis_conn=fake_redis, workers=1)
+    assert "Page 2" in text and "Page 3" not in text
+
+    extract_page = mocker.spy(PyPDF2.PageObject, "extract_text")
+    text = extract_text(pdf_path, max_chars=10, redis_conn=fake_redis, workers=1)
+    assert text == "Page 1 lin"
+    assert extract_page.call_count == 1
+
+
+def test_text_is_cached_by_content(fake_redis, pdf_path, tmp_path, mocker):
+    text = extract_text(pdf_path, redis_conn=fake_redis, workers=1)
+    copy = tmp_path / "copy.pdf"
+    copy.write_bytes(open(pdf_path, "rb").read())
+    extract = mocker.patch("api.services.text_extraction._extract_pdf")
+
+    assert extract_text(str(copy), redis_conn=fake_redis) == text
+    # A different budget is a different entry
+    extract.return_value = ["Page 1"]
+    assert extract_text(str(copy), max_pages=1, redis_conn=fake_redis) == "Page 1"
+    assert extract.call_count == 1
+
+
+def test_redis_errors_do_not_fail_extraction(pdf_path, mocker):
+    broken = mocker.Mock()
+    broken.get.side_effect = broken.set.side_effect = redis.ConnectionError("down")
+
+    assert extract_text(pdf_path, redis_conn=broken, workers=1) == previous_extraction(pdf_path)
+
+
+def test_docx_and_unsupported_files(fake_redis, tmp_path):
+    document = docx.Document()
+    document.add_paragraph("Jane Doe")
+    document.add_paragraph("jane@example.com")
+    path = tmp_path / "resume.docx"
+    document.save(path)
+
+    assert extract_text(str(path), redis_conn=fake_redis) == "Jane Doe jane@example.com"
+    with pytest.raises(ValueError):
+        extract_text(str(tmp_path / "resume.txt"), redis_conn=fake_redis)
+
+
+def test_pyresparser_reads_text_from_the_shared_extractor(pdf_path, mocker, monkeypatch):
+    original = mocker.Mock(return_value="legacy text")
+    monkeypatch.setattr(utils, "extract_text", original)
+    monkeypatch.setattr(text_extraction, "_pyresparser_extract_text", None)
+    shared = mocker.patch("api.services.text_extraction.extract_text", return_value="shared text")
+
+    use_for_pyresparser()
+    use_for_pyresparser()
+
+    assert utils.extract_text(pdf_path, ".pdf") == " shared text"
+    assert utils.extract_text("resume.doc", ".doc") == "legacy text"
+    shared.assert_called_once_with(pdf_path)
@@ -0,0 +1,153 @@
+import asyncio
+import hashlib
+import os
+import threading
+import tracemalloc
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+from unittest.mock import MagicMock
+
+from api.deps import get_redis
+from api.main import app
+from api.routers.resume import get_queue
+from api.services import uploads
+from api.services.uploads import DOC, DOCX, PDF, UploadRejected, UploadWriter, receive_upload, sniff_mime
+
+client = TestClient(app)
+
+BOUNDARY = b"resume-boundary"
+CHUNK = 64 * 1024
+
+
+def multipart_request(file_chunks, filename=b"big.pdf", content_length=None):
+    """A request whose multipart body is produced lazily, one chunk at a time."""
+    def body():
+        yield (b"--" + BOUNDARY + b"\r\nContent-Disposition: form-data; name=\"note\"\r\n\r\nhello\r\n"
+               b"--" + BOUNDARY + b"\r\nContent-Disposition: form-data; name=\"file\"; filename=\"" + filename
+               + b"\"\r\nContent-Type: application/pdf\r\n\r\n")
+        yield from file_chunks
+        yield b"\r\n--" + BOUNDARY + b"--\r\n"
+
+    chunks = body()
+
+    async def receive():
+        chunk = next(chunks, None)
+        return {"type": "http.request", "body": chunk or b"", "more_body": chunk is not None}
+
+    headers = [(b"content-type", b"multipart/form-data; boundary=" + BOUNDARY)]
+    if content_length is not None:
+        headers.append((b"content-length", str(content_length).encode("ascii")))
+    return Request({"type": "http", "method": "POST", "path": "/resume/upload", "headers": headers}, receive)
+
+
+def pdf_chunks(size):
+    yield b"%PDF-1.4\n" + b"x" * (CHUNK - 9)
+    for _ in range(size // CHUNK - 1):
+        yield b"x" * CHUNK
+
+
+def test_sniff_mime_recognises_resume_formats():
+    assert sniff_mime(b"%PDF-1.7 ...") == PDF
+    assert sniff_mime(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1rest") == DOC
+    assert sniff_mime(b"PK\x03\x04....[Content_Types].xml....word/document.xml") == DOCX
+    assert sniff_mime(b"PK\x03\x04....", "resume.docx") == DOCX
+    assert sniff_mime(b"PK\x03\x04....", "archive.zip") is None
+    assert sniff_mime(b"\x89PNG\r\n", "resume.pdf") is None
+
+
+def test_writer_names_file_by_content_and_hashes_it(tmp_path):
+    writer = UploadWriter("../../cv", str(tmp_path), max_bytes=1024 * 1024)
+    content = b"%PDF-1.4\n" + os.urandom(20000)
+    for start in range(0, len(content), 3000):
+        writer.write(content[start:start + 3000])
+    stored = writer.finish()
+
+    assert os.path.dirname(stored.path) == str(tmp_path)
+    assert stored.path.endswith("_cv.pdf")
+    assert (stored.size, stored.sha256, stored.mime_type) == (len(content), hashlib.sha256(content).hexdigest(), PDF)
+    with open(stored.path, "rb") as file:
+        assert file.read() == content
+
+
+def test_writer_rejects_oversized_and_unsupported_files_and_cleans_up(tmp_path):
+    too_big = UploadWriter("cv.pdf", str(tmp_path), max_bytes=20000)
+    too_big.write(b"%PDF-" + b"x" * 10000)
+    with pytest.raises(UploadRejected) as oversized:
+        too_big.write(b"x" * 10000)
+    image = UploadWriter("cv.pdf", str(tmp_path))
+    with pytest.raises(UploadRejected) as unsupported:
+        image.write(b"\x89PNG\r\n" + b"x" * 10000)
+
+    assert oversized.value.status_code == 413
+    assert unsupported.value.status_code == 415
+    assert os.listdir(tmp_path) == []
+
+
+def test_declared_oversized_upload_is_refused_before_reading(tmp_path):
+    def unread_chunks():
+        raise AssertionError("body must not be read")
+        yield
+
+    request = multipart_request(unread_chunks(), content_length=50 * 1024 * 1024)
+
+    with pytest.raises(UploadRejected) as rejected:
+        asyncio.run(receive_upload(request, upload_dir=str(tmp_path), max_bytes=1024 * 1024))
+    assert rejected.value.status_code == 413
+
+
+def test_peak_memory_does_not_grow_with_file_size(tmp_path):
+    def peak(size):
+        tracemalloc.start()
+        stored = asyncio.run(receive_upload(multipart_request(pdf_chunks(size)), upload_dir=str(tmp_path), max_bytes=1 << 30))
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert stored.size == size
+        return peak_bytes
+
+    small, large = peak(1024 * 1024), peak(32 * 1024 * 1024)
+
+    assert large < small + 256 * 1024
+    assert large < 2 * 1024 * 1024
+
+
+def test_file_writes_run_off_the_event_loop_thread(tmp_path, monkeypatch):
+    write_threads = []
+    original_write = UploadWriter.write
+
+    def recording_write(self, chunk):
+        write_threads.append(threading.get_ident())
+        return original_write(self, chunk)
+
+    monkeypatch.setattr(UploadWriter, "write", recording_write)
+
+    async def upload():
+        stored = await receive_upload(multipart_request(pdf_chunks(4 * CHUNK)), upload_dir=str(tmp_path), max_bytes=1 << 20)
+        return stored, threading.get_ident()
+
+    stored, loop_thread = asyncio.run(upload())
+
+    assert stored.size == 4 * CHUNK
+    assert write_threads and loop_thread not in write_threads
+
+
+def test_upload_endpoint_status_codes_and_unique_names(fake_redis, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(uploads, "MAX_UPLOAD_BYTES", 64 * 1024)
+    app.dependency_overrides[get_redis] = lambda: fake_redis
+    app.dependency_overrides[get_queue] = lambda: MagicMock()
+
+    first = client.post("/resume/upload", files={"file": ("cv.pdf", b"%PDF-1.4 one", "application/pdf")})
+    second = client.post("/resume/upload", files={"file": ("cv.pdf", b"%PDF-1.4 two", "application/pdf")})
+    too_big = client.post("/resume/upload", files={"file": ("cv.pdf", b"%PDF-" + b"x" * 70000, "application/pdf")})
+    image = client.post("/resume/upload", files={"file": ("cv.pdf", b"\x89PNG\r\n", "application/pdf")})
+    missing = client.post("/resume/upload", files={"other": ("cv.pdf", b"%PDF-1.4", "application/pdf")})
+    app.dependency_overrides = {}
+
+    assert (first.status_code, second.status_code) == (202, 202)
+    assert first.json()["file_path"] != second.json()["file_path"]
+    assert too_big.status_code == 413
+    assert image.status_code == 415
+    assert missing.status_code == 400
+    assert len(os.listdir(tmp_path / "uploads")) == 2
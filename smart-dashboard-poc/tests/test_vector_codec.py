@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from api.services.vector_codec import HEADER, decode, decode_vector, encode, encode_vector, quantize, storage_dtype
+
+
+def unit_rows(n, dim, seed=0):
+    matrix = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("dtype, bytes_per_value, tolerance", [
+    ("float32", 4, 0.0), ("float16", 2, 1e-3), ("int8", 1, 1e-2),
+])
+def test_round_trip_size_and_error(dtype, bytes_per_value, tolerance):
+    matrix = unit_rows(100, 64)
+
+    buffer = encode(quantize(matrix, dtype))
+    decoded = decode(buffer)
+
+    params_bytes = 100 * 8 if dtype == "int8" else 0
+    assert len(buffer) == HEADER.size + 100 * 64 * bytes_per_value + params_bytes
+    np.testing.assert_allclose(decoded.dequantize(), matrix, atol=tolerance)
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_scores_on_quantized_rows_match_dequantized(dtype):
+    matrix = unit_rows(1000, 64)
+    query = unit_rows(1, 64, seed=1)[0]
+    vectors = decode(encode(quantize(matrix, dtype)))
+
+    np.testing.assert_allclose(vectors.scores(query), vectors.dequantize() @ query, atol=1e-5)
+    indices, scores = vectors.top_k(query, 10)
+    assert len(set(indices.tolist()) & set(np.argsort(-(matrix @ query))[:10].tolist())) >= 8
+
+
+def test_decode_rejects_foreign_buffers():
+    with pytest.raises(ValueError):
+        decode(np.ones(4, dtype=np.float32).tobytes())
+    with pytest.raises(ValueError):
+        decode_vector(encode_vector(np.ones(4), "int8")[:-1])
+
+
+def test_storage_defaults_to_float32_and_reads_headerless_vectors(monkeypatch):
+    monkeypatch.delenv("EMBEDDING_STORAGE_DTYPE", raising=False)
+    vector = np.array([0.1, -0.2, 0.3], dtype=np.float32)
+
+    assert storage_dtype() == "float32"
+    # Stored as raw float32 bytes before vectors had a header
+    np.testing.assert_array_equal(decode_vector(vector.tobytes()), vector)
+    with pytest.raises(ValueError):
+        decode_vector(vector.tobytes()[:-1])
@@ -0,0 +1,169 @@
+"""
+Pre-warms the job search cache for the most common candidate searches.
+
+Each cycle crawls the popular searches and schedules the next one on the
+crawler queue. Run it as a service:
+
+    python -m workers.job_crawler
+
+This schedules the first cycle (unless one is already pending) and works
+the crawler queue with RQ's scheduler enabled, which delayed cycles need.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+from typing import Dict, List, Tuple
+
+import redis
+from rq import Queue, Worker
+
+from api.routers.jobs import PREFILTER_TOP_M, embed_jobs, generate_cache_key
+from api.services.candidate_embedding import profile_text
+from api.services.candidate_index import iter_candidates
+from api.services.lexical_index import lexical_prefilter
+from api.services.job_cache import get_job_cache
+from api.services.job_sources import JobSource, enabled_sources, search_job_sources
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Initialize Redis connection
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+redis_client = redis.from_url(REDIS_URL)
+
+CRAWL_INTERVAL = timedelta(minutes=int(os.getenv("CRAWL_INTERVAL_MINUTES", "60")))
+CRAWL_TOP_N = int(os.getenv("CRAWL_TOP_N", "50"))
+CRAWL_LOCATION = "Remote"
+# Every cycle gets its own job id under this prefix: a finished job's id
+# expires after its result TTL, which would take a reused id's scheduled
+# successor with it
+CYCLE_JOB_PREFIX = "job-crawler-cycle:"
+CRAWL_QUEUE = os.getenv("JOB_CRAWLER_QUEUE", "job_crawler")
+
+
+def crawl_rate_per_minute(source: str) -> float:
+    """Allowed requests per minute for a source, e.g. CRAWL_RATE_PER_MINUTE_INDEED=10."""
+    return float(os.getenv(f"CRAWL_RATE_PER_MINUTE_{source.upper()}", "10"))
+
+
+class SourceRateLimiter:
+    """
+    Space out crawl requests to one source, shared by every crawler worker.
+
+    A slot is a Redis key that lives for 60/rate seconds per request it
+    covers; only one worker can hold it at a time, and the next search
+    waits for it to expire.
+    """
+
+    def __init__(self, redis_conn: redis.Redis, source: str):
+        self.redis = redis_conn
+        self.key = f"crawl:rate:{source}"
+        self.interval_ms = int(60_000 / crawl_rate_per_minute(source))
+
+    async def wait(self, requests: int = 1) -> None:
+        """Wait until `requests` requests, sent together, fit the rate."""
+        while not self.redis.set(self.key, "1", nx=True, px=self.interval_ms * max(requests, 1)):
+            remaining_ms = self.redis.pttl(self.key)
+            await asyncio.sleep(max(remaining_ms, 10) / 1000)
+
+
+def top_search_combinations(redis_conn: redis.Redis, limit: int = CRAWL_TOP_N) -> List[Tuple[Tuple[str, ...], str]]:
+    """
+    Most common (top 3 skills, location) searches across stored candidates,
+    grouped exactly the way the jobs router keys its cache.
+    """
+    counts: Counter = Counter()
+    skills_by_key: Dict[str, Tuple[str, ...]] = {}
+
+    for candidate in iter_candidates(redis_conn):
+        if not candidate.skills:
+            continue
+        cache_key = generate_cache_key(candidate.skills, CRAWL_LOCATION)
+        counts[cache_key] += 1
+        skills_by_key.setdefault(cache_key, tuple(candidate.skills[:3]))
+
+    return [(skills_by_key[key], CRAWL_LOCATION) for key, _ in counts.most_common(limit)]
+
+
+async def crawl_search(
+    skills: List[str], location: str, sources: List[JobSource], limiters: Dict[str, SourceRateLimiter]
+) -> int:
+    """Scrape and embed one search, then pre-warm its shared job set."""
+    for source in sources:
+        await limiters[source.name].wait(source.requests_per_search())
+    jobs = await search_job_sources(skills, location, sources)
+    if not jobs:
+        return 0
+
+    # Embed the jobs rankings for this search will keep after the lexical
+    # prefilter, so per-candidate rankings mostly read the embedding cache
+    positions, _ = lexical_prefilter(jobs, profile_text(skills), PREFILTER_TOP_M)
+    await embed_jobs([jobs[i] for i in positions])
+    get_job_cache().set(generate_cache_key(skills, location), json.dumps([job.dict() for job in jobs]))
+    return len(jobs)
+
+
+async def crawl_popular_searches(limit: int = CRAWL_TOP_N) -> Dict[str, int]:
+    searches = top_search_combinations(redis_client, limit)
+    sources = enabled_sources()
+    limiters = {source.name: SourceRateLimiter(redis_client, source.name) for source in sources}
+    crawled_jobs = 0
+    for skills, location in searches:
+        try:
+            crawled_jobs += await crawl_search(list(skills), location, sources, limiters)
+        except Exception as e:
+            logger.error(f"Error crawling {skills} in {location}: {str(e)}")
+    return {"searches": len(searches), "jobs": crawled_jobs}
+
+
+def run_crawl_cycle() -> None:
+    """
+    RQ entry point: crawl the most popular searches, then schedule the next
+    cycle. Needs a worker with the scheduler enabled; see `main`.
+    """
+    start = time.monotonic()
+    try:
+        result = asyncio.run(crawl_popular_searches())
+        logger.info(
+            f"Crawled {result['searches']} searches ({result['jobs']} jobs) in {time.monotonic() - start:.1f}s"
+        )
+    finally:
+        schedule_next_cycle()
+
+
+def get_crawl_queue() -> Queue:
+    return Queue(CRAWL_QUEUE, connection=redis_client)
+
+
+def schedule_next_cycle(delay: timedelta = CRAWL_INTERVAL) -> str:
+    job_id = f"{CYCLE_JOB_PREFIX}{uuid.uuid4().hex}"
+    get_crawl_queue().enqueue_in(delay, "workers.job_crawler.run_crawl_cycle", job_id=job_id)
+    return job_id
+
+
+def cycle_pending(queue: Queue) -> bool:
+    """Whether a cycle is scheduled, queued or running (and so will schedule the next one)."""
+    job_ids = (
+        queue.scheduled_job_registry.get_job_ids() + queue.get_job_ids() + queue.started_job_registry.get_job_ids()
+    )
+    return any(job_id.startswith(CYCLE_JOB_PREFIX) for job_id in job_ids)
+
+
+def main() -> None:
+    queue = get_crawl_queue()
+    # Each cycle schedules the next one, so a restart only needs a first
+    # cycle when none is pending
+    if not cycle_pending(queue):
+        schedule_next_cycle(timedelta(seconds=0))
+    logger.info(f"Working queue {CRAWL_QUEUE}")
+    Worker([queue], connection=redis_client).work(with_scheduler=True)
+
+
+if __name__ == "__main__":
+    main()
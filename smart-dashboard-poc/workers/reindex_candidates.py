@@ -0,0 +1,18 @@
+"""
+One-off backfill of the candidate listing indexes from the stored
+candidate records (needed once for records written before the indexes
+existed).
+
+    python -m workers.reindex_candidates
+"""
+import os
+import logging
+
+import redis
+
+from api.services.candidate_index import rebuild_candidate_index
+
+logging.basicConfig(level=logging.INFO)
+
+if __name__ == "__main__":
+    rebuild_candidate_index(redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
@@ -0,0 +1,43 @@
+"""
+RQ jobs that parse uploaded resumes off the API's request path.
+
+Run one or more workers on the ingestion queue; upload throughput scales
+with their number:
+
+    python -m workers.resume_ingest
+
+This loads the parser models once and then works the queue. RQ runs each
+job in a process forked from the worker, so every job starts with the
+models already in memory, and whatever a parse leaves behind is freed
+when its process exits. A plain `rq worker resume_ingestion` works too
+but loads the models again for every resume.
+"""
+import os
+import logging
+
+import redis
+from rq import Worker
+
+from api.services.parser_pool import warm_up_parsers
+from api.services.resume_ingestion import INGESTION_QUEUE, get_ingestion_queue, process_ingestion
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+redis_client = redis.from_url(REDIS_URL)
+
+
+def ingest_resume(job_id: str) -> None:
+    """Parse one uploaded resume and store the candidate."""
+    process_ingestion(redis_client, job_id)
+
+
+def main() -> None:
+    warm_up_parsers()
+    logger.info(f"Working queue {INGESTION_QUEUE}")
+    Worker([get_ingestion_queue(redis_client)], connection=redis_client).work()
+
+
+if __name__ == "__main__":
+    main()
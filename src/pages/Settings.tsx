@@ -16,6 +16,7 @@ const parserOptions = [
   { value: 'pyresparser', label: 'pyresparser' },
   { value: 'google-docai', label: 'Google Document AI' },
   { value: 'gpt4-text', label: 'GPT-4 text parse' },
+  { value: 'cascade', label: 'Cascade: pyresparser, escalating unsure parses' },
 ];
 
 const Settings: React.FC = () => {
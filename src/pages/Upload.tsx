@@ -9,6 +9,10 @@ import { useCandidateStore } from '../store';
 // import { Toast } from "../components/Toast"; // No Toast utility found
 // import { Spinner } from "shadcn/ui"; // If you want to use a Spinner in the button
 
+const POLL_INTERVAL_MS = 1000;
+// A parse that has not settled by then is treated as lost (e.g. its worker died)
+const MAX_POLL_ATTEMPTS = 300;
+
 const Upload: React.FC = () => {
   const [files, setFiles] = useState<File[]>([]);
   const [uploading, setUploading] = useState(false);
@@ -26,12 +30,26 @@ const Upload: React.FC = () => {
     try {
       const form = new FormData();
       form.append('file', files[0]);
-      const res = await fetch('/resume', {
+      const res = await fetch('/resume/upload', {
         method: 'POST',
         body: form,
       });
       if (!res.ok) throw new Error(await res.text());
-      const data = await res.json(); // { candidate_id, skills, ... }
+      // Parsing runs in the background; poll the ingestion job until it settles
+      let job = await res.json(); // { job_id, status, ... }
+      for (let attempt = 0; job.status === 'Queued' || job.status === 'Processing'; attempt++) {
+        if (attempt >= MAX_POLL_ATTEMPTS) {
+          throw new Error(`Parsing did not finish within ${(MAX_POLL_ATTEMPTS * POLL_INTERVAL_MS) / 60000} minutes; please try again`);
+        }
+        await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+        const statusRes = await fetch(`/resume/ingestions/${job.job_id}`);
+        if (!statusRes.ok) throw new Error(await statusRes.text());
+        job = await statusRes.json();
+      }
+      if (job.status === 'Failed') throw new Error(job.error || 'Parsing failed');
+      const candidateRes = await fetch(`/resume/${job.candidate_id}`);
+      if (!candidateRes.ok) throw new Error(await candidateRes.text());
+      const data = await candidateRes.json(); // { candidate_id, skills, ... }
       
       // Store the full candidate object in the global store
       setCandidate(data);